@@ -6,14 +6,29 @@ from typing import Annotated
 import typer
 
 from . import __version__
+from .apptainer import (
+    DEFAULT_APPTAINER_CACHE_SIZE,
+    DEFAULT_MAX_PULLS,
+    DEFAULT_REGISTRY_MAX_PULLS,
+    DEFAULT_SIF_STORE_SIZE,
+)
+from .caches import print_cache_stats, prune_caches
 from .compare import compare_to_snapshot
+from .download_cache import DEFAULT_DOWNLOAD_CACHE_SIZE
 from .errors import DeployToolsError
 from .models.schema import generate_schema
+from .snapshot import SnapshotFormat
 from .sync import synchronise
 from .validate import validate_and_test_configuration
 
 __all__ = ["main"]
 
+MIB = 1024 * 1024
+GIB = 1024 * MIB
+DEFAULT_DOWNLOAD_CACHE_MIB = DEFAULT_DOWNLOAD_CACHE_SIZE // MIB
+DEFAULT_SIF_STORE_GIB = DEFAULT_SIF_STORE_SIZE // GIB
+DEFAULT_APPTAINER_CACHE_GIB = DEFAULT_APPTAINER_CACHE_SIZE // GIB
+
 
 def _verbose_callback(value: int) -> None:
     match value:
@@ -91,6 +106,114 @@ TEST_BUILD_OPTION = Annotated[
         help="Test the build in a temporary directory.",
     ),
 ]
+JOBS_OPTION = Annotated[
+    int | None,
+    typer.Option(
+        "--jobs",
+        "-j",
+        min=1,
+        show_default="automatic",
+        help="Number of parallel jobs to use when loading configuration, building "
+        "modules and checking built scripts.",
+    ),
+]
+MAX_PULLS_OPTION = Annotated[
+    int,
+    typer.Option(
+        "--max-pulls",
+        min=1,
+        help="Maximum number of Apptainer images to pull at once.",
+    ),
+]
+REGISTRY_MAX_PULLS_OPTION = Annotated[
+    list[str] | None,
+    typer.Option(
+        "--registry-max-pulls",
+        metavar="REGISTRY=N",
+        show_default=False,
+        help="Maximum number of Apptainer images to pull at once from the given "
+        f"registry host, e.g. ghcr.io=4. Can be given more than once. Registries not "
+        f"given are limited to {DEFAULT_REGISTRY_MAX_PULLS}.",
+    ),
+]
+DOWNLOAD_CACHE_SIZE_OPTION = Annotated[
+    int,
+    typer.Option(
+        "--download-cache-size",
+        min=0,
+        metavar="MIB",
+        help="Size limit in MiB of the cache of downloaded binaries, beyond which the "
+        "least-recently-used are removed. sync keeps this cache in the deployment "
+        "area; validate only uses one in the --cache-dir folder.",
+    ),
+]
+CACHE_DIR_OPTION = Annotated[
+    Path | None,
+    typer.Option(
+        "--cache-dir",
+        file_okay=False,
+        dir_okay=True,
+        writable=True,
+        resolve_path=True,
+        help="Folder for persistent caches that speed up repeated runs, such as parsed "
+        "configuration, script checks and downloaded binaries. Caching is disabled if "
+        "not given.",
+    ),
+]
+INCREMENTAL_OPTION = Annotated[
+    bool,
+    typer.Option(
+        "--incremental",
+        show_default="False",  # Shows default as 'False'
+        help="Only load configuration files that changed since the configuration "
+        "commit recorded by the last sync, taking all others from the snapshot. Falls "
+        "back to loading all files if no commit was recorded.",
+    ),
+]
+SNAPSHOT_FORMAT_OPTION = Annotated[
+    SnapshotFormat | None,
+    typer.Option(
+        "--snapshot-format",
+        show_default="keep existing",
+        help="Format to write the deployment snapshot in. A sharded snapshot stores "
+        "each Module in its own file, so only changed Modules are rewritten. New "
+        "deployment areas default to a single file.",
+    ),
+]
+SIF_STORE_SIZE_OPTION = Annotated[
+    int,
+    typer.Option(
+        "--sif-store-size",
+        min=0,
+        metavar="GIB",
+        help="Size limit in GiB of the deployment area's store of pulled Apptainer "
+        "images, beyond which the least-recently-used are removed.",
+    ),
+]
+APPTAINER_CACHE_DIR_OPTION = Annotated[
+    Path | None,
+    typer.Option(
+        "--apptainer-cache-dir",
+        file_okay=False,
+        dir_okay=True,
+        writable=True,
+        resolve_path=True,
+        show_default=False,
+        help="Folder for Apptainer to cache the layers of pulled images in, shared "
+        "between runs. Defaults to the deployment area's .cache/apptainer folder, "
+        "except for validate, which uses an apptainer folder in --cache-dir if given.",
+    ),
+]
+APPTAINER_CACHE_SIZE_OPTION = Annotated[
+    int,
+    typer.Option(
+        "--apptainer-cache-size",
+        min=0,
+        metavar="GIB",
+        help="Size limit in GiB of the Apptainer cache, beyond which the "
+        "least-recently-used layers are removed.",
+    ),
+]
 USE_REF_OPTION = Annotated[
     str | None,
     typer.Option("--use-ref", help="Use deployment area git ref for comparison."),
@@ -111,6 +234,10 @@ VERBOSE_OPTION = Annotated[
 
 
 app = typer.Typer(no_args_is_help=True, pretty_exceptions_show_locals=False)
+cache_app = typer.Typer(
+    no_args_is_help=True, help="Manage the caches kept in a deployment area."
+)
+app.add_typer(cache_app, name="cache")
 
 
 @app.command(no_args_is_help=True)
@@ -119,6 +246,16 @@ def sync(
     config_folder: CONFIG_FOLDER_ARGUMENT,
     allow_all: ALLOW_ALL_OPTION = False,
     from_scratch: FROM_SCRATCH_OPTION = False,
+    jobs: JOBS_OPTION = None,
+    cache_dir: CACHE_DIR_OPTION = None,
+    incremental: INCREMENTAL_OPTION = False,
+    snapshot_format: SNAPSHOT_FORMAT_OPTION = None,
+    max_pulls: MAX_PULLS_OPTION = DEFAULT_MAX_PULLS,
+    registry_max_pulls: REGISTRY_MAX_PULLS_OPTION = None,
+    download_cache_size: DOWNLOAD_CACHE_SIZE_OPTION = DEFAULT_DOWNLOAD_CACHE_MIB,
+    sif_store_size: SIF_STORE_SIZE_OPTION = DEFAULT_SIF_STORE_GIB,
+    apptainer_cache_dir: APPTAINER_CACHE_DIR_OPTION = None,
+    apptainer_cache_size: APPTAINER_CACHE_SIZE_OPTION = DEFAULT_APPTAINER_CACHE_GIB,
     verbose: VERBOSE_OPTION = 0,
 ) -> None:
     """Synchronise deployment root with current configuration.
@@ -133,7 +270,22 @@ def sync(
     if from_scratch:
         allow_all = True
 
-    synchronise(deployment_root, config_folder, allow_all, from_scratch)
+    synchronise(
+        deployment_root,
+        config_folder,
+        allow_all,
+        from_scratch,
+        jobs,
+        cache_dir,
+        incremental,
+        snapshot_format,
+        max_pulls,
+        _parse_registry_max_pulls(registry_max_pulls),
+        download_cache_size * MIB,
+        sif_store_size * GIB,
+        apptainer_cache_dir,
+        apptainer_cache_size * GIB,
+    )
 
 
 @app.command(no_args_is_help=True)
@@ -143,6 +295,14 @@ def validate(
     from_scratch: FROM_SCRATCH_OPTION = False,
     allow_all: ALLOW_ALL_OPTION = False,
     test_build: TEST_BUILD_OPTION = False,
+    jobs: JOBS_OPTION = None,
+    cache_dir: CACHE_DIR_OPTION = None,
+    incremental: INCREMENTAL_OPTION = False,
+    max_pulls: MAX_PULLS_OPTION = DEFAULT_MAX_PULLS,
+    registry_max_pulls: REGISTRY_MAX_PULLS_OPTION = None,
+    download_cache_size: DOWNLOAD_CACHE_SIZE_OPTION = DEFAULT_DOWNLOAD_CACHE_MIB,
+    apptainer_cache_dir: APPTAINER_CACHE_DIR_OPTION = None,
+    apptainer_cache_size: APPTAINER_CACHE_SIZE_OPTION = DEFAULT_APPTAINER_CACHE_GIB,
     verbose: VERBOSE_OPTION = 0,
 ) -> None:
     """Validate deployment configuration and print a list of expected module changes.
@@ -154,7 +314,19 @@ def validate(
         allow_all = True
 
     validate_and_test_configuration(
-        deployment_root, config_folder, allow_all, from_scratch, test_build
+        deployment_root,
+        config_folder,
+        allow_all,
+        from_scratch,
+        test_build,
+        jobs,
+        cache_dir,
+        incremental,
+        max_pulls,
+        _parse_registry_max_pulls(registry_max_pulls),
+        download_cache_size * MIB,
+        apptainer_cache_dir,
+        apptainer_cache_size * GIB,
     )
 
 
@@ -183,6 +355,57 @@ def schema(
     generate_schema(output_path)
 
 
+@cache_app.command(no_args_is_help=True)
+def stats(
+    deployment_root: DEPLOYMENT_ROOT_ARGUMENT,
+    apptainer_cache_dir: APPTAINER_CACHE_DIR_OPTION = None,
+    verbose: VERBOSE_OPTION = 0,
+) -> None:
+    """Print the number and size of the entries in each cache of a deployment area."""
+    print_cache_stats(deployment_root, apptainer_cache_dir)
+
+
+@cache_app.command(no_args_is_help=True)
+def prune(
+    deployment_root: DEPLOYMENT_ROOT_ARGUMENT,
+    sif_store_size: SIF_STORE_SIZE_OPTION = DEFAULT_SIF_STORE_GIB,
+    apptainer_cache_dir: APPTAINER_CACHE_DIR_OPTION = None,
+    apptainer_cache_size: APPTAINER_CACHE_SIZE_OPTION = DEFAULT_APPTAINER_CACHE_GIB,
+    verbose: VERBOSE_OPTION = 0,
+) -> None:
+    """Remove cached Apptainer images and layers that are no longer needed.
+
+    Images pulled by sync are kept in a store in the deployment area, so that they are
+    not pulled again while their tags are unchanged. An image whose modules have all
+    been removed is only needed if it is deployed again, so is removed. The image store
+    and Apptainer's layer cache are then evicted down to their size limits, as at the
+    end of every sync.
+
+    This must not be run at the same time as a sync of the same deployment area.
+    """
+    prune_caches(
+        deployment_root,
+        sif_store_size * GIB,
+        apptainer_cache_dir,
+        apptainer_cache_size * GIB,
+    )
+
+
+def _parse_registry_max_pulls(values: list[str] | None) -> dict[str, int]:
+    registry_max_pulls: dict[str, int] = {}
+    for value in values or []:
+        registry, _, max_pulls = value.rpartition("=")
+        if not registry or not max_pulls.isdigit() or int(max_pulls) < 1:
+            raise typer.BadParameter(
+                f"Expected REGISTRY=N, with N at least 1: {value}",
+                param_hint="--registry-max-pulls",
+            )
+
+        registry_max_pulls[registry] = int(max_pulls)
+
+    return registry_max_pulls
+
+
 def _version_callback(value: bool) -> None:
     if value:
         typer.echo(__version__)
@@ -1,17 +1,20 @@
-import hashlib
 import uuid
+from concurrent.futures import Executor, Future
 from itertools import chain
 from pathlib import Path
-from urllib.request import urlretrieve
 
-from deploy_tools.models.binary_app import BinaryApp, HashType
+from deploy_tools.models.binary_app import BinaryApp
 
-from .apptainer import create_sif_file
+from .apptainer import PullScheduler, create_sif_file
+from .cache import link_or_copy
+from .download import HashMismatchError, download_file
+from .download_cache import DownloadCache
 from .errors import DeployToolsError
-from .layout import ModuleBuildLayout
+from .layout import Layout, ModuleBuildLayout
 from .models.apptainer_app import ApptainerApp
 from .models.module import Application, Module
 from .models.shell_app import ShellApp
+from .rebuild_plan import RebuildPlan
 from .templater import Templater, TemplateType
 
 ALL_READ_EXECUTE_PERMISSIONS = 0o555
@@ -22,28 +25,80 @@ class AppBuilderError(DeployToolsError):
 
 
 class AppBuilder:
-    """Class for creating application entrypoints and associated files."""
+    """Class for creating application entrypoints and associated files.
 
-    def __init__(self, templater: Templater, build_layout: ModuleBuildLayout) -> None:
+    Files that are fetched, namely Apptainer images and binaries, are created separately
+    from those rendered from templates, so that they can be fetched in the background.
+    If a ``PullScheduler`` is given, Apptainer images are pulled by submitting them to
+    it, and if an ``Executor`` is given, binaries are downloaded by submitting them to
+    it. Otherwise, each is fetched in turn.
+
+    If the deployment area's ``Layout`` is given, the SIF files of a module that is
+    already deployed are reused for any image whose digest is unchanged. If a
+    ``DownloadCache`` is given, binaries are only downloaded when they are not already
+    cached. Given a ``RebuildPlan`` for an updated module, files that its changes do not
+    affect are reused from the deployed module instead of being built again.
+    """
+
+    def __init__(
+        self,
+        templater: Templater,
+        build_layout: ModuleBuildLayout,
+        pull_scheduler: PullScheduler | None = None,
+        layout: Layout | None = None,
+        download_cache: DownloadCache | None = None,
+        fetch_executor: Executor | None = None,
+    ) -> None:
         self._templater = templater
         self._build_layout = build_layout
+        self._pull_scheduler = pull_scheduler
+        self._layout = layout
+        self._download_cache = download_cache
+        self._fetch_executor = fetch_executor
 
-    def create_application_files(self, app: Application, module: Module) -> None:
-        """Create the entrypoint and supporting files for an application.
+    def fetch_application_files(
+        self, app: Application, module: Module, plan: RebuildPlan | None = None
+    ) -> Future[None] | None:
+        """Fetch the files that an application needs from elsewhere, if any.
 
-        The files produced depend on the application type (Apptainer, shell or binary).
+        Returns:
+            A future for the fetch if it runs in the background, otherwise None.
         """
         match app:
             case ApptainerApp():
-                self._create_apptainer_files(app, module)
+                return self._generate_sif_file(app, module, plan)
+            case BinaryApp():
+                if self._fetch_executor is None:
+                    self._create_binary_file(app, module, plan)
+                    return None
+
+                return self._fetch_executor.submit(
+                    self._create_binary_file, app, module, plan
+                )
             case ShellApp():
-                self._create_shell_file(app, module)
+                return None
+
+    def create_application_files(
+        self, app: Application, module: Module, plan: RebuildPlan | None = None
+    ) -> None:
+        """Create the entrypoint and supporting files rendered for an application.
+
+        The files produced depend on the application type (Apptainer or shell). A binary
+        application's entrypoint is the binary itself, so is fetched rather than
+        rendered.
+        """
+        match app:
+            case ApptainerApp():
+                self._create_apptainer_files(app, module, plan)
+            case ShellApp():
+                self._create_shell_file(app, module, plan)
             case BinaryApp():
-                self._create_binary_file(app, module)
+                pass
 
-    def _create_apptainer_files(self, app: ApptainerApp, module: Module) -> None:
+    def _create_apptainer_files(
+        self, app: ApptainerApp, module: Module, plan: RebuildPlan | None
+    ) -> None:
         """Create apptainer entrypoints using a specified image and commands."""
-        self._generate_sif_file(app, module)
         entrypoints_folder = self._build_layout.get_entrypoints_folder(
             module.name, module.version
         )
@@ -84,11 +139,35 @@ class AppBuilder:
                 params,
                 executable=True,
                 create_parents=True,
+                reuse_from=self._get_reusable_entrypoint(entrypoint.name, module, plan),
             )
 
-    def _generate_sif_file(self, app: ApptainerApp, module: Module) -> None:
+    def _generate_sif_file(
+        self, app: ApptainerApp, module: Module, plan: RebuildPlan | None
+    ) -> Future[None] | None:
         sif_file_path = self._get_sif_file_path(app, module)
-        create_sif_file(sif_file_path, app.container.url, create_parents=True)
+        deployed_path = None
+        if self._layout is not None and (
+            plan is None or app.container.url in plan.reused_images
+        ):
+            deployed_folder = self._layout.get_sif_files_folder(
+                module.name, module.version
+            )
+            deployed_path = deployed_folder / sif_file_path.name
+
+        if self._pull_scheduler is None:
+            create_sif_file(
+                sif_file_path,
+                app.container.url,
+                create_parents=True,
+                deployed_path=deployed_path,
+            )
+            return None
+
+        sif_file_path.parent.mkdir(parents=True, exist_ok=True)
+        return self._pull_scheduler.submit(
+            sif_file_path, app.container.url, deployed_path
+        )
 
     def _get_sif_file_path(self, app: ApptainerApp, module: Module) -> Path:
         sif_folder = self._build_layout.get_sif_files_folder(
@@ -97,7 +176,9 @@ class AppBuilder:
         file_name = uuid.uuid3(uuid.NAMESPACE_URL, app.container.url).hex
         return sif_folder / f"{file_name}.sif"
 
-    def _create_shell_file(self, app: ShellApp, module: Module) -> None:
+    def _create_shell_file(
+        self, app: ShellApp, module: Module, plan: RebuildPlan | None
+    ) -> None:
         """Create shell script using Bash for improved functionality."""
         entrypoint_file = (
             self._build_layout.get_entrypoints_folder(module.name, module.version)
@@ -112,39 +193,77 @@ class AppBuilder:
             parameters,
             executable=True,
             create_parents=True,
+            reuse_from=self._get_reusable_entrypoint(app.name, module, plan),
         )
 
-    def _create_binary_file(self, app: BinaryApp, module: Module) -> None:
+    def _get_reusable_entrypoint(
+        self, name: str, module: Module, plan: RebuildPlan | None
+    ) -> Path | None:
+        """Return the deployed entrypoint to reuse, if the plan leaves it unchanged."""
+        if self._layout is None or plan is None or plan.is_entrypoint_changed(name):
+            return None
+
+        return self._layout.get_entrypoints_folder(module.name, module.version) / name
+
+    def _create_binary_file(
+        self, app: BinaryApp, module: Module, plan: RebuildPlan | None
+    ) -> None:
         """Create executable binary from the given URL.
 
         This will download the binary from the provided URL, validate it against its
-        hash, make it executable and add it to the PATH.
+        hash, make it executable and add it to the PATH. A binary that the deployed
+        module already has, or that is found in the download cache, is linked from there
+        instead, as it was validated when it was first downloaded.
         """
         binary_folder = self._build_layout.get_entrypoints_folder(
             module.name, module.version
         )
         binary_path = binary_folder / app.name
         binary_path.parent.mkdir(parents=True, exist_ok=True)
-        urlretrieve(str(app.url), binary_path)
-
-        match app.hash_type:
-            case HashType.SHA256:
-                h = hashlib.sha256()
-            case HashType.SHA512:
-                h = hashlib.sha512()
-            case HashType.MD5:
-                h = hashlib.md5()
-            case HashType.NONE:
-                h = None
-
-        if h is not None:
-            with open(binary_path, "rb") as fh:
-                while True:
-                    data = fh.read(4096)
-                    if len(data) == 0:
-                        break
-                    h.update(data)
-            if h.hexdigest() != app.hash:
-                raise AppBuilderError(f"Downloaded Binary {app.url} hash check failed")
 
+        if self._link_deployed_binary(app, module, plan, binary_path):
+            return
+
+        cache = self._download_cache
+        if cache is not None and cache.link(app, binary_path):
+            return
+
+        self._download_binary(app, binary_path)
         binary_path.chmod(ALL_READ_EXECUTE_PERMISSIONS)
+
+        if cache is not None:
+            cache.put(app, binary_path)
+
+    def _link_deployed_binary(
+        self,
+        app: BinaryApp,
+        module: Module,
+        plan: RebuildPlan | None,
+        binary_path: Path,
+    ) -> bool:
+        """Link the deployed module's copy of the binary, if the plan reuses it.
+
+        Returns:
+            Whether the binary was linked.
+        """
+        if self._layout is None or plan is None or app.name not in plan.reused_binaries:
+            return False
+
+        deployed_folder = self._layout.get_entrypoints_folder(
+            module.name, module.version
+        )
+        try:
+            link_or_copy(deployed_folder / plan.reused_binaries[app.name], binary_path)
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    def _download_binary(self, app: BinaryApp, binary_path: Path) -> None:
+        """Download the binary to the given path, checking it against its hash."""
+        try:
+            download_file(str(app.url), binary_path, app.hash_type, app.hash)
+        except HashMismatchError as exc:
+            raise AppBuilderError(
+                f"Downloaded Binary {app.url} hash check failed"
+            ) from exc
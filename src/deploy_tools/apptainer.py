@@ -1,7 +1,42 @@
+import bisect
+import hashlib
+import logging
+import math
+import shutil
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
+from concurrent import futures
+from concurrent.futures import Future
+from functools import partial
 from pathlib import Path
+from typing import Self
 
+from pydantic import TypeAdapter, ValidationError
+
+from .cache import FileStore, link_or_copy
 from .errors import DeployToolsError
 from .external_tools import run_command
+from .layout import ModuleBuildLayout
+from .oci import ImageReference, get_registry, resolve_image_digest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PULLS = 4
+DEFAULT_REGISTRY_MAX_PULLS = 2
+
+DEFAULT_SIF_STORE_SIZE = 64 * 1024**3
+SIF_DIGEST_SUFFIX = ".digest"
+
+APPTAINER_CACHE_ENV = "APPTAINER_CACHEDIR"
+# Apptainer keeps its cache in this folder of APPTAINER_CACHEDIR, with a folder for
+# each type of cache. Layers are kept in the blob cache as an OCI image layout.
+APPTAINER_CACHE_FOLDER = "cache"
+APPTAINER_BLOB_CACHE = "blob"
+DEFAULT_APPTAINER_CACHE_SIZE = 32 * 1024**3
+
+PULL_DURATIONS_ADAPTER = TypeAdapter(dict[str, float])
 
 
 class ApptainerError(DeployToolsError):
@@ -12,8 +47,24 @@ def create_sif_file(
     output_path: Path,
     container_url: str,
     create_parents: bool = False,
-) -> None:
-    """Build an Apptainer SIF file at the given path from a container image URL."""
+    sif_store: "SifStore | None" = None,
+    deployed_path: Path | None = None,
+    apptainer_cache: "ApptainerCache | None" = None,
+) -> bool:
+    """Build an Apptainer SIF file at the given path from a container image URL.
+
+    If a ``SifStore`` or the path of a deployed SIF file for the same image is given,
+    the digest of the image's manifest is resolved first. A deployed SIF file built from
+    that digest, or failing that a SIF file stored for it, is hard-linked into place
+    instead of pulling the image. A pulled image is added to the store.
+
+    Whenever the digest is known, it is recorded next to the new SIF file so that a
+    later build can tell whether the image has changed. If an ``ApptainerCache`` is
+    given, Apptainer caches the image's layers there rather than in its default cache.
+
+    Returns:
+        Whether the image was pulled, rather than reused.
+    """
     if create_parents:
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -28,5 +79,483 @@ def create_sif_file(
             f"Building Apptainer file: Sif file output already exists:\n{output_path}"
         )
 
-    commands = ["apptainer", "pull", output_path, container_url]
-    run_command(commands, check=True)
+    digest = None
+    reference = ImageReference.parse(container_url)
+    if reference is not None and (sif_store is not None or deployed_path is not None):
+        digest = resolve_image_digest(container_url)
+
+    pull_url = container_url
+    if reference is not None and digest is not None:
+        if _reuse_sif_file(
+            container_url, digest, output_path, sif_store, deployed_path
+        ):
+            get_sif_digest_path(output_path).write_text(digest)
+            return False
+
+        # Pull the resolved digest, so the recorded digest is the one that was pulled
+        pull_url = reference.get_pinned_url(digest)
+
+    commands = ["apptainer", "pull", output_path, pull_url]
+    env = apptainer_cache.get_environment() if apptainer_cache is not None else None
+    run_command(commands, check=True, env=env)
+
+    if digest is not None:
+        get_sif_digest_path(output_path).write_text(digest)
+        if sif_store is not None:
+            sif_store.put(container_url, digest, output_path)
+
+    return True
+
+
+def get_sif_digest_path(sif_path: Path) -> Path:
+    """Return the path recording the image digest that a SIF file was built from."""
+    return sif_path.with_suffix(SIF_DIGEST_SUFFIX)
+
+
+def read_sif_digest(sif_path: Path) -> str | None:
+    """Return the image digest that a SIF file was built from, if it was recorded."""
+    try:
+        return get_sif_digest_path(sif_path).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _reuse_sif_file(
+    container_url: str,
+    digest: str,
+    output_path: Path,
+    sif_store: "SifStore | None",
+    deployed_path: Path | None,
+) -> bool:
+    """Link an existing SIF file for the image digest to the given path, if possible."""
+    if deployed_path is not None and read_sif_digest(deployed_path) == digest:
+        try:
+            link_or_copy(deployed_path, output_path)
+        except FileNotFoundError:
+            pass
+        else:
+            logger.info("Reusing deployed SIF file of unchanged: %s", container_url)
+            return True
+
+    if sif_store is not None and sif_store.link(container_url, digest, output_path):
+        logger.info("Using stored SIF file for: %s", container_url)
+        return True
+
+    return False
+
+
+class SifStore:
+    """Persistent store of pulled SIF files, addressed by image URL and digest.
+
+    Pulled SIF files are hard-linked into the store, which must be on the same
+    filesystem as the build area for this to work without copying. A later pull of the
+    same image URL, whose tag still resolves to the same digest, is hard-linked back
+    out of the store. Since deployed SIF files share their data with the store, an
+    entry only takes up space of its own once no deployed Module references it.
+
+    Entries are evicted in least-recently-used order once the store is larger than its
+    size limit. Eviction never affects a deployed SIF file, only later pulls.
+    """
+
+    def __init__(
+        self, root: Path, max_size: int | None = DEFAULT_SIF_STORE_SIZE
+    ) -> None:
+        self._store = FileStore(root, max_size)
+
+    @staticmethod
+    def get_key(container_url: str, digest: str) -> str:
+        """Return the key of the entry for an image URL and its resolved digest."""
+        return hashlib.sha256(f"{container_url}@{digest}".encode()).hexdigest()
+
+    def link(self, container_url: str, digest: str, output_path: Path) -> bool:
+        """Link the stored SIF file for the image to the given path, if there is one.
+
+        Returns:
+            Whether the image was found in the store.
+        """
+        path = self._store.get(self.get_key(container_url, digest))
+        if path is None:
+            return False
+
+        try:
+            link_or_copy(path, output_path)
+        except FileNotFoundError:  # Evicted by another process
+            return False
+
+        return True
+
+    def put(self, container_url: str, digest: str, sif_path: Path) -> None:
+        """Add a pulled SIF file for the image to the store."""
+        self._store.put_file(self.get_key(container_url, digest), sif_path)
+
+    def get_usage(self) -> tuple[int, int]:
+        """Return the number of stored SIF files, and their total size in bytes."""
+        return self._store.get_usage()
+
+    def evict(self, max_size: int | None = None) -> int:
+        """Remove least-recently-used entries beyond the store's size limit.
+
+        Returns:
+            The number of bytes removed.
+        """
+        return self._store.evict(max_size)
+
+    def prune(self, modules_root: Path) -> tuple[int, int]:
+        """Remove every entry that no SIF file in the given modules root links to.
+
+        Returns:
+            The number of entries and bytes removed.
+        """
+        sif_files = modules_root.glob(f"*/*/{ModuleBuildLayout.SIF_FILES_FOLDER}/*.sif")
+        referenced: set[tuple[int, int]] = set()
+        for path in sif_files:
+            stat = path.stat()
+            referenced.add((stat.st_dev, stat.st_ino))
+
+        count = size = 0
+        for _, path in self._store.iter_entries():
+            stat = path.stat()
+            if (stat.st_dev, stat.st_ino) not in referenced:
+                logger.debug("Pruning unreferenced SIF file: %s", path)
+                path.unlink(missing_ok=True)
+                count += 1
+                size += stat.st_size
+
+        return count, size
+
+
+class ApptainerCache:
+    """Folder that Apptainer caches the layers and images it pulls in.
+
+    Apptainer is pointed at the folder with ``APPTAINER_CACHEDIR``, so that the cache
+    is shared by every sync rather than depending on the caller's environment. Images
+    that share base layers are then much cheaper to pull.
+
+    Eviction removes whole entries of Apptainer's cache: single layer blobs, and the
+    folders of each other cache type. Apptainer does not update the modification time
+    of an entry it reuses, so an entry was last used at the later of its modification
+    and access times. The cache must not be evicted while Apptainer is using it.
+    """
+
+    def __init__(
+        self, root: Path, max_size: int | None = DEFAULT_APPTAINER_CACHE_SIZE
+    ) -> None:
+        self._root = root
+        self._max_size = max_size
+
+    @property
+    def root(self) -> Path:
+        """Root folder of the cache, as given to Apptainer."""
+        return self._root
+
+    def get_environment(self) -> dict[str, str]:
+        """Return the environment variables that make Apptainer use the cache."""
+        return {APPTAINER_CACHE_ENV: str(self._root)}
+
+    def get_usage(self) -> tuple[int, int]:
+        """Return the number of entries in the cache, and their total size in bytes."""
+        entries = self._get_entries()
+        return len(entries), sum(size for _, _, size in entries)
+
+    def evict(self, max_size: int | None = None) -> int:
+        """Remove least-recently-used entries until the cache fits the size limit.
+
+        Args:
+            max_size: Size limit in bytes. Defaults to the limit given on creation; if
+                neither is set, nothing is evicted.
+
+        Returns:
+            The number of bytes removed.
+        """
+        if max_size is None:
+            max_size = self._max_size
+            if max_size is None:
+                return 0
+
+        entries = self._get_entries()
+        total_size = sum(size for _, _, size in entries)
+        removed = 0
+
+        for path, _, size in sorted(entries, key=lambda entry: entry[1]):
+            if total_size - removed <= max_size:
+                break
+
+            logger.debug("Evicting Apptainer cache entry: %s", path)
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+            removed += size
+
+        return removed
+
+    def _get_entries(self) -> list[tuple[Path, float, int]]:
+        """Return the path, time last used and size of every entry in the cache."""
+        cache_folder = self._root / APPTAINER_CACHE_FOLDER
+        if not cache_folder.is_dir():
+            return []
+
+        entries: list[tuple[Path, float, int]] = []
+        for type_folder in cache_folder.iterdir():
+            if type_folder.name == APPTAINER_BLOB_CACHE:
+                paths = type_folder.glob("blobs/*/*")
+            elif type_folder.is_dir():
+                paths = type_folder.iterdir()
+            else:
+                continue
+
+            for path in paths:
+                files = path.rglob("*") if path.is_dir() else [path]
+                stats = [file.lstat() for file in files if not file.is_dir()]
+                last_used = max(
+                    (max(stat.st_atime, stat.st_mtime) for stat in stats),
+                    default=path.lstat().st_mtime,
+                )
+                entries.append((path, last_used, sum(stat.st_size for stat in stats)))
+
+        return entries
+
+
+class PullScheduler:
+    """Runs ``apptainer pull`` for many container images concurrently.
+
+    At most ``max_pulls`` pulls run at once, and at most the registry's limit from the
+    same registry, so that no one registry throttles the pulls. Queued pulls are
+    started in order of their expected duration, longest first, so the slowest images
+    do not hold up the end of a build. Durations are taken from previous pulls of the
+    same image where known; images never pulled before are expected to be the slowest.
+
+    Each container image is only pulled once. Any other SIF files for the same image are
+    hard-linked to the pulled file, or copied if they are on another filesystem. If a
+    ``SifStore`` is given, images already in the store are linked from it rather than
+    pulled; their durations are not recorded, as they say nothing of a real pull. If an
+    ``ApptainerCache`` is given, every pull caches its layers there.
+
+    Pulls are submitted without waiting for them to finish. Use ``wait`` to wait for
+    every submitted pull, and ``close`` (or a ``with`` block) to stop the scheduler.
+    """
+
+    def __init__(
+        self,
+        max_pulls: int = DEFAULT_MAX_PULLS,
+        registry_max_pulls: Mapping[str, int] | None = None,
+        expected_durations: Mapping[str, float] | None = None,
+        sif_store: SifStore | None = None,
+        apptainer_cache: ApptainerCache | None = None,
+    ) -> None:
+        self._max_pulls = max_pulls
+        self._sif_store = sif_store
+        self._apptainer_cache = apptainer_cache
+        self._registry_max_pulls = dict(registry_max_pulls or {})
+        self._expected_durations = dict(expected_durations or {})
+
+        self._condition = threading.Condition()
+        self._queue: list[_Pull] = []  # Sorted, with the next pull to start first
+        self._pulls: list[_Pull] = []
+        self._pulls_by_url: dict[str, _Pull] = {}
+        self._submissions: list[tuple[Path, Future[None]]] = []
+        self._active: Counter[str] = Counter()
+        self._durations: dict[str, float] = {}
+        self._workers: list[threading.Thread] = []
+        self._closed = False
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def durations(self) -> dict[str, float]:
+        """Time in seconds taken by each successful pull, by container image URL."""
+        with self._condition:
+            return dict(self._durations)
+
+    def submit(
+        self, output_path: Path, container_url: str, deployed_path: Path | None = None
+    ) -> Future[None]:
+        """Queue a pull of the container image to a new SIF file at the given path.
+
+        If the path of a deployed SIF file for the same image is given, it is reused
+        rather than pulled while the image's digest is unchanged.
+        """
+        expected_duration = self._expected_durations.get(container_url, math.inf)
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot submit a pull to a closed scheduler")
+
+            original = self._pulls_by_url.get(container_url)
+            if original is not None:
+                return self._submit_copy(original, output_path)
+
+            pull = _Pull(
+                sort_key=(-expected_duration, len(self._pulls)),
+                output_path=output_path,
+                container_url=container_url,
+                registry=get_registry(container_url),
+                future=Future(),
+                deployed_path=deployed_path,
+            )
+            bisect.insort(self._queue, pull, key=lambda p: p.sort_key)
+            self._pulls.append(pull)
+            self._pulls_by_url[container_url] = pull
+            self._submissions.append((output_path, pull.future))
+            if len(self._workers) < min(self._max_pulls, len(self._pulls)):
+                worker = threading.Thread(
+                    target=self._run_worker,
+                    name=f"pull-{len(self._workers)}",
+                    daemon=True,
+                )
+                self._workers.append(worker)
+                worker.start()
+
+            self._condition.notify()
+
+        return pull.future
+
+    def wait(self) -> list[tuple[Path, BaseException]]:
+        """Wait for every submitted pull to finish.
+
+        Returns:
+            The output path and error of every pull that failed, in submission order.
+        """
+        with self._condition:
+            submissions = list(self._submissions)
+
+        futures.wait([future for _, future in submissions])
+        return [
+            (output_path, exc)
+            for output_path, future in submissions
+            if (exc := future.exception()) is not None
+        ]
+
+    def close(self) -> None:
+        """Wait for queued pulls to finish, then stop the scheduler's threads."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+        for worker in self._workers:
+            worker.join()
+
+    def _submit_copy(self, original: "_Pull", output_path: Path) -> Future[None]:
+        """Arrange for a copy of the original pull's file to be made once it is pulled.
+
+        This must be called with the scheduler's lock held.
+        """
+        if output_path == original.output_path:
+            return original.future
+
+        future: Future[None] = Future()
+        self._submissions.append((output_path, future))
+        original.future.add_done_callback(
+            partial(_copy_pulled_file, original.output_path, output_path, future)
+        )
+        return future
+
+    def _run_worker(self) -> None:
+        while (pull := self._take_next_pull()) is not None:
+            start = time.monotonic()
+            pulled = False
+            try:
+                pulled = create_sif_file(
+                    pull.output_path,
+                    pull.container_url,
+                    sif_store=self._sif_store,
+                    apptainer_cache=self._apptainer_cache,
+                    deployed_path=pull.deployed_path,
+                )
+            except BaseException as exc:
+                pull.future.set_exception(exc)
+            else:
+                pull.future.set_result(None)
+
+            with self._condition:
+                self._active[pull.registry] -= 1
+                if pulled:
+                    self._durations[pull.container_url] = time.monotonic() - start
+
+                self._condition.notify_all()
+
+    def _take_next_pull(self) -> "_Pull | None":
+        """Wait for a queued pull that its registry has capacity for, and claim it.
+
+        None is returned once the scheduler is closed and its queue is empty.
+        """
+        with self._condition:
+            while True:
+                for index, pull in enumerate(self._queue):
+                    limit = self._registry_max_pulls.get(
+                        pull.registry, DEFAULT_REGISTRY_MAX_PULLS
+                    )
+                    if self._active[pull.registry] < limit:
+                        self._active[pull.registry] += 1
+                        del self._queue[index]
+                        pull.future.set_running_or_notify_cancel()
+                        return pull
+
+                if self._closed and not self._queue:
+                    return None
+
+                self._condition.wait()
+
+
+class _Pull:
+    """A pull that has been submitted to a ``PullScheduler``."""
+
+    def __init__(
+        self,
+        sort_key: tuple[float, int],
+        output_path: Path,
+        container_url: str,
+        registry: str,
+        future: Future[None],
+        deployed_path: Path | None = None,
+    ) -> None:
+        self.sort_key = sort_key
+        self.output_path = output_path
+        self.container_url = container_url
+        self.registry = registry
+        self.future = future
+        self.deployed_path = deployed_path
+
+
+def _copy_pulled_file(
+    source: Path, destination: Path, future: Future[None], pulled: Future[None]
+) -> None:
+    """Complete a duplicate pull by linking its SIF file to the one that was pulled."""
+    future.set_running_or_notify_cancel()
+    try:
+        exc = pulled.exception()
+        if exc is not None:
+            raise exc
+
+        if destination.exists():
+            raise ApptainerError(
+                f"Building Apptainer file: "
+                f"Sif file output already exists:\n{destination}"
+            )
+
+        link_or_copy(source, destination)
+        digest = read_sif_digest(source)
+        if digest is not None:
+            get_sif_digest_path(destination).write_text(digest)
+    except BaseException as exc:
+        future.set_exception(exc)
+    else:
+        future.set_result(None)
+
+
+def load_pull_durations(path: Path) -> dict[str, float]:
+    """Load the durations of previous pulls, or return none if they are unreadable."""
+    try:
+        return PULL_DURATIONS_ADAPTER.validate_json(path.read_bytes())
+    except (OSError, ValidationError):
+        return {}
+
+
+def save_pull_durations(path: Path, durations: Mapping[str, float]) -> None:
+    """Record the durations of pulls, adding to those already recorded."""
+    all_durations = load_pull_durations(path) | dict(durations)
+    path.write_bytes(PULL_DURATIONS_ADAPTER.dump_json(all_durations, indent=2))
@@ -1,9 +1,24 @@
+import logging
 import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
 
+from .apptainer import PullScheduler
+from .download_cache import DownloadCache
+from .errors import DeployToolsError
 from .layout import Layout
 from .models.changes import DeploymentChanges
+from .models.module import Module
 from .module_builder import ModuleBuilder
-from .templater import Templater
+from .templater import get_templater
+
+logger = logging.getLogger(__name__)
+
+# Binaries are downloaded separately from the Apptainer images of the PullScheduler
+MAX_DOWNLOADS = 4
+
+
+class BuildError(DeployToolsError):
+    """Raised when more than one module fails to build."""
 
 
 def clean_build_area(layout: Layout) -> None:
@@ -14,14 +29,113 @@ def clean_build_area(layout: Layout) -> None:
         shutil.rmtree(build_path)
 
 
-def build(changes: DeploymentChanges, layout: Layout) -> None:
-    """Build all modules that are to be added or updated."""
+def build(
+    changes: DeploymentChanges,
+    layout: Layout,
+    max_workers: int | None = None,
+    pull_scheduler: PullScheduler | None = None,
+    download_cache: DownloadCache | None = None,
+) -> None:
+    """Build all modules that are to be added or updated.
+
+    Each module is built in its own folder of the build area, so modules are built
+    concurrently. Building is split into two overlapping stages: a module's Apptainer
+    images and binaries are fetched in the background, while its modulefile,
+    entrypoints and snapshot are rendered, so rendering never waits for downloads. A
+    module that fails to build does not stop the others: once every module has been
+    rendered and fetched, a single failure is raised as it is, and several failures are
+    raised together as a ``BuildError``.
+
+    Args:
+        changes: The changes to the Deployment, including the Releases to build.
+        layout: The ``Layout`` representing the Deployment Area.
+        max_workers: Maximum number of modules to build at once. Defaults to a number
+            based on the CPU count. With 1, modules are built in order, stopping at the
+            first failure.
+        pull_scheduler: Scheduler to pull Apptainer images with. By default, one with
+            the default limits is used.
+        download_cache: Cache to take binaries from, and add downloaded binaries to.
+    """
     release_changes = changes.release_changes
     releases = release_changes.to_add + release_changes.to_update
 
     if releases:
-        templater = Templater()
-        module_builder = ModuleBuilder(templater, layout)
+        modules = [release.module for release in releases]
+        if pull_scheduler is None:
+            with PullScheduler() as pull_scheduler:
+                _build_modules(
+                    modules, layout, max_workers, pull_scheduler, download_cache
+                )
+        else:
+            _build_modules(modules, layout, max_workers, pull_scheduler, download_cache)
+
+
+def _build_modules(
+    modules: list[Module],
+    layout: Layout,
+    max_workers: int | None,
+    pull_scheduler: PullScheduler,
+    download_cache: DownloadCache | None,
+) -> None:
+    errors: list[tuple[Module, BaseException]] = []
+    fetches: list[list[Future[None]]] = []
+
+    if max_workers == 1:
+        module_builder = ModuleBuilder(
+            get_templater(), layout, pull_scheduler, download_cache
+        )
+        for module in modules:
+            fetches.append(module_builder.create_module(module))
+    else:
+        with (
+            ThreadPoolExecutor(
+                MAX_DOWNLOADS, thread_name_prefix="fetch"
+            ) as fetch_executor,
+            ThreadPoolExecutor(max_workers, thread_name_prefix="build") as executor,
+        ):
+            module_builder = ModuleBuilder(
+                get_templater(), layout, pull_scheduler, download_cache, fetch_executor
+            )
+            futures = [
+                executor.submit(module_builder.create_module, module)
+                for module in modules
+            ]
+
+        for module, future in zip(modules, futures, strict=True):
+            if (exc := future.exception()) is not None:
+                errors.append((module, exc))
+                fetches.append([])
+            else:
+                fetches.append(future.result())
+
+    # Each module is only complete once its images and binaries have been fetched
+    for module, module_fetches in zip(modules, fetches, strict=True):
+        for fetch in module_fetches:
+            if (exc := fetch.exception()) is not None:
+                errors.append((module, exc))
+
+    positions = {id(module): position for position, module in enumerate(modules)}
+    errors.sort(key=lambda error: positions[id(error[0])])
+    _raise_build_errors(errors)
+
+
+def _raise_build_errors(errors: list[tuple[Module, BaseException]]) -> None:
+    """Raise the errors of any failed builds."""
+    if len(errors) == 1:
+        raise errors[0][1]
+
+    if errors:
+        for module, exc in errors:
+            logger.error(
+                "Failed to build module %s/%s",
+                module.name,
+                module.version,
+                exc_info=exc,
+            )
 
-        for release in releases:
-            module_builder.create_module(release.module)
+        raise BuildError(
+            f"Failed to build {len(errors)} modules:\n"
+            + "\n".join(
+                f"{module.name}/{module.version}: {exc}" for module, exc in errors
+            )
+        ) from errors[0][1]
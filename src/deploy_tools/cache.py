@@ -0,0 +1,173 @@
+import logging
+import os
+import shutil
+import uuid
+from collections.abc import Iterator
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+logger = logging.getLogger(__name__)
+
+# Entries are spread over sub-folders named by the first characters of their key, so no
+# single directory grows too large for a shared filesystem to list efficiently
+KEY_PREFIX_LENGTH = 2
+TEMPORARY_FILE_PREFIX = ".tmp-"
+GITIGNORE_FILENAME = ".gitignore"
+
+
+class FileStore:
+    """A folder of files addressed by key, evicted in least-recently-used order.
+
+    Keys are expected to be hex digests or other filesystem-safe strings. Writes go
+    through a temporary file that is atomically renamed into place, so concurrent
+    readers (including other processes) only ever see complete entries. An entry's
+    modification time records when it was last used, as access times are unreliable on
+    shared filesystems.
+    """
+
+    def __init__(self, root: Path, max_size: int | None = None) -> None:
+        self._root = root
+        self._max_size = max_size
+
+    @property
+    def root(self) -> Path:
+        """Root folder of the store."""
+        return self._root
+
+    def get_path(self, key: str) -> Path:
+        """Return the path that the entry for the given key is stored at."""
+        return self._root / key[:KEY_PREFIX_LENGTH] / key
+
+    def get(self, key: str) -> Path | None:
+        """Return the path of the entry for the given key, or None if not present.
+
+        A hit marks the entry as recently used.
+        """
+        path = self.get_path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    def read_bytes(self, key: str) -> bytes | None:
+        """Return the contents of the entry for the given key, or None if absent."""
+        path = self.get(key)
+        if path is None:
+            return None
+
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:  # Evicted by another process
+            return None
+
+    def put_bytes(self, key: str, data: bytes) -> Path:
+        """Store the given contents under the given key."""
+        path = self.get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with NamedTemporaryFile(
+            dir=path.parent, prefix=TEMPORARY_FILE_PREFIX, delete=False
+        ) as f:
+            f.write(data)
+
+        Path(f.name).replace(path)
+        return path
+
+    def put_file(self, key: str, source: Path) -> Path:
+        """Store a copy of the given file under the given key.
+
+        The entry is hard-linked to the source where possible, so that no data is copied
+        when the store is on the same filesystem.
+        """
+        path = self.get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary_path = path.with_name(TEMPORARY_FILE_PREFIX + uuid.uuid4().hex)
+        link_or_copy(source, temporary_path)
+        temporary_path.replace(path)
+        return path
+
+    def remove(self, key: str) -> None:
+        """Remove the entry for the given key, if present."""
+        self.get_path(key).unlink(missing_ok=True)
+
+    def iter_entries(self) -> Iterator[tuple[str, Path]]:
+        """Yield the key and path of every complete entry in the store."""
+        for path in self._root.glob("*/*"):
+            if not path.name.startswith(TEMPORARY_FILE_PREFIX):
+                yield path.name, path
+
+    def get_usage(self) -> tuple[int, int]:
+        """Return the number of entries in the store, and their total size in bytes."""
+        sizes = [stat.st_size for _, stat in self._iter_entry_stats()]
+        return len(sizes), sum(sizes)
+
+    def evict(self, max_size: int | None = None) -> int:
+        """Remove least-recently-used entries until the store fits the size limit.
+
+        Args:
+            max_size: Size limit in bytes. Defaults to the limit given on creation; if
+                neither is set, nothing is evicted.
+
+        Returns:
+            The number of bytes removed.
+        """
+        if max_size is None:
+            max_size = self._max_size
+            if max_size is None:
+                return 0
+
+        entries = list(self._iter_entry_stats())
+        total_size = sum(stat.st_size for _, stat in entries)
+        removed = 0
+
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            if total_size - removed <= max_size:
+                break
+
+            logger.debug("Evicting cache entry: %s", path)
+            path.unlink(missing_ok=True)
+            removed += stat.st_size
+
+        return removed
+
+    def _iter_entry_stats(self) -> Iterator[tuple[Path, os.stat_result]]:
+        """Yield the path and stat of every entry that still exists.
+
+        Another process may remove an entry between it being listed and its stat.
+        """
+        for _, path in self.iter_entries():
+            try:
+                yield path, path.stat()
+            except FileNotFoundError:
+                continue
+
+    def clear(self) -> None:
+        """Remove the store and all of its entries."""
+        if self._root.exists():
+            shutil.rmtree(self._root)
+
+
+def link_or_copy(source: Path, destination: Path) -> None:
+    """Hard-link the source file to the destination, falling back to a copy.
+
+    A copy is needed whenever the two paths are on different filesystems.
+    """
+    try:
+        destination.hardlink_to(source)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def create_ignored_folder(path: Path) -> None:
+    """Create a folder that git ignores, along with everything in it.
+
+    The folder holds its own ``.gitignore``, so this works inside any repository
+    without changing the repository's ignore rules.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    gitignore = path / GITIGNORE_FILENAME
+    if not gitignore.exists():
+        gitignore.write_text("*\n")
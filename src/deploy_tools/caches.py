@@ -0,0 +1,64 @@
+import logging
+from pathlib import Path
+
+from .apptainer import (
+    DEFAULT_APPTAINER_CACHE_SIZE,
+    DEFAULT_SIF_STORE_SIZE,
+    ApptainerCache,
+    SifStore,
+)
+from .download_cache import DownloadCache
+from .layout import Layout
+
+logger = logging.getLogger(__name__)
+
+GIB = 1024**3
+
+
+def print_cache_stats(
+    deployment_root: Path, apptainer_cache_dir: Path | None = None
+) -> None:
+    """Print the number of entries in each of the deployment area's caches, and size."""
+    layout = Layout(deployment_root)
+    usages = {
+        "SIF store": SifStore(layout.sif_store_root).get_usage(),
+        "Downloads": DownloadCache(layout.cache_root).get_usage(),
+        "Apptainer cache": ApptainerCache(
+            apptainer_cache_dir or layout.apptainer_cache_root
+        ).get_usage(),
+    }
+
+    for name, (count, size) in usages.items():
+        print(f"{name}: {count} entries ({_format_size(size)})")
+
+
+def prune_caches(
+    deployment_root: Path,
+    sif_store_size: int = DEFAULT_SIF_STORE_SIZE,
+    apptainer_cache_dir: Path | None = None,
+    apptainer_cache_size: int = DEFAULT_APPTAINER_CACHE_SIZE,
+) -> None:
+    """Remove cached files that the deployment area no longer needs.
+
+    Stored Apptainer images that no deployed Module still references are removed.
+    Deprecated Modules are still deployed, so their images are kept. Least-recently-used
+    images and Apptainer layers are then removed until each cache fits within its size.
+    """
+    layout = Layout(deployment_root)
+    sif_store = SifStore(layout.sif_store_root)
+
+    logger.info("Pruning unreferenced SIF files from: %s", layout.sif_store_root)
+    count, removed = sif_store.prune(layout.modules_root)
+    print(f"Pruned {count} unreferenced SIF files ({_format_size(removed)})")
+
+    removed = sif_store.evict(sif_store_size)
+    print(f"Evicted {_format_size(removed)} of least-recently-used SIF files")
+
+    apptainer_cache = ApptainerCache(apptainer_cache_dir or layout.apptainer_cache_root)
+    logger.info("Evicting Apptainer cache: %s", apptainer_cache.root)
+    removed = apptainer_cache.evict(apptainer_cache_size)
+    print(f"Evicted {_format_size(removed)} of least-recently-used Apptainer layers")
+
+
+def _format_size(size: int) -> str:
+    return f"{size / GIB:.2f} GiB"
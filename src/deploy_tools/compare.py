@@ -4,7 +4,6 @@ from collections import defaultdict
 from pathlib import Path
 from typing import Any
 
-import yaml
 from pydantic import TypeAdapter
 
 from .errors import DeployToolsError
@@ -16,7 +15,7 @@ from .models.deployment import (
     ReleasesByNameAndVersion,
 )
 from .models.module import Module, Release
-from .models.save_and_load import load_from_yaml
+from .models.save_and_load import dumps_yaml, load_from_yaml
 from .modulefile import get_default_modulefile_version, get_deployed_modulefile_versions
 from .snapshot import load_snapshot, load_snapshot_from_ref
 from .validate import validate_default_versions
@@ -90,7 +89,7 @@ def _reconstruct_deployment_config_from_modules(layout: Layout) -> Deployment:
     deployment = Deployment(settings=DeploymentSettings(), releases=releases)
 
     # Only non-deprecated (live) modules are associated with a .version file
-    live_names = list(deployment.get_final_deployed_modules())
+    live_names = list(deployment.index.final_modules)
     deployment.settings.default_versions = _collect_default_modulefile_versions(
         layout, live_names
     )
@@ -206,4 +205,4 @@ def _yaml_dumps(obj: dict[str, Any], indent: int | None = None) -> str:
     ta = TypeAdapter(dict[str, Any])
     # Dump in JSON mode so pydantic special types (e.g. AnyUrl) are coerced to YAML-safe
     # primitives
-    return yaml.safe_dump(ta.dump_python(obj, mode="json"), indent=indent)
+    return dumps_yaml(ta.dump_python(obj, mode="json"), indent=indent)
@@ -0,0 +1,153 @@
+from collections import defaultdict, deque
+from collections.abc import Iterable
+
+from .errors import DeployToolsError
+from .models.deployment import DefaultVersionsByName, Deployment
+from .models.module import ModuleDependency
+
+type ModuleKey = tuple[str, str]  # Module name and version
+
+
+class DependencyCycleError(DeployToolsError):
+    """Raised when Module dependencies form a cycle, so cannot be ordered."""
+
+
+class DependencyGraph:
+    """Graph of the dependencies between the Modules of a Deployment.
+
+    Every Release, including deprecated Releases, is a node. Each Module has an edge to
+    every dependency that is a Module managed by the same Deployment: the pinned version
+    if one is given, otherwise the dependency's default version. Dependencies on names
+    that have no deployed (non-deprecated) versions are outside the Deployment, so they
+    are not part of the graph.
+
+    Pinned dependencies on versions that will not be deployed are recorded as unknown,
+    rather than as edges.
+    """
+
+    def __init__(
+        self, deployment: Deployment, default_versions: DefaultVersionsByName
+    ) -> None:
+        index = deployment.index
+        self._dependencies: dict[ModuleKey, list[ModuleKey]] = {}
+        self._dependents: dict[ModuleKey, list[ModuleKey]] = defaultdict(list)
+        self._unknown: list[tuple[ModuleKey, ModuleDependency]] = []
+
+        for name, release_versions in deployment.releases.items():
+            for version, release in release_versions.items():
+                key = (name, version)
+                self._dependencies[key] = []
+
+                for dependency in release.module.dependencies:
+                    if dependency.name not in index.final_versions:
+                        continue
+
+                    dep_version = dependency.version
+                    if dep_version is None:
+                        dep_version = default_versions.get(dependency.name)
+                        if dep_version is None:
+                            continue
+                    elif not index.is_final_version(dependency.name, dep_version):
+                        self._unknown.append((key, dependency))
+                        continue
+
+                    dep_key = (dependency.name, dep_version)
+                    self._dependencies[key].append(dep_key)
+                    self._dependents[dep_key].append(key)
+
+    @property
+    def unknown_dependencies(self) -> list[tuple[ModuleKey, ModuleDependency]]:
+        """Pinned dependencies on managed Modules whose version will not be deployed."""
+        return self._unknown
+
+    def __contains__(self, key: ModuleKey) -> bool:
+        return key in self._dependencies
+
+    def get_dependencies(self, name: str, version: str) -> list[ModuleKey]:
+        """Return the Modules that the given Module directly depends on."""
+        return list(self._dependencies.get((name, version), []))
+
+    def get_dependents(self, name: str, version: str) -> list[ModuleKey]:
+        """Return the Modules that directly depend on the given Module."""
+        return list(self._dependents.get((name, version), []))
+
+    def get_affected(self, keys: Iterable[ModuleKey]) -> set[ModuleKey]:
+        """Return every Module that depends on any given Module, directly or not.
+
+        This is the set of Modules whose behaviour may change when the given Modules
+        change. The given Modules are not included, unless they depend on each other.
+        """
+        affected: set[ModuleKey] = set()
+        queue = deque(keys)
+        while queue:
+            for dependent in self._dependents.get(queue.popleft(), []):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+
+        return affected
+
+    def find_cycle(self) -> list[ModuleKey] | None:
+        """Return a dependency cycle, if there is one.
+
+        The cycle starts and ends at the same Module: the first of its Modules in name
+        and version order, so the same cycle is always reported in the same way.
+        """
+        finished: set[ModuleKey] = set()
+        for root in self._dependencies:
+            if root in finished:
+                continue
+
+            # Depth-first search, keeping the current path to report any cycle found
+            path: list[ModuleKey] = [root]
+            on_path: set[ModuleKey] = {root}
+            stack = [iter(self._dependencies[root])]
+            while stack:
+                dep_key = next(stack[-1], None)
+                if dep_key is None:
+                    stack.pop()
+                    finished.add(path[-1])
+                    on_path.discard(path.pop())
+                elif dep_key in on_path:
+                    return _rotate_cycle(path[path.index(dep_key) :])
+                elif dep_key not in finished:
+                    path.append(dep_key)
+                    on_path.add(dep_key)
+                    stack.append(iter(self._dependencies[dep_key]))
+
+        return None
+
+    def get_topological_order(self) -> list[ModuleKey]:
+        """Return every Module, ordered so that each comes after its dependencies.
+
+        The order follows that of the Deployment's Releases where dependencies allow.
+        """
+        remaining = {key: len(deps) for key, deps in self._dependencies.items()}
+        queue = deque(key for key, count in remaining.items() if count == 0)
+        order: list[ModuleKey] = []
+        while queue:
+            key = queue.popleft()
+            order.append(key)
+            for dependent in self._dependents.get(key, []):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    queue.append(dependent)
+
+        if len(order) < len(remaining):
+            cycle = self.find_cycle() or []
+            raise DependencyCycleError(
+                f"Module dependencies form a cycle: {format_dependency_chain(cycle)}"
+            )
+
+        return order
+
+
+def format_dependency_chain(keys: Iterable[ModuleKey]) -> str:
+    """Return a chain of dependent Modules as ``name/version`` strings."""
+    return " -> ".join(f"{name}/{version}" for name, version in keys)
+
+
+def _rotate_cycle(cycle: list[ModuleKey]) -> list[ModuleKey]:
+    start = cycle.index(min(cycle))
+    rotated = cycle[start:] + cycle[:start]
+    return rotated + rotated[:1]
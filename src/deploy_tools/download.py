@@ -0,0 +1,151 @@
+import hashlib
+import logging
+from http.client import HTTPException, IncompleteRead
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from .errors import DeployToolsError
+from .models.binary_app import HashType
+
+if TYPE_CHECKING:
+    from hashlib import _Hash  # pyright: ignore[reportPrivateUsage]
+
+logger = logging.getLogger(__name__)
+
+# Large enough to keep the number of writes to a shared filesystem low
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+DOWNLOAD_ATTEMPTS = 3
+DOWNLOAD_TIMEOUT = 60
+PARTIAL_DOWNLOAD_SUFFIX = ".part"
+
+HTTP_PARTIAL_CONTENT = 206
+HTTP_RANGE_NOT_SATISFIABLE = 416
+
+
+class DownloadError(DeployToolsError):
+    """Raised when a file cannot be downloaded."""
+
+
+class HashMismatchError(DownloadError):
+    """Raised when a downloaded file does not match its expected hash."""
+
+
+def download_file(
+    url: str,
+    destination: Path,
+    hash_type: HashType = HashType.NONE,
+    expected_hash: str = "",
+    attempts: int = DOWNLOAD_ATTEMPTS,
+) -> None:
+    """Download a file in a single pass, hashing it as it is written.
+
+    The file is written to a temporary name beside the destination, which is only
+    renamed into place once its hash matches, so the destination never holds a partial
+    or unverified file. An interrupted transfer is resumed from where it stopped with an
+    HTTP range request, if the server supports them, and restarted otherwise.
+
+    Args:
+        url: URL to download from.
+        destination: Path to write the file to.
+        hash_type: Type of the expected hash, or ``HashType.NONE`` to skip the check.
+        expected_hash: Hex digest that the file must match.
+        attempts: Number of times to try the transfer before giving up.
+
+    Raises:
+        HashMismatchError: If the file does not match the expected hash.
+        DownloadError: If the file could not be downloaded.
+    """
+    download = _PartialDownload(destination, hash_type)
+    try:
+        for attempt in range(1, attempts + 1):
+            try:
+                download.fetch(url)
+                break
+            except HTTPError as exc:
+                if exc.code < 500 or attempt == attempts:
+                    raise DownloadError(f"Failed to download {url}:\n{exc}") from exc
+            except (OSError, HTTPException) as exc:
+                if attempt == attempts:
+                    raise DownloadError(f"Failed to download {url}:\n{exc}") from exc
+
+            logger.warning(
+                "Download of %s interrupted after %d bytes, retrying",
+                url,
+                download.size,
+            )
+
+        digest = download.hexdigest()
+        if digest is not None and digest != expected_hash:
+            raise HashMismatchError(f"Downloaded file {url} hash check failed")
+
+        download.path.replace(destination)
+    finally:
+        download.path.unlink(missing_ok=True)
+
+
+class _PartialDownload:
+    """A file being downloaded to a temporary path, along with its hash so far."""
+
+    def __init__(self, destination: Path, hash_type: HashType) -> None:
+        self.path = destination.with_name(destination.name + PARTIAL_DOWNLOAD_SUFFIX)
+        self.path.unlink(missing_ok=True)
+        self.size = 0
+        self._hash_type = hash_type
+        self._hasher = self._new_hasher()
+        self._etag: str | None = None
+
+    def hexdigest(self) -> str | None:
+        """Return the hash of the file, or None if it is not being hashed."""
+        return self._hasher.hexdigest() if self._hasher is not None else None
+
+    def fetch(self, url: str) -> None:
+        """Fetch the rest of the file, continuing from what was already written."""
+        headers: dict[str, str] = {}
+        if self.size:
+            headers["Range"] = f"bytes={self.size}-"
+            if self._etag is not None:
+                # Ask for the whole file instead if it has changed since it was started
+                headers["If-Range"] = self._etag
+
+        try:
+            response = urlopen(Request(url, headers=headers), timeout=DOWNLOAD_TIMEOUT)
+        except HTTPError as exc:
+            if exc.code == HTTP_RANGE_NOT_SATISFIABLE and self.size:
+                return  # Everything was already written
+
+            raise
+
+        with response:
+            if self.size and response.status != HTTP_PARTIAL_CONTENT:
+                logger.debug("Server ignored range request, restarting: %s", url)
+                self._restart()
+
+            self._etag = response.headers.get("ETag", self._etag)
+            expected_length = response.headers.get("Content-Length")
+            received = 0
+            with open(self.path, "ab") as f:
+                # Drop anything written after the last complete chunk
+                f.truncate(self.size)
+                while chunk := response.read(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    self.size += len(chunk)
+                    received += len(chunk)
+                    if self._hasher is not None:
+                        self._hasher.update(chunk)
+
+            # A closed connection ends a read early rather than failing it
+            if expected_length is not None and received < int(expected_length):
+                raise IncompleteRead(b"", int(expected_length) - received)
+
+    def _restart(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.size = 0
+        self._hasher = self._new_hasher()
+
+    def _new_hasher(self) -> "_Hash | None":
+        if self._hash_type == HashType.NONE:
+            return None
+
+        return hashlib.new(self._hash_type)
@@ -0,0 +1,67 @@
+import hashlib
+import logging
+from pathlib import Path
+
+from .cache import FileStore, link_or_copy
+from .models.binary_app import BinaryApp, HashType
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CACHE_FOLDER = "downloads"
+DEFAULT_DOWNLOAD_CACHE_SIZE = 4 * 1024**3
+
+
+class DownloadCache:
+    """Persistent store of downloaded binaries, shared by every Module that uses them.
+
+    A binary with a hash is keyed by its hash type and hash, so it is found whichever
+    URL it was first downloaded from. A binary without a hash is keyed by its URL.
+    Binaries are only stored once they have passed their hash check, and are
+    hard-linked out of the store where possible. The store is evicted in
+    least-recently-used order beyond ``max_size`` bytes.
+    """
+
+    def __init__(
+        self, cache_root: Path, max_size: int = DEFAULT_DOWNLOAD_CACHE_SIZE
+    ) -> None:
+        self._store = FileStore(cache_root / DOWNLOAD_CACHE_FOLDER, max_size)
+
+    @staticmethod
+    def get_key(app: BinaryApp) -> str:
+        """Return the key of the entry for a binary application's download."""
+        if app.hash_type == HashType.NONE:
+            source = f"url:{app.url}"
+        else:
+            source = f"{app.hash_type}:{app.hash}"
+
+        return hashlib.sha256(source.encode()).hexdigest()
+
+    def link(self, app: BinaryApp, destination: Path) -> bool:
+        """Link the stored download for the application to the given path, if present.
+
+        Returns:
+            Whether the download was found in the store.
+        """
+        path = self._store.get(self.get_key(app))
+        if path is None:
+            return False
+
+        try:
+            link_or_copy(path, destination)
+        except FileNotFoundError:  # Evicted by another process
+            return False
+
+        logger.debug("Using cached download of %s", app.url)
+        return True
+
+    def put(self, app: BinaryApp, path: Path) -> None:
+        """Store the verified download for the application."""
+        self._store.put_file(self.get_key(app), path)
+
+    def get_usage(self) -> tuple[int, int]:
+        """Return the number of binaries in the cache, and their total size in bytes."""
+        return self._store.get_usage()
+
+    def evict(self) -> None:
+        """Remove least-recently-used entries beyond the cache's size limit."""
+        self._store.evict()
@@ -1,4 +1,6 @@
+import os
 import subprocess
+from collections.abc import Mapping
 from pathlib import Path
 from typing import Any
 
@@ -15,6 +17,7 @@ def run_command(
     check: bool = False,
     capture_output: bool = False,
     text: bool = False,
+    env: Mapping[str, str] | None = None,
 ) -> subprocess.CompletedProcess[Any]:
     """Run an external command, surfacing tool problems as clean domain errors.
 
@@ -27,6 +30,8 @@ def run_command(
         check: If True, raise when the command exits with a non-zero status.
         capture_output: If True, capture the command's stdout and stderr.
         text: If True, decode captured output as text rather than bytes.
+        env: Environment variables to set for the command, in addition to those of
+            the current process.
 
     Returns:
         The ``subprocess.CompletedProcess`` for the finished command.
@@ -38,7 +43,11 @@ def run_command(
     executable = str(command[0])
     try:
         return subprocess.run(
-            command, check=check, capture_output=capture_output, text=text
+            command,
+            check=check,
+            capture_output=capture_output,
+            text=text,
+            env=os.environ | dict(env) if env is not None else None,
         )
     except FileNotFoundError as exc:
         raise ExternalToolError(
@@ -0,0 +1,198 @@
+import logging
+from pathlib import Path
+
+from git import GitCommandError, InvalidGitRepositoryError, NoSuchPathError, Repo
+
+from .layout import Layout
+from .models.config_cache import ConfigCache
+from .models.deployment import Deployment, ReleasesByNameAndVersion
+from .models.save_and_load import (
+    YAML_FILE_SUFFIX,
+    load_deployment,
+    load_release_files,
+    load_settings,
+)
+
+logger = logging.getLogger(__name__)
+
+# Git trailer used in the deployment area's sync commits to record the configuration
+# commit that the snapshot was created from
+CONFIG_COMMIT_TRAILER = "Config-Commit"
+
+
+def get_config_commit(config_folder: Path) -> str | None:
+    """Return the commit that the configuration folder is checked out at.
+
+    None is returned if the folder is not in a git repository, or if it has any
+    uncommitted or untracked changes (so no commit fully describes its contents).
+    """
+    repo = _open_repo(config_folder)
+    if repo is None:
+        return None
+
+    with repo:
+        if not repo.head.is_valid():
+            return None
+
+        relative_folder = _get_repo_relative_path(repo, config_folder)
+        if repo.is_dirty(untracked_files=True, path=relative_folder):
+            return None
+
+        return repo.head.commit.hexsha
+
+
+def get_recorded_config_commit(layout: Layout) -> str | None:
+    """Return the configuration commit recorded by the last sync of the area, if any.
+
+    None is returned if the snapshot has been modified since that sync was committed.
+    """
+    repo = _open_repo(layout.deployment_root, search_parent_directories=False)
+    if repo is None:
+        return None
+
+    with repo:
+        if not repo.head.is_valid():
+            return None
+
+        snapshot_paths = (
+            layout.DEPLOYMENT_SNAPSHOT_FILENAME,
+            layout.SNAPSHOT_FOLDER_NAME,
+        )
+        if any(repo.is_dirty(path=path) for path in snapshot_paths):
+            return None
+
+        message = repo.head.commit.message
+        if isinstance(message, bytes):
+            message = message.decode()
+
+    prefix = f"{CONFIG_COMMIT_TRAILER}: "
+    for line in reversed(message.splitlines()):
+        if line.startswith(prefix):
+            return line.removeprefix(prefix).strip()
+
+    return None
+
+
+def load_deployment_incremental(
+    config_folder: Path,
+    layout: Layout,
+    snapshot: Deployment,
+    max_workers: int | None = None,
+    cache: ConfigCache | None = None,
+) -> Deployment:
+    """Load Deployment configuration, only reading files changed since the last sync.
+
+    The snapshot in the deployment area is an exact copy of the configuration at the
+    commit recorded by the last sync. Only the ``<name>/<version>`` files that differ
+    from that commit (including uncommitted and untracked files) are loaded; every other
+    Release is taken from the snapshot. If no usable commit is recorded, or the
+    configuration folder is not a git repository containing it, the whole configuration
+    is loaded instead.
+
+    Args:
+        config_folder: Folder containing the deployment configuration.
+        layout: The ``Layout`` representing the Deployment Area.
+        snapshot: The Deployment loaded from the area's snapshot.
+        max_workers: See ``load_deployment``.
+        cache: See ``load_deployment``.
+    """
+    base_commit = get_recorded_config_commit(layout)
+    changed_paths = None
+    if base_commit is not None:
+        changed_paths = _get_changed_version_paths(config_folder, base_commit)
+
+    if changed_paths is None:
+        logger.info("No usable configuration commit for snapshot, loading all files")
+        return load_deployment(config_folder, max_workers, cache)
+
+    logger.info(
+        "Loading %d configuration files changed since commit %s",
+        len(changed_paths),
+        base_commit,
+    )
+    releases: ReleasesByNameAndVersion = {
+        name: dict(release_versions)
+        for name, release_versions in snapshot.releases.items()
+    }
+
+    # Any changed path replaces the snapshot Release that was loaded from it
+    for version_path in changed_paths:
+        name = version_path.parent.name
+        version = (
+            version_path.stem
+            if version_path.suffix == YAML_FILE_SUFFIX
+            else version_path.name
+        )
+        releases.get(name, {}).pop(version, None)
+
+    existing_paths = [path for path in changed_paths if path.exists()]
+    changed_releases = load_release_files(
+        config_folder, existing_paths, max_workers, cache
+    )
+    for name, release_versions in changed_releases.items():
+        releases.setdefault(name, {}).update(release_versions)
+
+    releases = {
+        name: release_versions
+        for name, release_versions in releases.items()
+        if release_versions
+    }
+    return Deployment.model_construct(
+        settings=load_settings(config_folder), releases=releases
+    )
+
+
+def _get_changed_version_paths(
+    config_folder: Path, base_commit: str
+) -> list[Path] | None:
+    """Return the ``<name>/<version>`` paths that differ from the given commit.
+
+    This includes uncommitted and untracked files. Paths nested more deeply are reduced
+    to their ``<name>/<version>`` ancestor, which a full load would also reject.
+    """
+    repo = _open_repo(config_folder)
+    if repo is None:
+        return None
+
+    with repo:
+        relative_folder = _get_repo_relative_path(repo, config_folder)
+        try:
+            changed = repo.git.diff(
+                "--name-only", "--no-renames", "-z", base_commit, "--", relative_folder
+            )
+        except GitCommandError:
+            # e.g. the commit is not in a shallow clone, or history was rewritten
+            return None
+
+        untracked = repo.git.ls_files("--others", "-z", "--", relative_folder)
+        repo_root = _get_repo_root(repo)
+
+    config_root = config_folder.resolve()
+    version_paths: set[Path] = set()
+    for path in f"{changed}\0{untracked}".split("\0"):
+        if not path:
+            continue
+
+        parts = (repo_root / path).relative_to(config_root).parts
+        if len(parts) >= 2:
+            version_paths.add(config_folder / parts[0] / parts[1])
+
+    return sorted(version_paths)
+
+
+def _open_repo(path: Path, search_parent_directories: bool = True) -> Repo | None:
+    try:
+        return Repo(path, search_parent_directories=search_parent_directories)
+    except (InvalidGitRepositoryError, NoSuchPathError):
+        return None
+
+
+def _get_repo_root(repo: Repo) -> Path:
+    if repo.working_tree_dir is None:
+        raise InvalidGitRepositoryError("Bare repositories are not supported")
+
+    return Path(repo.working_tree_dir).resolve()
+
+
+def _get_repo_relative_path(repo: Repo, path: Path) -> str:
+    return str(path.resolve().relative_to(_get_repo_root(repo)))
@@ -62,6 +62,14 @@ class Layout:
     DEFAULT_VERSION_FILENAME = ".version"
 
     DEPLOYMENT_SNAPSHOT_FILENAME = "deployment.yaml"
+    DEPLOYMENT_DIGESTS_FILENAME = "deployment-digests.json"
+    SNAPSHOT_FOLDER_NAME = "snapshot"
+    SNAPSHOT_MANIFEST_FILENAME = "manifest.yaml"
+    SNAPSHOT_MODULES_FOLDER_NAME = "modules"
+    CACHE_ROOT_NAME = ".cache"
+    PULL_DURATIONS_FILENAME = "pull-durations.json"
+    SIF_STORE_FOLDER_NAME = "sif"
+    APPTAINER_CACHE_FOLDER_NAME = "apptainer"
 
     def __init__(self, deployment_root: Path, build_root: Path | None = None) -> None:
         self._root = deployment_root
@@ -80,6 +88,11 @@ class Layout:
         """Return the folder holding the given deployed module's entrypoint scripts."""
         return self._modules_layout.get_entrypoints_folder(name, version)
 
+    def get_sif_files_folder(self, name: str, version: str) -> Path:
+        """Return the folder holding the given deployed module's Apptainer images."""
+        module_folder = self.get_module_folder(name, version)
+        return module_folder / ModuleBuildLayout.SIF_FILES_FOLDER
+
     def get_modulefiles_root(self, from_deprecated: bool = False) -> Path:
         """Return the modulefiles root, or the deprecated one if requested."""
         return (
@@ -102,6 +115,15 @@ class Layout:
         """Return the path to the given deployed module's configuration snapshot."""
         return self._modules_layout.get_module_snapshot_path(name, version)
 
+    def get_snapshot_shard_path(self, name: str, version: str) -> Path:
+        """Return the path to the given Module's file in a sharded snapshot."""
+        modules_root = self.snapshot_root / self.SNAPSHOT_MODULES_FOLDER_NAME
+        return modules_root / name / f"{version}.yaml"
+
+    def get_trusted_snapshot_path(self, snapshot_sha256: str) -> Path:
+        """Return the path to the fast-loading copy of the snapshot with a checksum."""
+        return self.cache_root / f"deployment-{snapshot_sha256}.json"
+
     def get_default_version_file(self, name: str) -> Path:
         """Return the path to the file recording a module's default version."""
         return self.modulefiles_root / name / self.DEFAULT_VERSION_FILENAME
@@ -136,6 +158,41 @@ class Layout:
         """Path to the deployment area's configuration snapshot."""
         return self._root / self.DEPLOYMENT_SNAPSHOT_FILENAME
 
+    @property
+    def deployment_digests_path(self) -> Path:
+        """Path to the Module digests recorded alongside the configuration snapshot."""
+        return self._root / self.DEPLOYMENT_DIGESTS_FILENAME
+
+    @property
+    def snapshot_root(self) -> Path:
+        """Root path of a sharded configuration snapshot."""
+        return self._root / self.SNAPSHOT_FOLDER_NAME
+
+    @property
+    def snapshot_manifest_path(self) -> Path:
+        """Path to the manifest of a sharded configuration snapshot."""
+        return self.snapshot_root / self.SNAPSHOT_MANIFEST_FILENAME
+
+    @property
+    def cache_root(self) -> Path:
+        """Root path for files that only speed up later runs, which git ignores."""
+        return self._root / self.CACHE_ROOT_NAME
+
+    @property
+    def pull_durations_path(self) -> Path:
+        """Path to the record of how long each Apptainer image took to pull."""
+        return self.cache_root / self.PULL_DURATIONS_FILENAME
+
+    @property
+    def sif_store_root(self) -> Path:
+        """Root path of the store of previously pulled Apptainer images."""
+        return self.cache_root / self.SIF_STORE_FOLDER_NAME
+
+    @property
+    def apptainer_cache_root(self) -> Path:
+        """Default root path of the cache that Apptainer keeps pulled layers in."""
+        return self.cache_root / self.APPTAINER_CACHE_FOLDER_NAME
+
     @property
     def build_layout(self) -> ModuleBuildLayout:
         """Return the `ModuleBuildLayout` for the associated build area."""
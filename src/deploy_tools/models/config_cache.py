@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import pydantic
+
+from .. import __version__
+from ..cache import FileStore
+from .module import Release
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CACHE_FOLDER = "config"
+DEFAULT_CONFIG_CACHE_SIZE = 256 * 1024 * 1024
+# Caches of other deploy-tools versions are only removed once unused for this long, as
+# several versions may share a cache folder, e.g. while CI runners are upgraded
+STALE_NAMESPACE_AGE = 7 * 24 * 60 * 60
+
+
+def _get_namespace() -> str:
+    """Return an identifier that changes whenever cached Releases could be stale.
+
+    Entries are only valid for the same deploy-tools and Pydantic versions, as well as
+    the same ``Release`` schema.
+    """
+    h = hashlib.sha256()
+    h.update(__version__.encode())
+    h.update(pydantic.VERSION.encode())
+    h.update(json.dumps(Release.model_json_schema(), sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+class ConfigCache:
+    """Persistent cache of validated ``Release`` objects from configuration files.
+
+    Entries are keyed by the file's path relative to the configuration folder and a hash
+    of its contents, so an unchanged file skips YAML parsing and Pydantic validation
+    entirely. The cache is invalidated as a whole when deploy-tools or the model schema
+    changes, and is evicted in least-recently-used order beyond ``max_size`` bytes. The
+    caches of other versions are removed once they have not been used for
+    ``STALE_NAMESPACE_AGE`` seconds.
+
+    Entries are stored as JSON and validated again when loaded, which Pydantic does
+    natively and far faster than parsing YAML. Loading an entry can therefore never run
+    code, but the cache folder must still only be writable by the pipeline, as an entry
+    decides the Release loaded for its file.
+    """
+
+    def __init__(
+        self, cache_root: Path, max_size: int = DEFAULT_CONFIG_CACHE_SIZE
+    ) -> None:
+        cache_folder = cache_root / CONFIG_CACHE_FOLDER
+        namespace = _get_namespace()
+
+        # Marks this version's cache as in use, so that it is not removed as stale
+        namespace_folder = cache_folder / namespace
+        namespace_folder.mkdir(parents=True, exist_ok=True)
+        os.utime(namespace_folder)
+
+        self._remove_stale_namespaces(cache_folder, namespace)
+        self._store = FileStore(namespace_folder, max_size)
+
+    def get(self, relative_path: Path, contents: bytes) -> Release | None:
+        """Return the cached Release for the given file, or None on a cache miss."""
+        data = self._store.read_bytes(self._get_key(relative_path, contents))
+        if data is None:
+            return None
+
+        try:
+            return Release.model_validate_json(data)
+        except ValueError:  # Including Pydantic's ValidationError
+            logger.debug("Ignoring corrupt config cache entry: %s", relative_path)
+            return None
+
+    def put(self, relative_path: Path, contents: bytes, release: Release) -> None:
+        """Cache the Release loaded from the given file."""
+        key = self._get_key(relative_path, contents)
+        self._store.put_bytes(key, release.model_dump_json().encode())
+
+    def evict(self) -> None:
+        """Remove least-recently-used entries beyond the cache's size limit."""
+        self._store.evict()
+
+    @staticmethod
+    def _get_key(relative_path: Path, contents: bytes) -> str:
+        h = hashlib.sha256(relative_path.as_posix().encode())
+        h.update(b"\0")
+        h.update(contents)
+        return h.hexdigest()
+
+    @staticmethod
+    def _remove_stale_namespaces(cache_folder: Path, namespace: str) -> None:
+        cutoff = time.time() - STALE_NAMESPACE_AGE
+        for path in cache_folder.iterdir():
+            if path.name == namespace:
+                continue
+
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+
+                logger.debug("Removing stale config cache: %s", path)
+                FileStore(path).clear()
+            except OSError as exc:  # Including removal by another process
+                logger.debug("Could not remove stale config cache: %s\n%s", path, exc)
@@ -1,6 +1,9 @@
 from collections import defaultdict
+from collections.abc import Iterable
+from functools import cached_property
 from typing import Annotated
 
+from natsort import natsorted
 from pydantic import Field
 
 from .module import Module, Release
@@ -9,9 +12,11 @@ from .parent import ParentModel
 type ReleasesByVersion = dict[str, Release]
 type ReleasesByNameAndVersion = dict[str, ReleasesByVersion]
 type DefaultVersionsByName = dict[str, str]
+type DigestsByNameAndVersion = dict[str, dict[str, str]]
 
 type ModulesByName = dict[str, list[Module]]
 type ModuleVersionsByName = dict[str, list[str]]
+type ModuleVersionSetsByName = dict[str, set[str]]
 
 
 class DeploymentSettings(ParentModel):
@@ -38,13 +43,33 @@ class Deployment(ParentModel):
     settings: DeploymentSettings
     releases: ReleasesByNameAndVersion
 
-    def get_final_deployed_modules(self) -> ModulesByName:
-        """Return modules that are expected to be deployed after a sync command.
+    @cached_property
+    def index(self) -> "DeploymentIndex":
+        """Views of the Releases that are derived once and shared by every user.
 
-        This explicitly excludes any deprecated modules.
+        The Releases must not be changed once the index has been used.
         """
-        final_modules: ModulesByName = defaultdict(list)
-        for name, release_versions in self.releases.items():
+        return DeploymentIndex(self.releases)
+
+
+class DeploymentIndex:
+    """Views of a Deployment's Releases, each computed once when first used.
+
+    Validation and comparison look up the same views many times over, so ``Deployment``
+    holds a single index rather than having every caller rebuild them.
+    """
+
+    def __init__(self, releases: ReleasesByNameAndVersion) -> None:
+        self._releases = releases
+
+    @cached_property
+    def final_modules(self) -> ModulesByName:
+        """Modules that are expected to be deployed after a sync command, by name.
+
+        This excludes deprecated Modules, and names that only have deprecated Modules.
+        """
+        final_modules: ModulesByName = {}
+        for name, release_versions in self._releases.items():
             modules = [
                 release.module
                 for release in release_versions.values()
@@ -56,14 +81,81 @@ class Deployment(ParentModel):
 
         return final_modules
 
-    def get_final_deployed_versions(self) -> ModuleVersionsByName:
-        """Return module versions that are expected to be deployed after a sync command.
+    @cached_property
+    def final_versions(self) -> ModuleVersionSetsByName:
+        """Versions of each Module name expected to be deployed after a sync command."""
+        return {
+            name: {module.version for module in modules}
+            for name, modules in self.final_modules.items()
+        }
+
+    @cached_property
+    def sorted_final_versions(self) -> ModuleVersionsByName:
+        """``final_versions`` for each Module name, sorted from oldest to newest."""
+        return {
+            name: sort_versions(versions)
+            for name, versions in self.final_versions.items()
+        }
+
+    def is_final_version(self, name: str, version: str) -> bool:
+        """Return whether the Module version is expected to be deployed after a sync."""
+        return version in self.final_versions.get(name, ())
+
+
+class DeploymentDigests(ParentModel):
+    """Digests of every Module in a Deployment snapshot, recorded alongside it.
+
+    These let a loaded snapshot skip computing each ``Module.digest``. They are only
+    valid for the exact snapshot file they were recorded with. The checksum of the JSON
+    copy of the snapshot written with them is also recorded, so that a copy that has
+    been changed since is never trusted.
+    """
+
+    snapshot_sha256: str
+    trusted_copy_sha256: str | None = None
+    modules: DigestsByNameAndVersion
 
-        This explicitly excludes any deprecated modules.
-        """
-        final_versions: ModuleVersionsByName = defaultdict(list)
 
-        for name, modules in self.get_final_deployed_modules().items():
-            final_versions[name] = [module.version for module in modules]
+class ReleaseManifestEntry(ParentModel):
+    """Lifecycle status and Module digest of a Release in a sharded snapshot.
+
+    The digest is only valid while the checksum of the Module's file still matches
+    ``shard_sha256``, so that a file changed since the manifest was written is noticed.
+    """
+
+    deprecated: bool
+    digest: str
+    shard_sha256: str | None = None
 
-        return final_versions
+
+type ManifestEntriesByNameAndVersion = dict[str, dict[str, ReleaseManifestEntry]]
+
+
+class SnapshotManifest(ParentModel):
+    """Index of a sharded Deployment snapshot, which stores each Module separately.
+
+    A Release's Module is only read from its own file when it is needed, and a file
+    is only rewritten when the Module's digest changes.
+    """
+
+    settings: DeploymentSettings
+    releases: ManifestEntriesByNameAndVersion
+
+
+def collect_releases(releases: Iterable[Release]) -> ReleasesByNameAndVersion:
+    """Arrange Releases by their module name and version, as held by a Deployment."""
+    releases_by_name: ReleasesByNameAndVersion = defaultdict(dict)
+    for release in releases:
+        module = release.module
+        releases_by_name[module.name][module.version] = release
+
+    return dict(releases_by_name)
+
+
+def sort_versions(versions: Iterable[str]) -> list[str]:
+    """Sort Module versions from oldest to newest.
+
+    The key follows natsort's documentation for supporting non-SemVer strings, e.g.
+    1.2rc1 should come before 1.2.1 or 1.2.
+    """
+    return natsorted(versions, key=lambda x: x.replace(".", "~") + "z")
@@ -1,3 +1,5 @@
+import hashlib
+import json
 from typing import Annotated
 
 from pydantic import Field, StringConstraints
@@ -123,6 +125,19 @@ class Module(ParentModel):
         ),
     ] = []
 
+    @property
+    def digest(self) -> str:
+        """SHA-256 digest of the Module's canonical JSON serialisation.
+
+        Modules with the same digest have the same configuration, so comparing digests
+        can stand in for comparing the Modules themselves. The digest is computed on
+        each access, as Modules are mutable and are copied with ``model_copy``.
+        """
+        data = json.dumps(
+            self.model_dump(mode="json"), sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(data.encode()).hexdigest()
+
 
 class Release(ParentModel):
     """Represents a Module along with its lifecycle (deprecation) status."""
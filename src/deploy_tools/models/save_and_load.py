@@ -1,23 +1,45 @@
-import json
+import io
+import itertools
 from collections import defaultdict
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import BinaryIO, TextIO
+from typing import BinaryIO, Protocol, TextIO
 
 import yaml
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from pydantic import ValidationError as PydanticValidationError
+from yaml.constructor import SafeConstructor
+from yaml.resolver import Resolver
 
 from ..errors import DeployToolsError
+from .config_cache import ConfigCache
 from .deployment import (
     Deployment,
     DeploymentSettings,
     ReleasesByNameAndVersion,
+    collect_releases,
 )
 from .module import Module, Release
 
+# Prefer the libyaml-backed implementations where PyYAML was built with them. These are
+# much faster than the pure-Python ones and emit identical output for our documents
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper, SafeLoader
+
 YAML_FILE_SUFFIX = ".yaml"
 DEPLOYMENT_SETTINGS = "settings" + YAML_FILE_SUFFIX
 
+# Number of configuration files that iter_releases loads together
+RELEASE_CHUNK_SIZE = 1024
+
+# Built once, as constructing the validator for a type is comparatively expensive
+RELEASES_ADAPTER = TypeAdapter(dict[str, dict[str, Release]])
+
 
 class LoadError(DeployToolsError):
     """Raised when configuration files cannot be loaded into the model."""
@@ -31,25 +53,211 @@ def save_as_yaml(
         output_path.parent.mkdir(exist_ok=True, parents=True)
 
     with open(output_path, "w") as f:
-        # Use model_dump_json() and then yaml.safe_dump() to allow us to use Pydantic
-        # types such as AnyURL with YAML without needing a custom serializer
-        load_json = json.loads(obj.model_dump_json())
-        yaml.safe_dump(load_json, f)
+        # Dump in JSON mode so Pydantic types such as AnyUrl are coerced to YAML-safe
+        # primitives without needing a custom serializer
+        dump_yaml(obj.model_dump(mode="json"), f)
 
 
 def load_from_yaml[T: BaseModel](model: type[T], input_stream: TextIO | BinaryIO) -> T:
     """Load a single Pydantic model from a yaml file."""
-    return model(**yaml.safe_load(input_stream))
+    return model(**yaml.load(input_stream, Loader=SafeLoader))
+
+
+def dump_yaml(data: object, stream: TextIO) -> None:
+    """Write plain Python data as YAML, equivalent to ``yaml.safe_dump``."""
+    yaml.dump(data, stream, Dumper=SafeDumper)
+
+
+def dumps_yaml(data: object, indent: int | None = None) -> str:
+    """Return plain Python data as a YAML string, equivalent to ``yaml.safe_dump``."""
+    return yaml.dump(data, Dumper=SafeDumper, indent=indent)
+
+
+def load_deployment(
+    config_folder: Path,
+    max_workers: int | None = None,
+    cache: ConfigCache | None = None,
+) -> Deployment:
+    """Load Deployment configuration from a yaml file.
+
+    This collects every Release yielded by ``iter_releases``.
+
+    Release files are read and validated concurrently by a pool of ``max_workers``
+    threads, which mostly overlaps the file I/O on a shared filesystem. Results are
+    consumed in the same order as a serial load, so the first invalid file (in glob
+    order) is the one reported.
+
+    Args:
+        config_folder: Folder containing the deployment configuration.
+        max_workers: Number of threads used to load release files. ``None`` uses the
+            ``ThreadPoolExecutor`` default, and ``1`` loads each file serially.
+        cache: If given, reuse previously validated Releases for unchanged files.
+    """
+    settings = load_settings(config_folder)
+    releases = collect_releases(iter_releases(config_folder, max_workers, cache))
+    # Both parts are already validated, so don't walk every Release again
+    return Deployment.model_construct(settings=settings, releases=releases)
 
 
-def load_deployment(config_folder: Path) -> Deployment:
-    """Load Deployment configuration from a yaml file."""
+def load_settings(config_folder: Path) -> DeploymentSettings:
+    """Load the DeploymentSettings from a configuration folder."""
     with open(config_folder / DEPLOYMENT_SETTINGS) as f:
-        settings = load_from_yaml(DeploymentSettings, f)
+        return load_from_yaml(DeploymentSettings, f)
+
+
+def iter_releases(
+    config_folder: Path,
+    max_workers: int | None = None,
+    cache: ConfigCache | None = None,
+) -> Iterator[Release]:
+    """Yield the Release loaded from each file of a configuration folder.
+
+    Files are loaded ``RELEASE_CHUNK_SIZE`` at a time, so only one chunk of Releases is
+    held in memory by the iterator however large the configuration is. An invalid file
+    raises the same error as ``load_deployment``, once its chunk is reached.
+
+    See ``load_deployment`` for a description of the arguments.
+    """
+    version_paths = config_folder.glob("*/*")
+    for chunk in itertools.batched(version_paths, RELEASE_CHUNK_SIZE):
+        releases = _load_release_chunk(config_folder, list(chunk), max_workers, cache)
+        for release_versions in releases.values():
+            yield from release_versions.values()
+
+    # Only evicted once every file has loaded, so an error here never hides a LoadError
+    if cache is not None:
+        cache.evict()
+
+
+def iter_deployment_from_yaml(
+    input_stream: TextIO | BinaryIO,
+) -> Iterator[Release | DeploymentSettings]:
+    """Yield each part of a Deployment from a yaml file, as it is read.
+
+    This is the streaming equivalent of ``load_from_yaml(Deployment, input_stream)``:
+    every Release is parsed and validated on its own, so memory use is bounded by the
+    largest Release rather than by the whole file. The DeploymentSettings are yielded
+    wherever they appear in the file.
+    """
+    reader = _YamlNodeReader(input_stream)
+    try:
+        for field in reader.iter_mapping_keys():
+            if field == "releases":
+                for _ in reader.iter_mapping_keys():
+                    for _ in reader.iter_mapping_keys():
+                        yield Release.model_validate(reader.load_next())
+            elif field == "settings":
+                yield DeploymentSettings.model_validate(reader.load_next())
+            else:
+                raise LoadError(f"Unexpected field in deployment: {field}")
+    finally:
+        reader.close()
+
+
+def load_release_files(
+    config_folder: Path,
+    version_paths: list[Path],
+    max_workers: int | None = None,
+    cache: ConfigCache | None = None,
+) -> ReleasesByNameAndVersion:
+    """Load the Releases from the given files of a configuration folder.
+
+    See ``load_deployment`` for a description of the arguments.
+    """
+    releases = _load_release_chunk(config_folder, version_paths, max_workers, cache)
+    if cache is not None:
+        cache.evict()
+
+    return releases
+
+
+def validate_releases(
+    data: Mapping[str, Mapping[str, object]],
+) -> ReleasesByNameAndVersion:
+    """Validate Release data for many module names and versions in a single call.
+
+    Values may be raw data loaded from YAML or already validated ``Release`` objects,
+    which are used as they are rather than being validated again.
+    """
+    return RELEASES_ADAPTER.validate_python(data)
+
+
+def _load_release_chunk(
+    config_folder: Path,
+    version_paths: list[Path],
+    max_workers: int | None,
+    cache: ConfigCache | None,
+) -> ReleasesByNameAndVersion:
+    """Load the Releases from the given files of a configuration folder.
+
+    Files are parsed concurrently and then validated together by a single call to
+    ``validate_releases``. If any file fails to load, every file is loaded again in
+    order so that the error raised is the same as for a file-by-file load.
+    """
+    releases = _load_release_files_in_bulk(
+        config_folder, version_paths, max_workers, cache
+    )
+    if releases is None:
+        releases = _load_release_files_in_order(
+            config_folder, version_paths, max_workers, cache
+        )
+
+    return releases
+
+
+def _load_release_files_in_bulk(
+    config_folder: Path,
+    version_paths: list[Path],
+    max_workers: int | None,
+    cache: ConfigCache | None,
+) -> ReleasesByNameAndVersion | None:
+    """Load the Releases from the given files, or return None if any are invalid."""
+    read_release = partial(_read_release, config_folder=config_folder, cache=cache)
+    release_files = list(_map_in_order(read_release, version_paths, max_workers))
+
+    raw_releases: dict[str, dict[str, object]] = defaultdict(dict)
+    for version_path, release_file in zip(version_paths, release_files, strict=True):
+        if release_file is None:
+            return None
+
+        raw_releases[version_path.parent.name][version_path.name] = release_file[1]
+
+    try:
+        validated = validate_releases(raw_releases)
+    except PydanticValidationError:
+        return None
+
+    releases: ReleasesByNameAndVersion = defaultdict(dict)
+    for version_path, release_file in zip(version_paths, release_files, strict=True):
+        release = validated[version_path.parent.name][version_path.name]
+        module = release.module
+        try:
+            _check_filepath_matches(version_path, module)
+        except LoadError:
+            return None
+
+        if cache is not None and release_file is not None:
+            contents, data = release_file
+            if not isinstance(data, Release):
+                cache.put(version_path.relative_to(config_folder), contents, release)
+
+        releases[module.name][module.version] = release
+
+    return dict(releases)
+
+
+def _load_release_files_in_order(
+    config_folder: Path,
+    version_paths: list[Path],
+    max_workers: int | None,
+    cache: ConfigCache | None,
+) -> ReleasesByNameAndVersion:
+    """Load and validate each of the given files in turn, raising the first error."""
+    load_release = partial(_load_release, config_folder=config_folder, cache=cache)
+    loaded_releases = _map_in_order(load_release, version_paths, max_workers)
 
     releases: ReleasesByNameAndVersion = defaultdict(dict)
-    for version_path in config_folder.glob("*/*"):
-        release = _load_release(version_path)
+    for version_path, release in zip(version_paths, loaded_releases, strict=True):
         module = release.module
 
         # This also guarantees unique module names and versions in configuration
@@ -60,21 +268,209 @@ def load_deployment(config_folder: Path) -> Deployment:
 
         releases[name][version] = release
 
-    return Deployment(settings=settings, releases=releases)
+    return dict(releases)
+
+
+def _map_in_order[T](
+    function: Callable[[Path], T],
+    paths: list[Path],
+    max_workers: int | None,
+) -> Iterator[T]:
+    """Yield the result of calling the function on each path, in the given order."""
+    if max_workers == 1:
+        yield from map(function, paths)
+        return
+
+    executor = ThreadPoolExecutor(max_workers, thread_name_prefix="load")
+    try:
+        yield from executor.map(function, paths)
+    finally:
+        # Don't load the remaining files once an error has been raised
+        executor.shutdown(cancel_futures=True)
+
+
+def _read_release(
+    path: Path, config_folder: Path, cache: ConfigCache | None = None
+) -> tuple[bytes, object] | None:
+    """Read a Module configuration file without validating it.
+
+    Returns the file's contents together with either its cached Release or the raw
+    data parsed from YAML. None is returned if the file cannot be read or parsed.
+    """
+    if path.is_dir() or not path.suffix == YAML_FILE_SUFFIX:
+        return None
+
+    try:
+        contents = path.read_bytes()
+    except OSError:
+        return None
+
+    if cache is not None:
+        release = cache.get(path.relative_to(config_folder), contents)
+        if release is not None:
+            return contents, release
+
+    try:
+        data: object = yaml.load(contents, Loader=SafeLoader)
+    except yaml.YAMLError:
+        return None
+
+    return contents, data
 
 
-def _load_release(path: Path) -> Release:
+def _load_release(
+    path: Path, config_folder: Path, cache: ConfigCache | None = None
+) -> Release:
     """Load Module configuration from a yaml file."""
     if path.is_dir() or not path.suffix == YAML_FILE_SUFFIX:
         raise LoadError(f"Unexpected file in configuration directory:\n{path}")
 
+    relative_path = path.relative_to(config_folder)
+
     try:
-        with open(path) as f:
-            return load_from_yaml(Release, f)
-    except (OSError, yaml.YAMLError, PydanticValidationError, TypeError) as exc:
-        # Include exc: under the top-level handler the traceback (and chained cause) is
-        # suppressed, so the failing field is only visible if surfaced in the message.
-        raise LoadError(f"Module configuration is invalid:\n{path}\n{exc}") from exc
+        contents = path.read_bytes()
+    except OSError as exc:
+        raise _invalid_release_error(path, exc) from exc
+
+    if cache is not None:
+        release = cache.get(relative_path, contents)
+        if release is not None:
+            return release
+
+    try:
+        with io.BytesIO(contents) as f:
+            release = load_from_yaml(Release, f)
+    except (yaml.YAMLError, PydanticValidationError, TypeError) as exc:
+        raise _invalid_release_error(path, exc) from exc
+
+    if cache is not None:
+        cache.put(relative_path, contents, release)
+
+    return release
+
+
+class _EventParser(Protocol):
+    def get_event(self) -> yaml.Event | None: ...
+
+    def dispose(self) -> None: ...
+
+
+class _TagResolver(Protocol):
+    def resolve(
+        self, kind: type[yaml.Node], value: str | None, implicit: object
+    ) -> str: ...
+
+
+class _NodeConstructor(Protocol):
+    def construct_document(self, node: yaml.Node) -> object: ...
+
+
+class _YamlNodeReader:
+    """Reads a YAML document one node at a time from a stream of parser events.
+
+    This does the work of ``yaml.compose`` for a single node, so that a large document
+    can be consumed piece by piece without building the whole of it in memory.
+    """
+
+    def __init__(self, input_stream: TextIO | BinaryIO) -> None:
+        self._parser: _EventParser = SafeLoader(input_stream)
+        self._resolver: _TagResolver = Resolver()
+        self._constructor: _NodeConstructor = SafeConstructor()
+        self._anchors: dict[str, yaml.Node] = {}
+
+        self._expect_event(yaml.StreamStartEvent)
+        self._expect_event(yaml.DocumentStartEvent)
+
+    def close(self) -> None:
+        """Stop reading, releasing the underlying parser."""
+        self._parser.dispose()
+
+    def iter_mapping_keys(self) -> Iterator[object]:
+        """Yield each key of the next mapping, leaving its value for the caller to read.
+
+        Each value must be read, by ``load_next`` or another call to this method,
+        before the next key is yielded.
+        """
+        self._expect_event(yaml.MappingStartEvent)
+        while not isinstance(event := self._next_event(), yaml.MappingEndEvent):
+            yield self._construct(self._compose_node(event))
+
+    def load_next(self) -> object:
+        """Return the Python object for the next node in the document."""
+        return self._construct(self._compose_node(self._next_event()))
+
+    def _next_event(self) -> yaml.Event:
+        event = self._parser.get_event()
+        if event is None:
+            raise yaml.YAMLError("Unexpected end of YAML stream")
+
+        return event
+
+    def _expect_event(self, event_type: type[yaml.Event]) -> None:
+        event = self._next_event()
+        if not isinstance(event, event_type):
+            raise yaml.MarkedYAMLError(
+                problem=f"expected {event_type.__name__}, but found {event}",
+                problem_mark=event.start_mark,
+            )
+
+    def _compose_node(self, event: yaml.Event) -> yaml.Node:
+        if isinstance(event, yaml.AliasEvent):
+            if event.anchor not in self._anchors:
+                raise yaml.MarkedYAMLError(
+                    problem=f"found undefined alias {event.anchor}",
+                    problem_mark=event.start_mark,
+                )
+            return self._anchors[event.anchor]
+
+        node: yaml.Node
+        if isinstance(event, yaml.ScalarEvent):
+            tag = self._resolve_tag(yaml.ScalarNode, event, event.value)
+            node = yaml.ScalarNode(
+                tag, event.value, event.start_mark, event.end_mark, event.style
+            )
+        elif isinstance(event, yaml.SequenceStartEvent):
+            tag = self._resolve_tag(yaml.SequenceNode, event, None)
+            node = yaml.SequenceNode(tag, [], event.start_mark, None, event.flow_style)
+            while not isinstance(item := self._next_event(), yaml.SequenceEndEvent):
+                node.value.append(self._compose_node(item))
+        elif isinstance(event, yaml.MappingStartEvent):
+            tag = self._resolve_tag(yaml.MappingNode, event, None)
+            node = yaml.MappingNode(tag, [], event.start_mark, None, event.flow_style)
+            while not isinstance(key := self._next_event(), yaml.MappingEndEvent):
+                key_node = self._compose_node(key)
+                node.value.append((key_node, self._compose_node(self._next_event())))
+        else:
+            raise yaml.MarkedYAMLError(
+                problem=f"expected a node, but found {event}",
+                problem_mark=event.start_mark,
+            )
+
+        if event.anchor is not None:
+            self._anchors[event.anchor] = node
+
+        return node
+
+    def _resolve_tag(
+        self,
+        kind: type[yaml.Node],
+        event: yaml.ScalarEvent | yaml.CollectionStartEvent,
+        value: str | None,
+    ) -> str:
+        tag: str | None = event.tag
+        if tag is None or tag == "!":
+            tag = self._resolver.resolve(kind, value, event.implicit)
+
+        return tag
+
+    def _construct(self, node: yaml.Node) -> object:
+        return self._constructor.construct_document(node)
+
+
+def _invalid_release_error(path: Path, exc: Exception) -> LoadError:
+    # Include exc: under the top-level handler the traceback (and chained cause) is
+    # suppressed, so the failing field is only visible if surfaced in the message.
+    return LoadError(f"Module configuration is invalid:\n{path}\n{exc}")
 
 
 def _check_filepath_matches(version_path: Path, module: Module) -> None:
@@ -1,30 +1,68 @@
+from concurrent.futures import Executor, Future
+
 from .app_builder import AppBuilder
+from .apptainer import PullScheduler
+from .download_cache import DownloadCache
 from .layout import Layout
 from .models.module import Module
 from .models.save_and_load import save_as_yaml
+from .rebuild_plan import RebuildPlan, plan_rebuild
 from .templater import Templater, TemplateType
 
 
 class ModuleBuilder:
     """Class for creating modules, including modulefiles and all application files."""
 
-    def __init__(self, templater: Templater, layout: Layout) -> None:
+    def __init__(
+        self,
+        templater: Templater,
+        layout: Layout,
+        pull_scheduler: PullScheduler | None = None,
+        download_cache: DownloadCache | None = None,
+        fetch_executor: Executor | None = None,
+    ) -> None:
         self._templater = templater
         self._layout = layout
         self._build_layout = layout.build_layout
 
-        self.app_creator = AppBuilder(templater, self._build_layout)
+        self.app_creator = AppBuilder(
+            templater,
+            self._build_layout,
+            pull_scheduler,
+            layout,
+            download_cache,
+            fetch_executor,
+        )
+
+    def create_module(self, module: Module) -> list[Future[None]]:
+        """Create the module's modulefile, application files and snapshot.
+
+        Fetching of Apptainer images and binaries is started first, so that it continues
+        in the background while the other files are rendered.
+
+        If the module is already deployed, only the files that its changes affect are
+        built again, and the rest are reused from the deployed module.
 
-    def create_module(self, module: Module) -> None:
-        """Create the module's modulefile, application files and snapshot."""
-        self._create_modulefile(module)
+        Returns:
+            The futures of any fetches still running in the background.
+        """
+        plan = plan_rebuild(module, self._layout)
 
+        fetches: list[Future[None]] = []
         for app in module.applications:
-            self.app_creator.create_application_files(app, module)
+            fetch = self.app_creator.fetch_application_files(app, module, plan)
+            if fetch is not None:
+                fetches.append(fetch)
+
+        self._create_modulefile(module, plan)
+
+        for app in module.applications:
+            self.app_creator.create_application_files(app, module, plan)
 
         self._create_module_snapshot(module)
+        return fetches
 
-    def _create_modulefile(self, module: Module) -> None:
+    def _create_modulefile(self, module: Module, plan: RebuildPlan | None) -> None:
         entrypoints_folder = self._layout.get_entrypoints_folder(
             module.name, module.version
         )
@@ -47,8 +85,16 @@ class ModuleBuilder:
             module.name, module.version
         )
 
+        reuse_from = None
+        if plan is not None and not plan.modulefile_changed:
+            reuse_from = self._layout.get_modulefile(module.name, module.version)
+
         self._templater.create(
-            built_modulefile, TemplateType.MODULEFILE, params, create_parents=True
+            built_modulefile,
+            TemplateType.MODULEFILE,
+            params,
+            create_parents=True,
+            reuse_from=reuse_from,
         )
 
     def _create_module_snapshot(self, module: Module) -> None:
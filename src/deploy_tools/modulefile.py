@@ -3,7 +3,7 @@ from collections import defaultdict
 
 from .layout import Layout
 from .models.deployment import DefaultVersionsByName, ModuleVersionsByName
-from .templater import Templater, TemplateType
+from .templater import TemplateType, get_templater
 
 VERSION_GLOB = "*/[!.]*"
 
@@ -44,7 +44,7 @@ def apply_default_versions(
     default_versions: DefaultVersionsByName, layout: Layout
 ) -> None:
     """Update .version files for current default version settings."""
-    templater = Templater()
+    templater = get_templater()
     deployed_module_versions = get_deployed_modulefile_versions(layout)
 
     for name in deployed_module_versions:
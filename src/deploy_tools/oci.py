@@ -0,0 +1,162 @@
+import json
+import logging
+import re
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+logger = logging.getLogger(__name__)
+
+DOCKER_SCHEME = "docker"
+ORAS_SCHEME = "oras"
+DOCKER_HUB_REGISTRY = "docker.io"
+DOCKER_HUB_API_HOST = "registry-1.docker.io"
+DOCKER_HUB_LIBRARY = "library"
+DEFAULT_TAG = "latest"
+
+# Registries on the local machine are assumed to be served without TLS
+INSECURE_REGISTRY_HOSTS = {"localhost", "127.0.0.1"}
+
+MANIFEST_MEDIA_TYPES = [
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+]
+DIGEST_HEADER = "Docker-Content-Digest"
+DIGEST_REGEX = re.compile(r"^[a-z0-9]+(?:[.+_-][a-z0-9]+)*:[a-zA-Z0-9=_-]+$")
+CHALLENGE_PARAMETER_REGEX = re.compile(r'(\w+)="([^"]*)"')
+REGISTRY_TIMEOUT = 10
+
+
+def get_registry(container_url: str) -> str:
+    """Return the host of the registry that a container image URL is pulled from.
+
+    Docker image names without a registry host, such as ``docker://ubuntu``, are
+    pulled from Docker Hub.
+    """
+    scheme, _, location = container_url.partition("://")
+    host, has_path, _ = location.partition("/")
+
+    if scheme == DOCKER_SCHEME and (
+        not has_path or not any(c in host for c in ".:") and host != "localhost"
+    ):
+        return DOCKER_HUB_REGISTRY
+
+    return host
+
+
+class ImageReference:
+    """A container image URL, split into the parts used by a registry's API."""
+
+    def __init__(
+        self, scheme: str, registry: str, repository: str, tag: str, digest: str | None
+    ) -> None:
+        self.scheme = scheme
+        self.registry = registry
+        self.repository = repository
+        self.tag = tag
+        self.digest = digest
+
+    @classmethod
+    def parse(cls, container_url: str) -> "ImageReference | None":
+        """Parse an image URL, or return None if it is not held by an OCI registry.
+
+        Only ``docker://`` and ``oras://`` URLs refer to a registry. Other sources,
+        such as local files or library images, return None.
+        """
+        scheme, separator, location = container_url.partition("://")
+        if not separator or scheme not in (DOCKER_SCHEME, ORAS_SCHEME):
+            return None
+
+        registry = get_registry(container_url)
+        name = location.removeprefix(f"{registry}/")
+        name, _, digest = name.partition("@")
+        repository, has_tag, tag = name.rpartition(":")
+        if not has_tag or "/" in tag:
+            repository, tag = name, DEFAULT_TAG
+
+        if registry == DOCKER_HUB_REGISTRY and "/" not in repository:
+            repository = f"{DOCKER_HUB_LIBRARY}/{repository}"
+
+        return cls(scheme, registry, repository, tag, digest or None)
+
+    def get_manifest_url(self) -> str:
+        """Return the registry API URL of the image's manifest."""
+        host = self.registry
+        if host == DOCKER_HUB_REGISTRY:
+            host = DOCKER_HUB_API_HOST
+
+        protocol = "http" if host.split(":")[0] in INSECURE_REGISTRY_HOSTS else "https"
+        reference = self.digest or self.tag
+        return f"{protocol}://{host}/v2/{self.repository}/manifests/{reference}"
+
+    def get_pinned_url(self, digest: str) -> str:
+        """Return a URL for the image with the given digest, in place of its tag."""
+        return f"{self.scheme}://{self.registry}/{self.repository}@{digest}"
+
+
+def resolve_image_digest(container_url: str) -> str | None:
+    """Return the digest of the manifest that a container image URL refers to.
+
+    The digest is fetched from the registry's API, so a tag's current digest is
+    returned. Anonymous access is used, which public images allow. None is returned if
+    the URL does not refer to a registry, or if the registry cannot be asked, so callers
+    must be prepared to fall back to the tag.
+    """
+    reference = ImageReference.parse(container_url)
+    if reference is None:
+        return None
+
+    if reference.digest is not None:
+        return reference.digest
+
+    try:
+        digest = _request_manifest_digest(reference.get_manifest_url())
+    except (OSError, ValueError) as exc:
+        logger.debug("Could not resolve digest of %s: %s", container_url, exc)
+        return None
+
+    if digest is None or not DIGEST_REGEX.match(digest):
+        logger.debug("Registry gave no valid digest for: %s", container_url)
+        return None
+
+    return digest
+
+
+def _request_manifest_digest(manifest_url: str) -> str | None:
+    headers = {"Accept": ", ".join(MANIFEST_MEDIA_TYPES)}
+    try:
+        return _head(manifest_url, headers)
+    except HTTPError as exc:
+        challenge = exc.headers.get("WWW-Authenticate", "")
+        if exc.code != 401 or not challenge.startswith("Bearer "):
+            raise
+
+    headers["Authorization"] = f"Bearer {_request_token(challenge)}"
+    return _head(manifest_url, headers)
+
+
+def _head(url: str, headers: dict[str, str]) -> str | None:
+    request = Request(url, headers=headers, method="HEAD")
+    with urlopen(request, timeout=REGISTRY_TIMEOUT) as response:
+        return response.headers.get(DIGEST_HEADER)
+
+
+def _request_token(challenge: str) -> str:
+    """Request an anonymous token for the registry's Bearer authentication challenge."""
+    parameters = dict(CHALLENGE_PARAMETER_REGEX.findall(challenge))
+    realm = parameters.pop("realm", None)
+    if realm is None:
+        raise URLError(f"Registry authentication challenge has no realm: {challenge}")
+
+    with urlopen(
+        f"{realm}?{urlencode(parameters)}", timeout=REGISTRY_TIMEOUT
+    ) as response:
+        token_response = json.load(response)
+
+    token = token_response.get("token") or token_response.get("access_token")
+    if not isinstance(token, str):
+        raise ValueError("Registry token response has no token")
+
+    return token
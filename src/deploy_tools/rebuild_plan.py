@@ -0,0 +1,137 @@
+import logging
+from typing import Any
+
+import yaml
+from pydantic import ValidationError
+
+from .layout import Layout
+from .models.apptainer_app import ApptainerApp
+from .models.binary_app import BinaryApp
+from .models.module import Module
+from .models.save_and_load import load_from_yaml
+from .models.shell_app import ShellApp
+
+logger = logging.getLogger(__name__)
+
+# Module fields that are rendered into the modulefile
+MODULEFILE_FIELDS = {
+    "name",
+    "description",
+    "env_vars",
+    "dependencies",
+    "load_script",
+    "unload_script",
+}
+
+
+class RebuildPlan:
+    """The files of an updated Module that its changes affect.
+
+    A Module's files are each built from only some of its fields: the modulefile from
+    its description, environment variables, dependencies and scripts, and each
+    entrypoint from the application that provides it. Comparing the deployed Module with
+    the updated one field by field shows which files need building again. Every other
+    file, including the Apptainer images and binaries that are costly to fetch, can be
+    reused from the deployed Module.
+    """
+
+    def __init__(self, deployed: Module, module: Module) -> None:
+        deployed_fields = _get_modulefile_fields(deployed)
+        self.modulefile_changed = _get_modulefile_fields(module) != deployed_fields
+
+        deployed_sources = _get_entrypoint_sources(deployed)
+        self.changed_entrypoints = {
+            name
+            for name, source in _get_entrypoint_sources(module).items()
+            if deployed_sources.get(name) != source
+        }
+
+        deployed_images = {
+            app.container.url
+            for app in deployed.applications
+            if isinstance(app, ApptainerApp)
+        }
+        self.reused_images = {
+            app.container.url
+            for app in module.applications
+            if isinstance(app, ApptainerApp) and app.container.url in deployed_images
+        }
+
+        # A binary is the same download if its URL and hash are, whatever its name
+        deployed_binaries = {
+            _get_download(app): app.name
+            for app in deployed.applications
+            if isinstance(app, BinaryApp)
+        }
+        self.reused_binaries = {
+            app.name: deployed_binaries[_get_download(app)]
+            for app in module.applications
+            if isinstance(app, BinaryApp) and _get_download(app) in deployed_binaries
+        }
+
+    def is_entrypoint_changed(self, name: str) -> bool:
+        """Return whether the named entrypoint needs building again."""
+        return name in self.changed_entrypoints
+
+
+def plan_rebuild(module: Module, layout: Layout) -> RebuildPlan | None:
+    """Plan the rebuild of a Module against the deployed version of it, if any.
+
+    The deployed Module is read from the snapshot in its folder, so that the plan
+    describes the files actually in the deployment area.
+
+    Returns:
+        The plan, or None if the Module is not deployed.
+    """
+    snapshot_path = layout.get_module_snapshot_path(module.name, module.version)
+    try:
+        with open(snapshot_path) as f:
+            deployed = load_from_yaml(Module, f)
+    except FileNotFoundError:
+        return None
+    except (yaml.YAMLError, ValidationError) as exc:
+        logger.warning(
+            "Unreadable snapshot, rebuilding all files: %s\n%s", snapshot_path, exc
+        )
+        return None
+
+    plan = RebuildPlan(deployed, module)
+    logger.debug(
+        "Planned rebuild of %s/%s: modulefile changed: %s, changed entrypoints: %s, "
+        "reused images: %d, reused binaries: %d",
+        module.name,
+        module.version,
+        plan.modulefile_changed,
+        sorted(plan.changed_entrypoints),
+        len(plan.reused_images),
+        len(plan.reused_binaries),
+    )
+    return plan
+
+
+def _get_modulefile_fields(module: Module) -> dict[str, Any]:
+    return module.model_dump(include=MODULEFILE_FIELDS)
+
+
+def _get_entrypoint_sources(module: Module) -> dict[str, object]:
+    """Return everything that each entrypoint of a Module is built from, by name."""
+    sources: dict[str, object] = {}
+    for app in module.applications:
+        match app:
+            case ApptainerApp():
+                for entrypoint in app.entrypoints:
+                    sources[entrypoint.name] = (
+                        app.container.url,
+                        app.global_options,
+                        entrypoint,
+                    )
+            case ShellApp():
+                sources[app.name] = app.script
+            case BinaryApp():
+                sources[app.name] = _get_download(app)
+
+    return sources
+
+
+def _get_download(app: BinaryApp) -> tuple[str, str, str]:
+    return str(app.url), app.hash_type, app.hash
@@ -0,0 +1,146 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from . import __version__
+from .cache import FileStore
+from .external_tools import run_command
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_CACHE_FOLDER = "scripts"
+DEFAULT_SCRIPT_CACHE_SIZE = 4 * 1024 * 1024
+
+SHEBANG = b"#!"
+# Longest shebang line that is read, which is well beyond the kernel's own limit
+MAX_SHEBANG_LENGTH = 4096
+ENV_INTERPRETER = "env"
+# Interpreters whose scripts are checked with 'bash -n'
+SHELL_INTERPRETERS = {"sh", "bash", "dash", "ksh"}
+
+
+def is_shell_script(file: Path) -> bool:
+    """Determine whether the specified file is a shell script, from its shebang line.
+
+    Both ``#!/bin/bash`` and ``#!/usr/bin/env bash`` forms are recognised. Files
+    without a shebang line, including binaries, are not shell scripts.
+    """
+    try:
+        with open(file, "rb") as f:
+            first_line = f.readline(MAX_SHEBANG_LENGTH)
+    except (IsADirectoryError, FileNotFoundError):
+        return False
+
+    if not first_line.startswith(SHEBANG):
+        return False
+
+    words = first_line[len(SHEBANG) :].decode(errors="replace").split()
+    if words and os.path.basename(words[0]) == ENV_INTERPRETER:
+        # Skip any options given to env, such as '-S'
+        words = [word for word in words[1:] if not word.startswith("-")]
+
+    return bool(words) and os.path.basename(words[0]) in SHELL_INTERPRETERS
+
+
+class ScriptCheckCache:
+    """Persistent record of shell scripts that have passed a syntax check.
+
+    Entries are keyed by a hash of the script's contents and the version of bash that
+    checked it, so a script is only checked again once it or bash has changed. Scripts
+    that fail are not recorded, as their errors name the file that was checked.
+    """
+
+    def __init__(
+        self, cache_root: Path, max_size: int = DEFAULT_SCRIPT_CACHE_SIZE
+    ) -> None:
+        self._store = FileStore(cache_root / SCRIPT_CACHE_FOLDER, max_size)
+        self._bash_version: str | None = None
+
+    def is_valid(self, contents: bytes) -> bool:
+        """Return whether a script with the given contents has passed a check."""
+        return self._store.get(self._get_key(contents)) is not None
+
+    def put_valid(self, contents: bytes) -> None:
+        """Record that a script with the given contents has passed a check."""
+        self._store.put_bytes(
+            self._get_key(contents), self._get_bash_version().encode()
+        )
+
+    def evict(self) -> None:
+        """Remove least-recently-used entries beyond the cache's size limit."""
+        self._store.evict()
+
+    def _get_key(self, contents: bytes) -> str:
+        h = hashlib.sha256(__version__.encode())
+        h.update(self._get_bash_version().encode())
+        h.update(contents)
+        return h.hexdigest()
+
+    def _get_bash_version(self) -> str:
+        bash_version = self._bash_version
+        if bash_version is None:
+            result = run_command(["bash", "--version"], capture_output=True, text=True)
+            bash_version = next(iter(result.stdout.splitlines()), "")
+            self._bash_version = bash_version
+
+        return bash_version
+
+
+def check_shell_syntax(
+    files: list[Path],
+    max_workers: int | None = None,
+    cache: ScriptCheckCache | None = None,
+) -> list[tuple[Path, str]]:
+    """Check the bash syntax of each given file, running the checks concurrently.
+
+    Since failing this validation will prevent a deploy-tools job from continuing, we
+    don't want to use more stringent tests as with e.g. shellcheck.
+
+    This is also unable to check that all required functions and tools are available, so
+    some typos are likely to pass.
+
+    Args:
+        files: Shell scripts to check.
+        max_workers: Maximum number of checks to run at once. Defaults to a number
+            based on the CPU count.
+        cache: If given, skip scripts that have passed a previous check, and record
+            those that pass this one.
+
+    Returns:
+        The file and error output of every script that failed, in the order given.
+    """
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="check") as executor:
+        results = list(executor.map(partial(_check_file, cache=cache), files))
+
+    if cache is not None:
+        cache.evict()
+
+    return [
+        (file, errors)
+        for file, errors in zip(files, results, strict=True)
+        if errors is not None
+    ]
+
+
+def _check_file(file: Path, cache: ScriptCheckCache | None) -> str | None:
+    """Return the errors from checking the file's bash syntax, or None if it passes."""
+    contents = file.read_bytes()
+    if cache is not None and cache.is_valid(contents):
+        logger.debug("Skipping check of unchanged script: %s", file)
+        return None
+
+    result = run_command(
+        ["bash", "-n", str(file.absolute())],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return result.stderr
+
+    if cache is not None:
+        cache.put_valid(contents)
+
+    return None
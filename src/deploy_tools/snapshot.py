@@ -1,40 +1,148 @@
-import io
+import hashlib
 import logging
-from typing import cast
+import shutil
+from collections import defaultdict
+from collections.abc import Generator, Iterable, Iterator
+from contextlib import contextmanager
+from enum import StrEnum
+from pathlib import Path
+from typing import BinaryIO, cast
 
 import yaml
-from git import BadName, Repo
+from git import Repo
 from pydantic import ValidationError as PydanticValidationError
 
+from .cache import create_ignored_folder
 from .errors import DeployToolsError
 from .layout import Layout
-from .models.deployment import Deployment, DeploymentSettings
-from .models.save_and_load import load_from_yaml, save_as_yaml
+from .models.deployment import (
+    Deployment,
+    DeploymentDigests,
+    DeploymentSettings,
+    DigestsByNameAndVersion,
+    ManifestEntriesByNameAndVersion,
+    ReleaseManifestEntry,
+    SnapshotManifest,
+    collect_releases,
+)
+from .models.module import Module, Release
+from .models.save_and_load import (
+    LoadError,
+    iter_deployment_from_yaml,
+    load_from_yaml,
+    save_as_yaml,
+)
 
 logger = logging.getLogger(__name__)
 
+# Errors raised when a snapshot file cannot be read or does not match the model
+SNAPSHOT_READ_ERRORS = (
+    OSError,
+    yaml.YAMLError,
+    PydanticValidationError,
+    TypeError,
+    LoadError,
+)
+
+# Size of the reads used to skip the unread remainder of a git object
+GIT_STREAM_CHUNK_SIZE = 64 * 1024
+
 
 class SnapshotError(DeployToolsError):
     """Raised when a deployment snapshot is missing or in an unexpected state."""
 
 
-def create_snapshot(deployment: Deployment, layout: Layout) -> None:
+class SnapshotFormat(StrEnum):
+    """Enumerates the formats that a deployment snapshot can be stored in."""
+
+    SINGLE_FILE = "single-file"  # Everything in deployment.yaml
+    SHARDED = "sharded"  # A manifest, plus one file per Module
+
+
+def get_snapshot_format(layout: Layout) -> SnapshotFormat | None:
+    """Return the format of the deployment area's snapshot, or None if it has none."""
+    has_single_file = layout.deployment_snapshot_path.exists()
+    has_sharded = layout.snapshot_manifest_path.exists()
+
+    if has_single_file and has_sharded:
+        raise SnapshotError(
+            f"Deployment area has snapshots in more than one format:\n"
+            f"{layout.deployment_snapshot_path}\n{layout.snapshot_manifest_path}"
+        )
+
+    if has_sharded:
+        return SnapshotFormat.SHARDED
+    if has_single_file:
+        return SnapshotFormat.SINGLE_FILE
+
+    return None
+
+
+def create_snapshot(
+    deployment: Deployment,
+    layout: Layout,
+    snapshot_format: SnapshotFormat | None = None,
+) -> None:
     """Create a snapshot file for the deployment configuration.
 
     This snapshot can then be used to compare the previous and current deployment
     configuration when a compare, validate or sync process is run.
+
+    Args:
+        deployment: The Deployment configuration to snapshot.
+        layout: The ``Layout`` representing the Deployment Area.
+        snapshot_format: Format to write the snapshot in, replacing any snapshot in
+            another format. By default, the format of the existing snapshot is kept,
+            and new snapshots are written as a single file.
     """
-    logger.debug("Creating snapshot: %s", layout.deployment_snapshot_path)
-    save_as_yaml(deployment, layout.deployment_snapshot_path)
+    existing_format = get_snapshot_format(layout)
+    if snapshot_format is None:
+        snapshot_format = existing_format or SnapshotFormat.SINGLE_FILE
 
+    match snapshot_format:
+        case SnapshotFormat.SINGLE_FILE:
+            _create_single_file_snapshot(deployment, layout)
+            if existing_format == SnapshotFormat.SHARDED:
+                logger.debug("Removing sharded snapshot: %s", layout.snapshot_root)
+                shutil.rmtree(layout.snapshot_root)
+        case SnapshotFormat.SHARDED:
+            _create_sharded_snapshot(deployment, layout)
+            if existing_format == SnapshotFormat.SINGLE_FILE:
+                logger.debug("Removing snapshot: %s", layout.deployment_snapshot_path)
+                layout.deployment_snapshot_path.unlink()
+                layout.deployment_digests_path.unlink(missing_ok=True)
 
-def load_snapshot(layout: Layout, from_scratch: bool = False) -> Deployment:
+
+def load_snapshot(
+    layout: Layout, from_scratch: bool = False, trusted: bool = False
+) -> Deployment:
     """Load snapshot of the Deployment configuration taken at start of Deploy step.
 
     Args:
         layout: The ``Layout`` representing the Deployment Area.
         from_scratch: If True, this will return the default ``Deployment``
             configuration in order to work with an empty Deployment Area.
+        trusted: If True, load the copy of a single-file snapshot that was written
+            alongside it, if its checksum shows that the snapshot is unchanged. This is
+            much faster than parsing the YAML snapshot, which is the fallback.
+    """
+    return load_snapshot_with_digests(layout, from_scratch, trusted)[0]
+
+
+def load_snapshot_with_digests(
+    layout: Layout, from_scratch: bool = False, trusted: bool = False
+) -> tuple[Deployment, DigestsByNameAndVersion]:
+    """Load the snapshot, along with the Module digests recorded when it was written.
+
+    The digests let a Module be compared with the snapshot without computing the
+    digest of the snapshot's Module. Digests that were recorded for a different
+    snapshot file are ignored, so a Module may have no recorded digest.
+
+    Args are as for ``load_snapshot``.
+
+    Returns:
+        The snapshot, and the recorded digest of each of its Modules by name and
+        version.
     """
     if not layout.deployment_root.exists() or not layout.deployment_root.is_dir():
         raise SnapshotError(
@@ -42,41 +150,470 @@ def load_snapshot(layout: Layout, from_scratch: bool = False) -> Deployment:
         )
 
     if from_scratch:
-        if layout.deployment_snapshot_path.exists():
-            raise SnapshotError(
-                f"Deployment snapshot must not exist when deploying from scratch:\n"
-                f"{layout.deployment_snapshot_path}"
-            )
+        for snapshot_path in (
+            layout.deployment_snapshot_path,
+            layout.snapshot_manifest_path,
+        ):
+            if snapshot_path.exists():
+                raise SnapshotError(
+                    f"Deployment snapshot must not exist when deploying from "
+                    f"scratch:\n{snapshot_path}"
+                )
 
         logger.debug("Loading empty deployment configuration as snapshot")
-        return Deployment(settings=DeploymentSettings(), releases={})
+        return Deployment(settings=DeploymentSettings(), releases={}), {}
 
-    if not layout.deployment_snapshot_path.exists():
-        raise SnapshotError(
-            f"Deployment snapshot not found:\n{layout.deployment_snapshot_path}"
+    snapshot_path = _get_snapshot_path(layout)
+    if snapshot_path == layout.snapshot_manifest_path:
+        logger.debug("Loading sharded snapshot: %s", snapshot_path)
+        manifest = load_snapshot_manifest(layout)
+        deployment = _collect_deployment(
+            _iter_sharded_snapshot(layout, manifest), str(snapshot_path)
         )
+        return deployment, _get_shard_digests(layout, manifest)
+
+    snapshot_sha256 = _get_file_sha256(snapshot_path)
+    digests = _load_deployment_digests(layout, snapshot_sha256)
+    deployment = None
+    if trusted:
+        deployment = _load_trusted_snapshot(layout, snapshot_sha256, digests)
+
+    if deployment is None:
+        logger.debug("Loading snapshot: %s", snapshot_path)
+        deployment = _collect_deployment(_iter_snapshot(layout), str(snapshot_path))
+
+    return deployment, digests.modules if digests is not None else {}
+
+
+def iter_snapshot_releases(layout: Layout) -> Iterator[Release]:
+    """Yield each Release in the deployment snapshot, as the snapshot is read.
+
+    Unlike ``load_snapshot``, this never holds the whole snapshot in memory, so it is
+    suitable for processing very large Deployments one Release at a time.
+
+    Args:
+        layout: The ``Layout`` representing the Deployment Area.
+    """
+    for part in _iter_snapshot(layout):
+        if isinstance(part, Release):
+            yield part
+
 
-    logger.debug("Loading snapshot: %s", layout.deployment_snapshot_path)
+def load_snapshot_manifest(layout: Layout) -> SnapshotManifest:
+    """Load the manifest of the deployment area's sharded snapshot.
+
+    Together with ``load_snapshot_release``, this allows individual Releases to be read
+    without loading the rest of the snapshot.
+    """
+    manifest_path = layout.snapshot_manifest_path
+    if not manifest_path.exists():
+        raise SnapshotError(f"Sharded deployment snapshot not found:\n{manifest_path}")
+
+    try:
+        with open(manifest_path, "rb") as f:
+            return load_from_yaml(SnapshotManifest, f)
+    except SNAPSHOT_READ_ERRORS as exc:
+        raise SnapshotError(
+            f"Deployment snapshot could not be read:\n{manifest_path}"
+        ) from exc
+
+
+def load_snapshot_release(
+    layout: Layout, manifest: SnapshotManifest, name: str, version: str
+) -> Release:
+    """Load a single Release from the deployment area's sharded snapshot."""
+    shard_path = layout.get_snapshot_shard_path(name, version)
     try:
-        with open(layout.deployment_snapshot_path) as f:
-            return load_from_yaml(Deployment, f)
-    except (OSError, yaml.YAMLError, PydanticValidationError, TypeError) as exc:
+        return _load_shard(manifest, name, version, shard_path.open("rb"))
+    except SNAPSHOT_READ_ERRORS as exc:
         raise SnapshotError(
-            f"Deployment snapshot could not be read:\n{layout.deployment_snapshot_path}"
+            f"Deployment snapshot could not be read:\n{shard_path}"
         ) from exc
 
 
 def load_snapshot_from_ref(layout: Layout, ref: str) -> Deployment:
     """Load the deployment snapshot from the given git ref of the deployment area."""
-    logger.debug("Loading snapshot from ref: %s", ref)
+    return load_snapshots_from_refs(layout, [ref])[ref]
+
+
+def load_snapshots_from_refs(
+    layout: Layout, refs: Iterable[str]
+) -> dict[str, Deployment]:
+    """Load the deployment snapshots from many git refs of the deployment area.
+
+    This is much faster than calling ``load_snapshot_from_ref`` for each ref, e.g. when
+    walking back through the history of syncs. Every file is read through the same git
+    process, and files that are unchanged between refs are only parsed once, so the
+    Deployments returned for refs with identical snapshots are the same object.
+
+    Args:
+        layout: The ``Layout`` representing the Deployment Area.
+        refs: Git refs of the deployment area's repository, e.g. 'HEAD~1'.
+
+    Returns:
+        The snapshot Deployment for each ref, keyed by ref.
+    """
     with Repo(layout.deployment_root) as repo:
+        reader = _GitSnapshotReader(layout, repo)
+        return {ref: reader.load(ref) for ref in refs}
+
+
+def _create_single_file_snapshot(deployment: Deployment, layout: Layout) -> None:
+    logger.debug("Creating snapshot: %s", layout.deployment_snapshot_path)
+    save_as_yaml(deployment, layout.deployment_snapshot_path)
+    snapshot_sha256 = _get_file_sha256(layout.deployment_snapshot_path)
+    trusted_copy_sha256 = _create_trusted_snapshot(deployment, layout, snapshot_sha256)
+
+    digests = DeploymentDigests(
+        snapshot_sha256=snapshot_sha256,
+        trusted_copy_sha256=trusted_copy_sha256,
+        modules={
+            name: {
+                version: release.module.digest
+                for version, release in release_versions.items()
+            }
+            for name, release_versions in deployment.releases.items()
+        },
+    )
+    # Written as JSON, which Pydantic loads far faster than YAML
+    layout.deployment_digests_path.write_text(digests.model_dump_json(indent=2))
+
+
+def _create_trusted_snapshot(
+    deployment: Deployment, layout: Layout, snapshot_sha256: str
+) -> str:
+    """Write a copy of the snapshot that ``load_snapshot`` can load quickly.
+
+    Pydantic parses and validates JSON natively, in a fraction of the time taken to
+    parse the YAML snapshot. The copy is named by the checksum of the YAML snapshot it
+    was written with, so it is never loaded in place of a snapshot that has changed.
+
+    Returns:
+        The checksum of the copy itself, to be recorded with the snapshot.
+    """
+    create_ignored_folder(layout.cache_root)
+    for old_path in layout.cache_root.glob(layout.get_trusted_snapshot_path("*").name):
+        old_path.unlink()
+
+    json_data = deployment.model_dump_json().encode()
+    layout.get_trusted_snapshot_path(snapshot_sha256).write_bytes(json_data)
+    return hashlib.sha256(json_data).hexdigest()
+
+
+def _load_trusted_snapshot(
+    layout: Layout, snapshot_sha256: str, digests: DeploymentDigests | None
+) -> Deployment | None:
+    """Load the copy of the snapshot, or return None if there is no usable copy.
+
+    The copy is only used if its checksum matches the one recorded with the snapshot.
+    """
+    if digests is None or digests.trusted_copy_sha256 is None:
+        logger.debug("No checksum recorded for a trusted copy of the snapshot")
+        return None
+
+    trusted_path = layout.get_trusted_snapshot_path(snapshot_sha256)
+    try:
+        json_data = trusted_path.read_bytes()
+    except FileNotFoundError:
+        logger.debug("No trusted copy of the current snapshot: %s", trusted_path)
+        return None
+
+    if hashlib.sha256(json_data).hexdigest() != digests.trusted_copy_sha256:
+        logger.warning("Ignoring modified trusted copy of snapshot: %s", trusted_path)
+        return None
+
+    logger.debug("Loading trusted copy of snapshot: %s", trusted_path)
+    try:
+        return Deployment.model_validate_json(json_data)
+    except PydanticValidationError:
+        logger.warning("Ignoring invalid trusted copy of snapshot: %s", trusted_path)
+        return None
+
+
+def _create_sharded_snapshot(deployment: Deployment, layout: Layout) -> None:
+    """Write a sharded snapshot, only rewriting the files of changed Modules.
+
+    The manifest is written last, so an interrupted write at worst leaves the manifest
+    with an out of date digest. This only causes a full comparison of the Module.
+    """
+    logger.debug("Creating sharded snapshot: %s", layout.snapshot_root)
+    previous_entries: ManifestEntriesByNameAndVersion = {}
+    if layout.snapshot_manifest_path.exists():
+        previous_entries = load_snapshot_manifest(layout).releases
+
+    entries: ManifestEntriesByNameAndVersion = defaultdict(dict)
+    for name, release_versions in deployment.releases.items():
+        for version, release in release_versions.items():
+            digest = release.module.digest
+            shard_path = layout.get_snapshot_shard_path(name, version)
+            previous_entry = previous_entries.get(name, {}).get(version)
+            shard_sha256 = _get_shard_sha256(shard_path)
+
+            # A file changed since the manifest was written is also replaced
+            if (
+                previous_entry is None
+                or previous_entry.digest != digest
+                or shard_sha256 is None
+                or previous_entry.shard_sha256 != shard_sha256
+            ):
+                save_as_yaml(release.module, shard_path, create_parents=True)
+                shard_sha256 = _get_file_sha256(shard_path)
+
+            entries[name][version] = ReleaseManifestEntry(
+                deprecated=release.deprecated,
+                digest=digest,
+                shard_sha256=shard_sha256,
+            )
+
+    for name, previous_versions in previous_entries.items():
+        for version in previous_versions:
+            if version not in entries.get(name, {}):
+                shard_path = layout.get_snapshot_shard_path(name, version)
+                shard_path.unlink(missing_ok=True)
+                if not any(shard_path.parent.iterdir()):
+                    shard_path.parent.rmdir()
+
+    manifest = SnapshotManifest(settings=deployment.settings, releases=dict(entries))
+    save_as_yaml(manifest, layout.snapshot_manifest_path, create_parents=True)
+
+
+class _GitSnapshotReader:
+    """Reads deployment snapshots from the git history of a deployment area.
+
+    Objects are read through git's persistent ``cat-file --batch`` processes, so any
+    number of files can be read from any number of refs without starting another
+    process. Each file is streamed from git straight into the YAML parser, and files
+    are cached by blob hash so that a file shared between refs is only parsed once.
+    This is not thread-safe, as the git processes are shared.
+    """
+
+    def __init__(self, layout: Layout, repo: Repo) -> None:
+        self._layout = layout
+        self._git = repo.git
+        self._deployments: dict[str, Deployment] = {}
+        self._modules: dict[str, Module] = {}
+
+    def load(self, ref: str) -> Deployment:
+        """Load the deployment snapshot from the given git ref."""
+        logger.debug("Loading snapshot from ref: %s", ref)
+        tree_sha = self._get_object_sha(f"{ref}^{{tree}}", "tree")
+        if tree_sha is None:
+            raise SnapshotError(f"Deployment snapshot not found at git ref:\n{ref}")
+
         try:
-            ref_snapshot = repo.commit(ref).tree[layout.DEPLOYMENT_SNAPSHOT_FILENAME]
-        except (BadName, KeyError) as exc:
+            manifest_sha = self._get_file_sha(
+                tree_sha, self._layout.snapshot_manifest_path
+            )
+            if manifest_sha is not None:
+                return self._load_sharded(tree_sha, manifest_sha)
+
+            snapshot_sha = self._get_file_sha(
+                tree_sha, self._layout.deployment_snapshot_path
+            )
+            if snapshot_sha is None:
+                raise SnapshotError(f"Deployment snapshot not found at git ref:\n{ref}")
+
+            return self._load_single_file(snapshot_sha, ref)
+        except SNAPSHOT_READ_ERRORS as exc:
             raise SnapshotError(
-                f"Deployment snapshot not found at git ref:\n{ref}"
+                f"Deployment snapshot could not be read at git ref:\n{ref}"
             ) from exc
 
-        snapshot_bytes = cast(bytes, ref_snapshot.data_stream.read())
-        with io.BytesIO(snapshot_bytes) as snapshot_f:
-            return load_from_yaml(Deployment, snapshot_f)
+    def _load_single_file(self, snapshot_sha: str, ref: str) -> Deployment:
+        if snapshot_sha not in self._deployments:
+            with self._open_blob(snapshot_sha) as f:
+                self._deployments[snapshot_sha] = _collect_deployment(
+                    iter_deployment_from_yaml(f), ref
+                )
+
+        return self._deployments[snapshot_sha]
+
+    def _load_sharded(self, tree_sha: str, manifest_sha: str) -> Deployment:
+        with self._open_blob(manifest_sha) as f:
+            manifest = load_from_yaml(SnapshotManifest, f)
+
+        releases: list[Release] = []
+        for name, entries in manifest.releases.items():
+            for version in entries:
+                shard_path = self._layout.get_snapshot_shard_path(name, version)
+                shard_sha = self._get_file_sha(tree_sha, shard_path)
+                if shard_sha is None:
+                    raise FileNotFoundError(f"Snapshot file not found: {shard_path}")
+
+                module = self._modules.get(shard_sha)
+                if module is None:
+                    with self._open_blob(shard_sha) as f:
+                        module = load_from_yaml(Module, f)
+                    self._modules[shard_sha] = module
+
+                releases.append(_get_shard_release(manifest, name, version, module))
+
+        return Deployment.model_construct(
+            settings=manifest.settings, releases=collect_releases(releases)
+        )
+
+    def _get_file_sha(self, tree_sha: str, path: Path) -> str | None:
+        """Return the blob hash of a deployment area file in the given tree, if any."""
+        relative_path = path.relative_to(self._layout.deployment_root).as_posix()
+        return self._get_object_sha(f"{tree_sha}:{relative_path}", "blob")
+
+    def _get_object_sha(self, name: str, object_type: str) -> str | None:
+        """Return the hash of the named git object, or None if it is not found."""
+        try:
+            # GitPython returns bytes here, despite its annotations
+            header: tuple[str | bytes, str | bytes, int]
+            header = self._git.get_object_header(name)
+        except ValueError:  # Raised by GitPython for objects that are not found
+            return None
+
+        sha, found_type = (
+            value.decode() if isinstance(value, bytes) else value
+            for value in header[:2]
+        )
+        return sha if found_type == object_type else None
+
+    @contextmanager
+    def _open_blob(self, sha: str) -> Generator[BinaryIO]:
+        """Open a stream of the given blob's contents, as they are read from git.
+
+        The rest of the blob is always read on exit, as the git process cannot be used
+        for another object until then.
+        """
+        _, _, _, stream = self._git.stream_object_data(sha)
+        try:
+            yield cast(BinaryIO, stream)
+        finally:
+            while stream.read(GIT_STREAM_CHUNK_SIZE):
+                pass
+
+
+def _get_snapshot_path(layout: Layout) -> Path:
+    """Return the path that the deployment area's snapshot is read from."""
+    match get_snapshot_format(layout):
+        case SnapshotFormat.SHARDED:
+            return layout.snapshot_manifest_path
+        case SnapshotFormat.SINGLE_FILE:
+            return layout.deployment_snapshot_path
+        case None:
+            raise SnapshotError(
+                f"Deployment snapshot not found:\n{layout.deployment_snapshot_path}"
+            )
+
+
+def _iter_snapshot(layout: Layout) -> Iterator[Release | DeploymentSettings]:
+    snapshot_path = _get_snapshot_path(layout)
+    if snapshot_path == layout.snapshot_manifest_path:
+        yield from _iter_sharded_snapshot(layout, load_snapshot_manifest(layout))
+        return
+
+    try:
+        with open(snapshot_path, "rb") as f:
+            yield from iter_deployment_from_yaml(f)
+    except SNAPSHOT_READ_ERRORS as exc:
+        raise SnapshotError(
+            f"Deployment snapshot could not be read:\n{snapshot_path}"
+        ) from exc
+
+
+def _iter_sharded_snapshot(
+    layout: Layout, manifest: SnapshotManifest
+) -> Iterator[Release | DeploymentSettings]:
+    for name, entries in manifest.releases.items():
+        for version in entries:
+            yield load_snapshot_release(layout, manifest, name, version)
+
+    yield manifest.settings
+
+
+def _load_shard(
+    manifest: SnapshotManifest, name: str, version: str, shard_f: BinaryIO
+) -> Release:
+    with shard_f:
+        module = load_from_yaml(Module, shard_f)
+
+    return _get_shard_release(manifest, name, version, module)
+
+
+def _get_shard_release(
+    manifest: SnapshotManifest, name: str, version: str, module: Module
+) -> Release:
+    entry = manifest.releases[name][version]
+    return Release(module=module, deprecated=entry.deprecated)
+
+
+def _load_deployment_digests(
+    layout: Layout, snapshot_sha256: str
+) -> DeploymentDigests | None:
+    """Return the digests recorded alongside a single-file snapshot.
+
+    The recorded digests are ignored if they are missing, unreadable or were recorded
+    for a different snapshot file.
+    """
+    digests_path = layout.deployment_digests_path
+    if not digests_path.exists():
+        return None
+
+    try:
+        digests = DeploymentDigests.model_validate_json(digests_path.read_bytes())
+    except (OSError, PydanticValidationError):
+        logger.warning("Ignoring unreadable snapshot digests: %s", digests_path)
+        return None
+
+    if digests.snapshot_sha256 != snapshot_sha256:
+        logger.warning("Ignoring out of date snapshot digests: %s", digests_path)
+        return None
+
+    return digests
+
+
+def _get_shard_digests(
+    layout: Layout, manifest: SnapshotManifest
+) -> DigestsByNameAndVersion:
+    """Return the digests recorded in the manifest of a sharded snapshot.
+
+    The digest of a Module whose file no longer matches the checksum recorded with it
+    is left out, so that the Module is compared in full.
+    """
+    digests: DigestsByNameAndVersion = defaultdict(dict)
+    for name, entries in manifest.releases.items():
+        for version, entry in entries.items():
+            shard_path = layout.get_snapshot_shard_path(name, version)
+            shard_sha256 = _get_shard_sha256(shard_path)
+            if entry.shard_sha256 is not None and shard_sha256 == entry.shard_sha256:
+                digests[name][version] = entry.digest
+            else:
+                logger.warning("Ignoring digest of modified snapshot: %s", shard_path)
+
+    return dict(digests)
+
+
+def _get_shard_sha256(shard_path: Path) -> str | None:
+    try:
+        return _get_file_sha256(shard_path)
+    except FileNotFoundError:
+        return None
+
+
+def _get_file_sha256(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _collect_deployment(
+    parts: Iterable[Release | DeploymentSettings], source: str
+) -> Deployment:
+    settings: DeploymentSettings | None = None
+    releases: list[Release] = []
+    for part in parts:
+        if isinstance(part, Release):
+            releases.append(part)
+        else:
+            settings = part
+
+    if settings is None:
+        raise SnapshotError(f"Deployment snapshot has no settings:\n{source}")
+
+    # Every part is already validated, so don't walk every Release again
+    return Deployment.model_construct(
+        settings=settings, releases=collect_releases(releases)
+    )
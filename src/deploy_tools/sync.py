@@ -1,15 +1,34 @@
 import logging
+from collections.abc import Mapping
 from pathlib import Path
 
 from git import InvalidGitRepositoryError, Repo
 
+from .apptainer import (
+    DEFAULT_APPTAINER_CACHE_SIZE,
+    DEFAULT_MAX_PULLS,
+    DEFAULT_SIF_STORE_SIZE,
+    ApptainerCache,
+    PullScheduler,
+    SifStore,
+    load_pull_durations,
+    save_pull_durations,
+)
 from .build import build, clean_build_area
+from .cache import create_ignored_folder
 from .deploy import deploy_changes
+from .download_cache import DEFAULT_DOWNLOAD_CACHE_SIZE, DownloadCache
 from .errors import DeployToolsError
+from .incremental_load import (
+    CONFIG_COMMIT_TRAILER,
+    get_config_commit,
+    load_deployment_incremental,
+)
 from .layout import Layout, ModuleBuildLayout
+from .models.config_cache import ConfigCache
 from .models.save_and_load import load_deployment
-from .snapshot import create_snapshot, load_snapshot
-from .templater import Templater, TemplateType
+from .snapshot import SnapshotFormat, create_snapshot, load_snapshot_with_digests
+from .templater import TemplateType, get_templater
 from .validate import (
     validate_deployment_changes,
 )
@@ -28,28 +47,67 @@ IGNORE_DIRS = [
     f"/{Layout.MODULES_ROOT_NAME}/*/*/{ModuleBuildLayout.SIF_FILES_FOLDER}",
 ]
 
+SYNC_COMMIT_MESSAGE = "Performed sync process"
+
 
 def synchronise(
     deployment_root: Path,
     config_folder: Path,
     allow_all: bool = False,
     from_scratch: bool = False,
+    jobs: int | None = None,
+    cache_dir: Path | None = None,
+    incremental: bool = False,
+    snapshot_format: SnapshotFormat | None = None,
+    max_pulls: int = DEFAULT_MAX_PULLS,
+    registry_max_pulls: Mapping[str, int] | None = None,
+    download_cache_size: int = DEFAULT_DOWNLOAD_CACHE_SIZE,
+    sif_store_size: int = DEFAULT_SIF_STORE_SIZE,
+    apptainer_cache_dir: Path | None = None,
+    apptainer_cache_size: int = DEFAULT_APPTAINER_CACHE_SIZE,
 ) -> None:
     """Synchronise the deployment folder with the current configuration."""
-    logger.info("Loading deployment configuration from: %s", config_folder)
-    deployment = load_deployment(config_folder)
-
     logger.info("Loading deployment snapshot")
     layout = Layout(deployment_root)
-    snapshot = load_snapshot(layout, from_scratch)
+    snapshot, snapshot_digests = load_snapshot_with_digests(
+        layout, from_scratch, trusted=True
+    )
+
+    logger.info("Loading deployment configuration from: %s", config_folder)
+    config_commit = get_config_commit(config_folder)
+    config_cache = ConfigCache(cache_dir) if cache_dir is not None else None
+    if incremental and not from_scratch:
+        deployment = load_deployment_incremental(
+            config_folder, layout, snapshot, jobs, config_cache
+        )
+    else:
+        deployment = load_deployment(config_folder, jobs, config_cache)
 
     logger.info("Validating deployment changes")
-    deployment_changes = validate_deployment_changes(deployment, snapshot, allow_all)
+    deployment_changes = validate_deployment_changes(
+        deployment, snapshot, allow_all, snapshot_digests
+    )
 
     logger.info("Cleaning build area")
     clean_build_area(layout)
     logger.info("Building modules")
-    build(deployment_changes, layout)
+    create_ignored_folder(layout.cache_root)
+    sif_store = SifStore(layout.sif_store_root, sif_store_size)
+    download_cache = DownloadCache(layout.cache_root, download_cache_size)
+    apptainer_cache = ApptainerCache(
+        apptainer_cache_dir or layout.apptainer_cache_root, apptainer_cache_size
+    )
+    expected_durations = load_pull_durations(layout.pull_durations_path)
+    with PullScheduler(
+        max_pulls, registry_max_pulls, expected_durations, sif_store, apptainer_cache
+    ) as pulls:
+        build(deployment_changes, layout, jobs, pulls, download_cache)
+
+    sif_store.evict()
+    download_cache.evict()
+    apptainer_cache.evict()
+    if pulls.durations:
+        save_pull_durations(layout.pull_durations_path, pulls.durations)
 
     repo: Repo
     if from_scratch:
@@ -66,22 +124,34 @@ def synchronise(
 
     with repo:
         logger.info("Creating snapshot")
-        create_snapshot(deployment, layout)
+        create_snapshot(deployment, layout, snapshot_format)
 
         logger.info("Deploying changes")
         deploy_changes(deployment_changes, layout)
 
         logger.info("Committing changes to git (for reference)")
         repo.git.add("--all")
-        commit = repo.index.commit("Performed sync process")
+        commit = repo.index.commit(_get_sync_commit_message(config_commit))
         logger.info("Commit SHA: %s", commit.hexsha)
 
     logger.info("Sync process finished")
 
 
+def _get_sync_commit_message(config_commit: str | None) -> str:
+    """Return the commit message for a sync, recording the configuration commit.
+
+    This allows a later sync to load configuration incrementally.
+    """
+    message = SYNC_COMMIT_MESSAGE
+    if config_commit is not None:
+        message += f"\n\n{CONFIG_COMMIT_TRAILER}: {config_commit}"
+
+    return message
+
+
 def _initialise_git_repo(path: Path, ignore_dirs: list[str]) -> Repo:
     repo = Repo.init(path, mkdir=False, initial_branch="main")
-    t = Templater()
+    t = get_templater()
     params = {"ignore_dirs": ignore_dirs}
     t.create(path / ".gitignore", TemplateType.GITIGNORE, params)
 
@@ -1,10 +1,15 @@
+import logging
+import threading
+import uuid
 from enum import StrEnum
 from pathlib import Path
 from typing import Any
 
 import jinja2
 
-__all__ = ["TemplateType", "Templater"]
+__all__ = ["TemplateType", "Templater", "get_templater"]
+
+logger = logging.getLogger(__name__)
 
 TEMPLATES_PACKAGE = "deploy_tools"
 
@@ -28,11 +33,20 @@ class Templater:
 
     File permissions are also managed here to ensure consistency of output between
     different Application types.
+
+    Every template is loaded on creation, so a single Templater can be shared by
+    threads that create files concurrently. Use get_templater() to obtain the instance
+    shared by the whole process.
+
+    Compiled templates are kept in a Jinja bytecode cache, if one is given, so that
+    later processes load them without compiling them again.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, bytecode_cache: jinja2.BytecodeCache | None = None) -> None:
         self._env = jinja2.Environment(
-            loader=jinja2.PackageLoader(TEMPLATES_PACKAGE), trim_blocks=True
+            loader=jinja2.PackageLoader(TEMPLATES_PACKAGE),
+            trim_blocks=True,
+            bytecode_cache=bytecode_cache,
         )
         self._templates: dict[str, jinja2.Template] = {}
         self._load_templates()
@@ -45,21 +59,116 @@ class Templater:
         executable: bool = False,
         overwrite: bool = False,
         create_parents: bool = False,
-    ) -> None:
-        """Create an output file, using the given template and template parameters."""
+        reuse_from: Path | None = None,
+    ) -> bool:
+        """Create an output file, using the given template and template parameters.
+
+        With ``overwrite``, an existing file that already holds the rendered content is
+        left untouched, so that its modification time is kept and no write is made.
+        Otherwise the file is replaced atomically, so that it is never seen partially
+        written.
+
+        With ``reuse_from``, that file is hard-linked to the output path instead of
+        writing the output, if it already holds the rendered content.
+
+        Returns:
+            Whether the file was written.
+        """
         if create_parents:
             output_file.parent.mkdir(exist_ok=True, parents=True)
 
-        open_mode = "w" if overwrite else "x"
-        with open(output_file, open_mode) as f:
-            rendered = self._templates[template].render(**parameters)
-            # enforce single trailing newline for pre-commit goodness
-            rendered = rendered.strip() + "\n"
+        rendered = self._templates[template].render(**parameters)
+        # enforce single trailing newline for pre-commit goodness
+        rendered = rendered.strip() + "\n"
+        permissions = EXECUTABLE_PERMISSIONS if executable else DEFAULT_PERMISSIONS
+
+        if reuse_from is not None and _link_if_identical(
+            reuse_from, output_file, rendered.encode(), permissions
+        ):
+            return False
+
+        if overwrite:
+            return _replace_if_changed(output_file, rendered.encode(), permissions)
+
+        with open(output_file, "x") as f:
             f.write(rendered)
 
-        permissions = EXECUTABLE_PERMISSIONS if executable else DEFAULT_PERMISSIONS
         output_file.chmod(permissions)
+        return True
 
     def _load_templates(self) -> None:
         for template_type in TemplateType:
             self._templates[template_type] = self._env.get_template(str(template_type))
+
+
+_templater: Templater | None = None
+_templater_lock = threading.Lock()
+
+
+def get_templater() -> Templater:
+    """Return the Templater shared by the whole process, creating it on first use."""
+    global _templater
+
+    with _templater_lock:
+        if _templater is None:
+            _templater = Templater(_get_bytecode_cache())
+
+        return _templater
+
+
+def _get_bytecode_cache() -> jinja2.BytecodeCache | None:
+    """Return a bytecode cache in a private folder under the system's temporary folder.
+
+    Cached bytecode is keyed by the template source and the Jinja and Python versions,
+    so upgrading any of these never loads stale bytecode. Templates are compiled on
+    every run instead if no safe cache folder is available.
+    """
+    try:
+        return jinja2.FileSystemBytecodeCache()
+    except (OSError, RuntimeError) as exc:
+        logger.debug("Jinja bytecode cache unavailable: %s", exc)
+        return None
+
+
+def _replace_if_changed(output_file: Path, content: bytes, permissions: int) -> bool:
+    """Atomically replace a file with the given content, unless it already holds it."""
+    try:
+        unchanged = output_file.read_bytes() == content
+    except FileNotFoundError:
+        unchanged = False
+
+    if unchanged:
+        if output_file.stat().st_mode & 0o777 != permissions:
+            output_file.chmod(permissions)
+
+        return False
+
+    temporary_path = output_file.with_name(f".{output_file.name}.{uuid.uuid4().hex}")
+    try:
+        temporary_path.write_bytes(content)
+        temporary_path.chmod(permissions)
+        temporary_path.replace(output_file)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+    return True
+
+
+def _link_if_identical(
+    source: Path, output_file: Path, content: bytes, permissions: int
+) -> bool:
+    """Hard-link a file to the output path, if it holds the content and permissions."""
+    try:
+        if source.stat().st_mode & 0o777 != permissions:
+            return False
+
+        if source.read_bytes() != content:
+            return False
+
+        output_file.hardlink_to(source)
+    except FileExistsError:
+        raise
+    except OSError:  # Missing, or on another filesystem
+        return False
+
+    return True
@@ -1,31 +1,39 @@
 import logging
+from collections.abc import Mapping
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
-from natsort import natsorted
-
+from .apptainer import (
+    DEFAULT_APPTAINER_CACHE_SIZE,
+    DEFAULT_MAX_PULLS,
+    ApptainerCache,
+    PullScheduler,
+    load_pull_durations,
+)
 from .build import build
+from .dependency_graph import DependencyGraph, format_dependency_chain
+from .download_cache import DEFAULT_DOWNLOAD_CACHE_SIZE, DownloadCache
 from .errors import DeployToolsError
-from .external_tools import run_command
+from .incremental_load import load_deployment_incremental
 from .layout import Layout
 from .models.changes import DeploymentChanges, ReleaseChanges
+from .models.config_cache import ConfigCache
 from .models.deployment import (
     DefaultVersionsByName,
     Deployment,
-    ModulesByName,
+    DeploymentIndex,
+    DigestsByNameAndVersion,
     ReleasesByNameAndVersion,
 )
-from .models.module import Release
+from .models.module import Module, Release
 from .models.save_and_load import load_deployment
 from .print_updates import print_updates
-from .snapshot import load_snapshot
+from .script_check import ScriptCheckCache, check_shell_syntax, is_shell_script
+from .snapshot import load_snapshot_with_digests
 
 logger = logging.getLogger(__name__)
 
 
-SCRIPT_INDICATOR_PHRASE = "shell script"
-
-
 class ValidationError(DeployToolsError):
     """Raised when the deployment configuration fails validation."""
 
@@ -36,19 +44,35 @@ def validate_and_test_configuration(
     allow_all: bool = False,
     from_scratch: bool = False,
     test_build: bool = False,
+    jobs: int | None = None,
+    cache_dir: Path | None = None,
+    incremental: bool = False,
+    max_pulls: int = DEFAULT_MAX_PULLS,
+    registry_max_pulls: Mapping[str, int] | None = None,
+    download_cache_size: int = DEFAULT_DOWNLOAD_CACHE_SIZE,
+    apptainer_cache_dir: Path | None = None,
+    apptainer_cache_size: int = DEFAULT_APPTAINER_CACHE_SIZE,
 ) -> None:
     """Validate deployment configuration and perform a test build."""
     with TemporaryDirectory() as build_dir:
-        logger.info("Loading deployment configuration from: %s", config_folder)
-        deployment = load_deployment(config_folder)
-
         logger.info("Loading deployment snapshot")
         layout = Layout(deployment_root, build_root=Path(build_dir))
-        snapshot = load_snapshot(layout, from_scratch)
+        snapshot, snapshot_digests = load_snapshot_with_digests(
+            layout, from_scratch, trusted=True
+        )
+
+        logger.info("Loading deployment configuration from: %s", config_folder)
+        config_cache = ConfigCache(cache_dir) if cache_dir is not None else None
+        if incremental and not from_scratch:
+            deployment = load_deployment_incremental(
+                config_folder, layout, snapshot, jobs, config_cache
+            )
+        else:
+            deployment = load_deployment(config_folder, jobs, config_cache)
 
         logger.info("Validating deployment changes")
         deployment_changes = validate_deployment_changes(
-            deployment, snapshot, allow_all
+            deployment, snapshot, allow_all, snapshot_digests
         )
 
         logger.info("Retrieving previous default versions")
@@ -56,8 +80,37 @@ def validate_and_test_configuration(
 
         if test_build:
             logger.info("Performing test build")
-            build(deployment_changes, layout)
-            _check_built_scripts(deployment_changes, layout)
+            download_cache = (
+                DownloadCache(cache_dir, download_cache_size)
+                if cache_dir is not None
+                else None
+            )
+            if apptainer_cache_dir is None and cache_dir is not None:
+                apptainer_cache_dir = cache_dir / Layout.APPTAINER_CACHE_FOLDER_NAME
+
+            apptainer_cache = (
+                ApptainerCache(apptainer_cache_dir, apptainer_cache_size)
+                if apptainer_cache_dir is not None
+                else None
+            )
+            expected_durations = load_pull_durations(layout.pull_durations_path)
+            with PullScheduler(
+                max_pulls,
+                registry_max_pulls,
+                expected_durations,
+                apptainer_cache=apptainer_cache,
+            ) as pulls:
+                build(deployment_changes, layout, jobs, pulls, download_cache)
+
+            if download_cache is not None:
+                download_cache.evict()
+            if apptainer_cache is not None:
+                apptainer_cache.evict()
+
+            script_cache = (
+                ScriptCheckCache(cache_dir) if cache_dir is not None else None
+            )
+            _check_built_scripts(deployment_changes, layout, jobs, script_cache)
 
         logger.info("Printing updates")
         print_updates(snapshot_default_versions, deployment_changes)
@@ -66,53 +119,78 @@ def validate_and_test_configuration(
 
 
 def validate_deployment_changes(
-    deployment: Deployment, snapshot: Deployment, allow_all: bool
+    deployment: Deployment,
+    snapshot: Deployment,
+    allow_all: bool,
+    snapshot_digests: DigestsByNameAndVersion | None = None,
 ) -> DeploymentChanges:
-    """Validate configuration to get set of actions that need to be carried out."""
-    release_changes = _validate_release_changes(deployment, snapshot, allow_all)
+    """Validate configuration to get set of actions that need to be carried out.
+
+    The Module digests recorded with the snapshot, if given, let unchanged Modules be
+    recognised without comparing them field by field.
+    """
     default_versions = validate_default_versions(deployment)
+    dependency_graph = DependencyGraph(deployment, default_versions)
+    release_changes = _validate_release_changes(
+        deployment, snapshot, dependency_graph, allow_all, snapshot_digests or {}
+    )
     return DeploymentChanges(
         release_changes=release_changes, default_versions=default_versions
     )
 
 
 def _validate_release_changes(
-    deployment: Deployment, snapshot: Deployment, allow_all: bool
+    deployment: Deployment,
+    snapshot: Deployment,
+    dependency_graph: DependencyGraph,
+    allow_all: bool,
+    snapshot_digests: DigestsByNameAndVersion,
 ) -> ReleaseChanges:
     """Validate configuration to get set of Release changes."""
     old_releases = snapshot.releases
     new_releases = deployment.releases
 
-    _validate_module_dependencies(deployment)
-    return _get_release_changes(old_releases, new_releases, allow_all)
+    _validate_module_dependencies(dependency_graph)
+    release_changes = _get_release_changes(
+        old_releases, new_releases, allow_all, snapshot_digests
+    )
+
+    # Build Modules after their dependencies
+    order = {
+        key: position
+        for position, key in enumerate(dependency_graph.get_topological_order())
+    }
+    for releases in (release_changes.to_add, release_changes.to_update):
+        releases.sort(key=lambda r: order[r.module.name, r.module.version])
+
+    return release_changes
 
 
-def _validate_module_dependencies(deployment: Deployment) -> None:
+def _validate_module_dependencies(dependency_graph: DependencyGraph) -> None:
     """Ensure that all module dependencies reference versions that will exist.
 
     Only dependencies that pin a version are checked: if the dependency is a Module
     managed by this deployment, the pinned version must be present among the final
-    deployed (non-deprecated) versions.
+    deployed (non-deprecated) versions. Dependencies must also not form a cycle.
     """
-    final_deployed_versions = deployment.get_final_deployed_versions()
+    for (name, version), dependency in dependency_graph.unknown_dependencies:
+        raise ValidationError(
+            f"Module {name}/{version} has unknown module dependency "
+            f"{dependency.name}/{dependency.version}."
+        )
 
-    for name, release_versions in deployment.releases.items():
-        for version, release in release_versions.items():
-            for dependency in release.module.dependencies:
-                dep_name = dependency.name
-                dep_version = dependency.version
-                if dep_version is not None and dep_name in final_deployed_versions:
-                    if dep_version not in final_deployed_versions[dep_name]:
-                        raise ValidationError(
-                            f"Module {name}/{version} has unknown module dependency "
-                            f"{dep_name}/{dep_version}."
-                        )
+    cycle = dependency_graph.find_cycle()
+    if cycle is not None:
+        raise ValidationError(
+            f"Module dependencies form a cycle: {format_dependency_chain(cycle)}"
+        )
 
 
 def _get_release_changes(
     old_releases: ReleasesByNameAndVersion,
     new_releases: ReleasesByNameAndVersion,
     allow_all: bool,
+    snapshot_digests: DigestsByNameAndVersion,
 ) -> ReleaseChanges:
     release_changes = ReleaseChanges()
     for name in new_releases:
@@ -127,7 +205,8 @@ def _get_release_changes(
 
             old_release = old_releases[name][version]
 
-            if old_release.module != new_release.module:
+            old_digest = snapshot_digests.get(name, {}).get(version)
+            if _is_module_changed(old_release.module, new_release.module, old_digest):
                 if old_release.module.allow_updates:
                     release_changes.to_update.append(new_release)
                     continue
@@ -156,6 +235,22 @@ def _get_release_changes(
     return release_changes
 
 
+def _is_module_changed(
+    old_module: Module, new_module: Module, old_digest: str | None
+) -> bool:
+    """Return whether a Module's configuration differs from its previous release.
+
+    A recorded digest of the previous Module that matches the new Module's digest shows
+    that the Module is unchanged without comparing every field. Otherwise the Modules
+    are compared in full, so that a change in how digests are calculated can never
+    cause a spurious update.
+    """
+    if old_digest is not None and old_digest == new_module.digest:
+        return False
+
+    return old_module != new_module
+
+
 def _validate_added_modules(releases: list[Release], allow_all: bool) -> None:
     for release in releases:
         module = release.module
@@ -179,17 +274,17 @@ def _validate_removed_modules(releases: list[Release], allow_all: bool) -> None:
 
 def validate_default_versions(deployment: Deployment) -> DefaultVersionsByName:
     """Validate configuration to get set of default version changes."""
-    final_deployed_versions = deployment.get_final_deployed_versions()
+    index = deployment.index
 
     for name, version in deployment.settings.default_versions.items():
-        if version not in final_deployed_versions[name]:
+        if not index.is_final_version(name, version):
             raise ValidationError(
                 f"Unable to configure {name}/{version} as default; module will not "
                 f"exist."
             )
 
     default_versions = _get_all_default_versions(
-        deployment.settings.default_versions, deployment.get_final_deployed_modules()
+        deployment.settings.default_versions, index
     )
 
     return default_versions
@@ -197,7 +292,7 @@ def validate_default_versions(deployment: Deployment) -> DefaultVersionsByName:
 
 def _get_all_default_versions(
     initial_defaults: DefaultVersionsByName,
-    final_deployed_modules: ModulesByName,
+    index: DeploymentIndex,
 ) -> DefaultVersionsByName:
     """Return the default versions that will be used for all modules in configuration.
 
@@ -208,14 +303,17 @@ def _get_all_default_versions(
     final_defaults: DefaultVersionsByName = {}
     final_defaults.update(initial_defaults)
 
-    for name in final_deployed_modules:
+    for name, modules in index.final_modules.items():
         if name in final_defaults:
             continue
 
+        excluded = {
+            module.version for module in modules if module.exclude_from_defaults
+        }
         versions = [
-            module.version
-            for module in final_deployed_modules[name]
-            if not module.exclude_from_defaults
+            version
+            for version in index.sorted_final_versions[name]
+            if version not in excluded
         ]
 
         if not versions:
@@ -228,54 +326,41 @@ def _get_all_default_versions(
                 f"default or provide an alternative version without the exclusion."
             )
 
-        # The key follows natsort's documentation for supporting non-SemVer strings
-        # E.g. 1.2rc1 should come before 1.2.1 or 1.2
-        sorted_versions = natsorted(versions, key=lambda x: x.replace(".", "~") + "z")
-        final_defaults[name] = sorted_versions[-1]
+        # Versions are in natural order, e.g. 1.2rc1 comes before 1.2.1 or 1.2
+        final_defaults[name] = versions[-1]
 
     return final_defaults
 
 
-def _is_shell_script(file: Path) -> bool:
-    """Determine whether specified file is a shell script.
-
-    This uses the output of the Linux 'file' command, which is dependent on the
-    shebang line as well as the OS. Both are controlled in our deployment.
-    """
-    result = run_command(["file", str(file.absolute())], capture_output=True, text=True)
-    return SCRIPT_INDICATOR_PHRASE in result.stdout
-
-
-def _check_bash_syntax(file: Path) -> None:
-    """Check bash syntax is valid for the given file.
-
-    Since failing this validation will prevent a deploy-tools job from continuing, we
-    don't want to use more stringent tests as with e.g. shellcheck.
+def _check_built_scripts(
+    changes: DeploymentChanges,
+    layout: Layout,
+    max_workers: int | None,
+    cache: ScriptCheckCache | None,
+) -> None:
+    """Check the syntax of all shell-script entrypoints in the built modules.
 
-    This is also unable to check that all required functions and tools are available, so
-    some typos are likely to pass.
+    Every script is checked before any failures are reported, so that all of them can
+    be fixed at once.
     """
-    result = run_command(
-        ["bash", "-n", str(file.absolute())],
-        capture_output=True,
-        text=True,
-    )
-    if result.returncode != 0:
-        raise ValidationError(
-            f"Output script {file.absolute()} is invalid with errors:\n{result.stderr}"
-        )
-
-
-def _check_built_scripts(changes: DeploymentChanges, layout: Layout) -> None:
-    """Check the syntax of all shell-script entrypoints in the built modules."""
     release_changes = changes.release_changes
     releases = release_changes.to_add + release_changes.to_update
     build_layout = layout.build_layout
 
+    scripts: list[Path] = []
     for release in releases:
         name = release.module.name
         version = release.module.version
 
         for entrypoint in build_layout.get_entrypoints_folder(name, version).glob("*"):
-            if _is_shell_script(entrypoint):
-                _check_bash_syntax(entrypoint)
+            if is_shell_script(entrypoint):
+                scripts.append(entrypoint)
+
+    failures = check_shell_syntax(scripts, max_workers, cache)
+    if failures:
+        raise ValidationError(
+            "\n".join(
+                f"Output script {file.absolute()} is invalid with errors:\n{errors}"
+                for file, errors in failures
+            )
+        )
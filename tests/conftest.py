@@ -1,9 +1,15 @@
+import threading
+import time
+from collections import Counter
+from collections.abc import Mapping
 from pathlib import Path
 
 import pytest
 from typer.testing import CliRunner
 
+from deploy_tools import apptainer
 from deploy_tools.__main__ import app
+from deploy_tools.apptainer import get_registry
 
 runner = CliRunner()
 
@@ -39,6 +45,8 @@ def stub_apptainer_pull(monkeypatch: pytest.MonkeyPatch) -> None:
     validation, parent-directory creation) still runs. The golden-master comparison
     ignores ``.sif`` files, so a no-op suffices. Without this, building an Apptainer
     module hard-fails on a runner without apptainer or does a real registry pull.
+    Image digests are left unresolved, so no registry is contacted and the SIF store is
+    bypassed.
 
     Args:
         monkeypatch: The pytest ``monkeypatch`` fixture.
@@ -47,4 +55,65 @@ def stub_apptainer_pull(monkeypatch: pytest.MonkeyPatch) -> None:
     def _no_pull(*args: object, **kwargs: object) -> None:
         return None
 
+    def _no_digest(container_url: str) -> None:
+        return None
+
     monkeypatch.setattr("deploy_tools.apptainer.run_command", _no_pull)
+    monkeypatch.setattr("deploy_tools.apptainer.resolve_image_digest", _no_digest)
+
+
+class FakeApptainerPull:
+    """Stands in for ``apptainer pull``, writing the pulled URL as the SIF file.
+
+    Every pull is recorded in the order it started, along with the environment it ran
+    with and how many pulls ran at once for each registry. A pull waits until
+    ``release`` is set, which it is by default, and pulls of URLs containing "broken"
+    fail.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.release = threading.Event()
+        self.release.set()
+        self.pulled: list[str] = []
+        self.environments: list[Mapping[str, str] | None] = []
+        self.active: Counter[str] = Counter()
+        self.max_active: Counter[str] = Counter()
+
+    def __call__(
+        self, command: list[str | Path], *, check: bool, env: Mapping[str, str] | None
+    ) -> None:
+        url = str(command[-1])
+        registry = get_registry(url)
+        with self.lock:
+            self.pulled.append(url)
+            self.environments.append(env)
+            for key in (registry, "all"):
+                self.active[key] += 1
+                self.max_active[key] = max(self.max_active[key], self.active[key])
+
+        self.release.wait()
+        time.sleep(0.01)
+        with self.lock:
+            for key in (registry, "all"):
+                self.active[key] -= 1
+
+        if "broken" in url:
+            raise apptainer.ApptainerError(f"Pull failed: {url}")
+
+        Path(command[-2]).write_text(url)
+
+
+@pytest.fixture
+def fake_apptainer_pull(monkeypatch: pytest.MonkeyPatch) -> FakeApptainerPull:
+    """Replace the external ``apptainer pull`` with a ``FakeApptainerPull``.
+
+    Unlike ``stub_apptainer_pull``, each pull writes a SIF file and is recorded, so
+    tests can check which images were pulled. Image digests are still resolved.
+
+    Args:
+        monkeypatch: The pytest ``monkeypatch`` fixture.
+    """
+    fake_pull = FakeApptainerPull()
+    monkeypatch.setattr(apptainer, "run_command", fake_pull)
+    return fake_pull
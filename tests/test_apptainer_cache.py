@@ -0,0 +1,54 @@
+"""Tests for the Apptainer layer cache kept in each deployment area."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from conftest import FakeApptainerPull, run_cli
+from deploy_tools import apptainer
+from deploy_tools.apptainer import ApptainerCache
+from deploy_tools.layout import Layout
+
+
+def _write_entry(path: Path, size: int, last_used: float) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\0" * size)
+    os.utime(path, (last_used, last_used))
+
+
+def _unresolved(container_url: str) -> None:
+    return None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    cache = ApptainerCache(tmp_path, max_size=None)
+    blobs = tmp_path / "cache" / "blob" / "blobs" / "sha256"
+    _write_entry(blobs / "old", 100, 1000)
+    _write_entry(blobs / "new", 100, 3000)
+    _write_entry(tmp_path / "cache" / "oci-tmp" / "image" / "image.sif", 100, 2000)
+    assert cache.get_usage() == (3, 300)
+
+    # Nothing is evicted without a size limit
+    assert cache.evict() == 0
+    assert cache.evict(max_size=150) == 200
+    assert cache.get_usage() == (1, 100)
+    assert (blobs / "new").exists()
+
+
+def test_sync_pulls_with_deployment_area_cache(
+    tmp_path: Path,
+    configs: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    fake_apptainer_pull: FakeApptainerPull,
+) -> None:
+    monkeypatch.setattr(apptainer, "resolve_image_digest", _unresolved)
+    area = tmp_path / "area"
+    area.mkdir()
+    run_cli("sync", "--from-scratch", area, configs / "golden-master" / "01-initial")
+
+    cache_dir = str(Layout(area).apptainer_cache_root)
+    environments = fake_apptainer_pull.environments
+    assert environments
+    assert all(env == {"APPTAINER_CACHEDIR": cache_dir} for env in environments)
+    assert "Apptainer cache: 0 entries" in run_cli("cache", "stats", area)
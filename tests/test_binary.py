@@ -101,3 +101,46 @@ def test_sync_rejects_binary_with_wrong_hash(tmp_path: Path) -> None:
         match="Downloaded Binary .*/downloads/example-tool hash check failed",
     ):
         run_cli("sync", "--from-scratch", deployment_root, config_folder)
+
+
+def test_repeat_builds_use_download_cache(tmp_path: Path) -> None:
+    # Once downloaded and verified, a binary is linked from the cache, so later builds
+    # of the same binary need no download, including test builds given a cache folder.
+    deployment_root, config_folder = _write_binary_deployment(
+        tmp_path, "sha256", DIGESTS["sha256"]
+    )
+    test_build = ["validate", "--test-build", "--cache-dir", tmp_path / "cache"]
+    run_cli(*test_build, "--from-scratch", deployment_root, config_folder)
+    run_cli("sync", "--from-scratch", deployment_root, config_folder)
+    (tmp_path / "downloads" / "example-tool").unlink()
+
+    module_dir = config_folder / "example-binary"
+    release = (module_dir / "1.0.yaml").read_text()
+    (module_dir / "2.0.yaml").write_text(release.replace("'1.0'", "'2.0'"))
+    run_cli(*test_build, deployment_root, config_folder)
+    run_cli("sync", deployment_root, config_folder)
+
+    modules = deployment_root / "modules/example-binary"
+    first = modules / "1.0/entrypoints/example-tool"
+    second = modules / "2.0/entrypoints/example-tool"
+    assert second.read_bytes() == BINARY_CONTENT
+    assert second.stat().st_ino == first.stat().st_ino
+
+
+def test_cached_download_does_not_change_hash_check(tmp_path: Path) -> None:
+    # The hash check is case-sensitive, so a binary whose hash differs only in case
+    # must fail just as it would with an empty cache.
+    deployment_root, config_folder = _write_binary_deployment(
+        tmp_path, "sha256", DIGESTS["sha256"]
+    )
+    run_cli("sync", "--from-scratch", deployment_root, config_folder)
+
+    module_dir = config_folder / "example-binary"
+    release = (module_dir / "1.0.yaml").read_text()
+    (module_dir / "2.0.yaml").write_text(
+        release.replace("'1.0'", "'2.0'").replace(
+            DIGESTS["sha256"], DIGESTS["sha256"].upper()
+        )
+    )
+    with pytest.raises(AppBuilderError, match="hash check failed"):
+        run_cli("sync", deployment_root, config_folder)
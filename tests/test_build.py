@@ -0,0 +1,148 @@
+"""Tests for building modules, serially and concurrently."""
+
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+import yaml
+
+from deploy_tools import app_builder
+from deploy_tools import build as build_module
+from deploy_tools.build import BuildError, build
+from deploy_tools.layout import Layout
+from deploy_tools.models.changes import DeploymentChanges
+from deploy_tools.models.deployment import Deployment, DeploymentSettings
+from deploy_tools.models.module import Module
+from deploy_tools.models.save_and_load import load_deployment
+from deploy_tools.module_builder import ModuleBuilder
+from deploy_tools.validate import validate_deployment_changes
+
+
+def _get_changes(configs: Path) -> DeploymentChanges:
+    """Return the changes that deploy the golden master's first stage from scratch."""
+    deployment = load_deployment(configs / "golden-master" / "01-initial")
+    snapshot = Deployment(settings=DeploymentSettings(), releases={})
+    return validate_deployment_changes(deployment, snapshot, allow_all=True)
+
+
+def _read_tree(root: Path) -> dict[str, bytes | str]:
+    return {
+        path.relative_to(root).as_posix(): (
+            str(path.readlink()) if path.is_symlink() else path.read_bytes()
+        )
+        for path in sorted(root.glob("**/*"))
+        if not path.is_dir()
+    }
+
+
+def test_concurrent_build_matches_serial_build(
+    tmp_path: Path, configs: Path, stub_apptainer_pull: None
+) -> None:
+    changes = _get_changes(configs)
+    serial = Layout(tmp_path / "area", build_root=tmp_path / "serial")
+    concurrent = Layout(tmp_path / "area", build_root=tmp_path / "concurrent")
+
+    build(changes, serial, max_workers=1)
+    build(changes, concurrent, max_workers=4)
+
+    serial_tree = _read_tree(serial.build_layout.build_root)
+    assert serial_tree
+    assert _read_tree(concurrent.build_layout.build_root) == serial_tree
+
+
+@pytest.mark.parametrize("failures", [1, 2])
+def test_failed_builds_do_not_stop_other_modules(
+    tmp_path: Path,
+    configs: Path,
+    stub_apptainer_pull: None,
+    monkeypatch: pytest.MonkeyPatch,
+    failures: int,
+) -> None:
+    changes = _get_changes(configs)
+    release_changes = changes.release_changes
+    modules = [release.module for release in release_changes.to_add]
+    failing = modules[:failures]
+
+    create_module = ModuleBuilder.create_module
+
+    def _create_or_fail(self: ModuleBuilder, module: Module) -> list[Future[None]]:
+        if module in failing:
+            raise ValueError(f"Cannot build {module.name}")
+        return create_module(self, module)
+
+    monkeypatch.setattr(build_module.ModuleBuilder, "create_module", _create_or_fail)
+    layout = Layout(tmp_path / "area", build_root=tmp_path / "build")
+
+    if failures == 1:
+        # A single failure is raised as it is, as for a serial build
+        with pytest.raises(ValueError, match=f"Cannot build {failing[0].name}"):
+            build(changes, layout, max_workers=4)
+    else:
+        with pytest.raises(BuildError, match=f"Failed to build {failures} modules"):
+            build(changes, layout, max_workers=4)
+
+    for module in modules[failures:]:
+        assert layout.build_layout.get_module_snapshot_path(
+            module.name, module.version
+        ).exists()
+
+
+def test_modules_are_rendered_while_binaries_download(
+    tmp_path: Path,
+    configs: Path,
+    stub_apptainer_pull: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    config = tmp_path / "config"
+    shutil.copytree(configs / "golden-master" / "01-initial", config)
+    release = {
+        "module": {
+            "name": "binary",
+            "version": "1.0",
+            "applications": [
+                {
+                    "app_type": "binary",
+                    "name": "tool",
+                    "url": "https://example.com/tool",
+                    "hash_type": "none",
+                }
+            ],
+        }
+    }
+    (config / "binary").mkdir()
+    (config / "binary" / "1.0.yaml").write_text(yaml.safe_dump(release))
+    deployment = load_deployment(config)
+    snapshot = Deployment(settings=DeploymentSettings(), releases={})
+    changes = validate_deployment_changes(deployment, snapshot, allow_all=True)
+
+    released = threading.Event()
+
+    def _slow_download(url: str, destination: Path, *args: object) -> None:
+        assert released.wait(timeout=10)
+        destination.write_text(url)
+
+    monkeypatch.setattr(app_builder, "download_file", _slow_download)
+    layout = Layout(tmp_path / "area", build_root=tmp_path / "build")
+    build_layout = layout.build_layout
+    builder = threading.Thread(target=build, args=(changes, layout, 4))
+    builder.start()
+
+    # Every module, including the one downloading a binary, is rendered meanwhile
+    snapshots = [
+        build_layout.get_module_snapshot_path(module.name, module.version)
+        for module in (release.module for release in changes.release_changes.to_add)
+    ]
+    deadline = time.monotonic() + 10
+    while not all(path.exists() for path in snapshots) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert all(path.exists() for path in snapshots)
+    binary = build_layout.get_entrypoints_folder("binary", "1.0") / "tool"
+    assert not binary.exists()
+
+    released.set()
+    builder.join()
+    assert binary.read_text() == "https://example.com/tool"
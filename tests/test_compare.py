@@ -6,7 +6,13 @@ import pytest
 from conftest import run_cli
 from deploy_tools.compare import ComparisonError, compare_to_snapshot
 from deploy_tools.layout import Layout
-from deploy_tools.snapshot import SnapshotError
+from deploy_tools.snapshot import (
+    SnapshotError,
+    iter_snapshot_releases,
+    load_snapshot,
+    load_snapshot_from_ref,
+    load_snapshots_from_refs,
+)
 
 # The minimal config deploys a single shell-only module. Tests that deploy it and then
 # corrupt it in one specific way use this name and version to find it.
@@ -148,6 +154,26 @@ def test_compare_use_ref_detects_drift(tmp_path: Path, configs: Path) -> None:
         run_cli("compare", "--use-ref", "HEAD~1", tmp_path)
 
 
+def test_load_snapshots_from_refs_reads_history(tmp_path: Path, configs: Path) -> None:
+    # The last two syncs use the same configuration, so their snapshots are identical
+    run_cli(
+        "sync", "--from-scratch", tmp_path, configs / "valid" / "multi-version-active"
+    )
+    run_cli("sync", tmp_path, configs / "valid" / "multi-version-deprecated")
+    run_cli("sync", tmp_path, configs / "valid" / "multi-version-deprecated")
+
+    layout = Layout(tmp_path)
+    refs = ["HEAD", "HEAD~1", "HEAD~2"]
+    snapshots = load_snapshots_from_refs(layout, refs)
+    assert list(snapshots) == refs
+    for ref in refs:
+        assert snapshots[ref] == load_snapshot_from_ref(layout, ref)
+
+    assert snapshots["HEAD"] == load_snapshot(layout)
+    assert snapshots["HEAD~1"] is snapshots["HEAD"]
+    assert snapshots["HEAD~2"] != snapshots["HEAD"]
+
+
 def test_compare_from_scratch_rejects_missing_root(tmp_path: Path) -> None:
     # The CLI's argument validation rejects a non-existent path before the command runs,
     # so exercise this guard by calling the function directly.
@@ -194,3 +220,21 @@ def test_compare_rejects_unknown_git_ref(tmp_path: Path, configs: Path) -> None:
     _sync_minimal(tmp_path, configs)
     with pytest.raises(SnapshotError, match="not found at git ref:\nno-such-ref"):
         run_cli("compare", "--use-ref", "no-such-ref", tmp_path)
+
+
+def test_iter_snapshot_releases_matches_loaded_snapshot(
+    tmp_path: Path, configs: Path
+) -> None:
+    layout = _sync_minimal(tmp_path, configs)
+    releases = list(iter_snapshot_releases(layout))
+    assert releases == [load_snapshot(layout).releases[MODULE_NAME][MODULE_VERSION]]
+
+
+def test_iter_snapshot_releases_rejects_truncated_snapshot(
+    tmp_path: Path, configs: Path
+) -> None:
+    layout = _sync_minimal(tmp_path, configs)
+    snapshot = layout.deployment_snapshot_path.read_text()
+    layout.deployment_snapshot_path.write_text(snapshot[: len(snapshot) // 2])
+    with pytest.raises(SnapshotError, match="could not be read"):
+        list(iter_snapshot_releases(layout))
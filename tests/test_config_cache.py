@@ -0,0 +1,149 @@
+"""Direct-call tests for the persistent configuration cache."""
+
+import os
+import shutil
+import time
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+
+import pytest
+
+from conftest import run_cli
+from deploy_tools.cache import FileStore
+from deploy_tools.models import config_cache, save_and_load
+from deploy_tools.models.config_cache import ConfigCache
+from deploy_tools.models.deployment import ReleasesByNameAndVersion
+from deploy_tools.models.module import Release
+from deploy_tools.models.save_and_load import load_deployment
+
+MODULE_FILE = Path("example-module-multi") / "1.0.yaml"
+
+
+@pytest.fixture
+def config_folder(tmp_path: Path, configs: Path) -> Path:
+    """Return a writable copy of a valid multi-version configuration."""
+    folder = tmp_path / "config"
+    shutil.copytree(configs / "valid" / "multi-version-active", folder)
+    return folder
+
+
+def test_cached_load_skips_parsing_unchanged_files(
+    tmp_path: Path, config_folder: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_root = tmp_path / "cache"
+    expected = load_deployment(config_folder, cache=ConfigCache(cache_root))
+
+    validate_releases = save_and_load.validate_releases
+
+    def _validate_cached_only(
+        data: Mapping[str, Mapping[str, object]],
+    ) -> ReleasesByNameAndVersion:
+        for versions in data.values():
+            for release in versions.values():
+                assert isinstance(release, Release), "Release was parsed, not cached"
+        return validate_releases(data)
+
+    monkeypatch.setattr(save_and_load, "validate_releases", _validate_cached_only)
+    assert load_deployment(config_folder, cache=ConfigCache(cache_root)) == expected
+
+
+def test_changed_file_is_reloaded(tmp_path: Path, config_folder: Path) -> None:
+    cache_root = tmp_path / "cache"
+    load_deployment(config_folder, cache=ConfigCache(cache_root))
+
+    module_file = config_folder / MODULE_FILE
+    module_file.write_text(
+        module_file.read_text().replace(
+            "applications:", "description: changed\n  applications:"
+        )
+    )
+
+    deployment = load_deployment(config_folder, cache=ConfigCache(cache_root))
+    module = deployment.releases["example-module-multi"]["1.0"].module
+    assert module.description == "changed"
+
+
+@pytest.mark.parametrize("corruption", [b"", b"{", b'{"module": 1}', b"\x80\x04."])
+def test_corrupt_entry_is_a_cache_miss(
+    tmp_path: Path, config_folder: Path, corruption: bytes
+) -> None:
+    cache = ConfigCache(tmp_path / "cache")
+    contents = (config_folder / MODULE_FILE).read_bytes()
+    expected = load_deployment(config_folder, cache=cache)
+    release = expected.releases["example-module-multi"]["1.0"]
+    cache.put(MODULE_FILE, contents, release)
+    assert cache.get(MODULE_FILE, contents) == release
+
+    for path in (tmp_path / "cache").glob("config/*/*/*"):
+        path.write_bytes(corruption)
+
+    assert cache.get(MODULE_FILE, contents) is None
+    assert load_deployment(config_folder, cache=cache) == expected
+
+
+def test_schema_change_invalidates_cache(
+    tmp_path: Path, config_folder: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_root = tmp_path / "cache"
+    cache = ConfigCache(cache_root)
+    load_deployment(config_folder, cache=cache)
+    module_file = config_folder / MODULE_FILE
+    assert cache.get(MODULE_FILE, module_file.read_bytes()) is not None
+
+    monkeypatch.setattr(config_cache, "_get_namespace", lambda: "new-schema")
+    new_cache = ConfigCache(cache_root)
+    assert new_cache.get(MODULE_FILE, module_file.read_bytes()) is None
+
+    # Another version may still be using its entries, until they become stale
+    (old_folder,) = [
+        path for path in (cache_root / "config").iterdir() if path.name != "new-schema"
+    ]
+    assert cache.get(MODULE_FILE, module_file.read_bytes()) is not None
+    old_time = time.time() - config_cache.STALE_NAMESPACE_AGE - 1
+    os.utime(old_folder, (old_time, old_time))
+    ConfigCache(cache_root)
+    assert [path.name for path in (cache_root / "config").iterdir()] == ["new-schema"]
+
+
+def test_cached_load_through_cli(tmp_path: Path, config_folder: Path) -> None:
+    # A warm cache must give the same validate output as a cold one.
+    area = tmp_path / "area"
+    area.mkdir()
+    args = ("validate", "--from-scratch", "--cache-dir", tmp_path / "cache")
+    cold = run_cli(*args, area, config_folder)
+    assert run_cli(*args, area, config_folder) == cold
+
+
+def test_file_store_evicts_least_recently_used(tmp_path: Path) -> None:
+    store = FileStore(tmp_path / "store", max_size=10)
+    for age, key in enumerate(["aa-old", "bb-mid", "cc-new"]):
+        path = store.put_bytes(key, b"12345")
+        os.utime(path, (age, age))
+
+    # Using the oldest entry makes it the most recently used
+    assert store.get("aa-old") is not None
+
+    assert store.evict() == 5
+    assert store.get("bb-mid") is None
+    assert store.read_bytes("aa-old") == b"12345"
+    assert store.read_bytes("cc-new") == b"12345"
+
+
+def test_file_store_skips_entries_removed_during_scan(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = FileStore(tmp_path / "store", max_size=5)
+    for key in ["aa-first", "bb-second"]:
+        store.put_bytes(key, b"12345")
+
+    # Another process removes an entry after the store has listed it
+    listed = list(store.iter_entries())
+    store.remove("aa-first")
+
+    def _iter_listed_entries() -> Iterator[tuple[str, Path]]:
+        return iter(listed)
+
+    monkeypatch.setattr(store, "iter_entries", _iter_listed_entries)
+    assert store.get_usage() == (1, 5)
+    assert store.evict() == 0
+    assert store.read_bytes("bb-second") == b"12345"
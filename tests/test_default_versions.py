@@ -13,7 +13,7 @@ from deploy_tools.models.deployment import (
     DeploymentSettings,
     ReleasesByNameAndVersion,
 )
-from deploy_tools.models.module import Module, Release
+from deploy_tools.models.module import Module, ModuleDependency, Release
 from deploy_tools.validate import ValidationError, validate_default_versions
 
 
@@ -125,3 +125,29 @@ def test_all_versions_excluded_raises() -> None:
         match="every version for name: mod has set exclude_from_defaults",
     ):
         validate_default_versions(deployment)
+
+
+def test_deployment_index_views() -> None:
+    # The index backs default-version selection, so check its views directly too.
+    dependent = Module(
+        name="app",
+        version="1.0",
+        applications=[],
+        dependencies=[ModuleDependency(name="mod", version="1.2")],
+    )
+    deployment = _deployment(
+        _release("mod", "1.2"),
+        _release("mod", "1.2rc1"),
+        _release("mod", "0.9", deprecated=True),
+        Release(module=dependent, deprecated=True),
+    )
+    index = deployment.index
+    assert index is deployment.index
+    assert index.final_versions == {"mod": {"1.2", "1.2rc1"}}
+    assert index.sorted_final_versions == {"mod": ["1.2rc1", "1.2"]}
+    assert index.is_final_version("mod", "1.2")
+    assert not index.is_final_version("mod", "0.9")
+    assert not index.is_final_version("app", "1.0")
+
+    # The cached index is not part of the model, so it does not affect equality
+    assert deployment == Deployment.model_validate(deployment.model_dump())
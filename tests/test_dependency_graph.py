@@ -0,0 +1,95 @@
+"""Unit tests for the Module dependency graph."""
+
+import pytest
+
+from deploy_tools.dependency_graph import DependencyCycleError, DependencyGraph
+from deploy_tools.models.deployment import (
+    Deployment,
+    DeploymentSettings,
+    collect_releases,
+)
+from deploy_tools.models.module import Module, ModuleDependency, Release
+
+
+def _release(
+    name: str, version: str, *dependencies: str, deprecated: bool = False
+) -> Release:
+    """Build a Release depending on each ``name`` or ``name/version`` given."""
+    return Release(
+        module=Module(
+            name=name,
+            version=version,
+            applications=[],
+            dependencies=[
+                ModuleDependency(name=dep_name, version=dep_version or None)
+                for dep_name, _, dep_version in (
+                    dependency.partition("/") for dependency in dependencies
+                )
+            ],
+        ),
+        deprecated=deprecated,
+    )
+
+
+def _graph(*releases: Release, **default_versions: str) -> DependencyGraph:
+    deployment = Deployment(
+        settings=DeploymentSettings(), releases=collect_releases(releases)
+    )
+    return DependencyGraph(deployment, default_versions)
+
+
+def test_dependency_queries() -> None:
+    # Unpinned dependencies use the default version, and names outside the Deployment
+    # (here, 'external') are not part of the graph.
+    graph = _graph(
+        _release("app", "1.0", "lib", "external/2.0"),
+        _release("tool", "1.0", "lib/1.0"),
+        _release("lib", "1.0", "base/1.0"),
+        _release("lib", "2.0", "base/1.0"),
+        _release("base", "1.0"),
+        lib="2.0",
+    )
+    assert graph.get_dependencies("app", "1.0") == [("lib", "2.0")]
+    assert graph.get_dependents("base", "1.0") == [("lib", "1.0"), ("lib", "2.0")]
+    assert graph.get_affected([("lib", "1.0")]) == {("tool", "1.0")}
+    assert graph.get_affected([("base", "1.0")]) == {
+        ("lib", "1.0"),
+        ("lib", "2.0"),
+        ("app", "1.0"),
+        ("tool", "1.0"),
+    }
+
+    order = graph.get_topological_order()
+    for name, version in order:
+        for dependency in graph.get_dependencies(name, version):
+            assert order.index(dependency) < order.index((name, version))
+
+    assert graph.find_cycle() is None
+    assert graph.unknown_dependencies == []
+
+
+def test_pinned_dependency_on_deprecated_version_is_unknown() -> None:
+    graph = _graph(
+        _release("app", "1.0", "lib/1.0"),
+        _release("lib", "1.0", deprecated=True),
+        _release("lib", "2.0"),
+    )
+    assert [key for key, _ in graph.unknown_dependencies] == [("app", "1.0")]
+    assert graph.get_dependents("lib", "1.0") == []
+
+
+def test_cycle_is_reported_from_its_first_module() -> None:
+    graph = _graph(
+        _release("c", "1.0", "a/1.0"),
+        _release("b", "1.0", "c/1.0"),
+        _release("a", "1.0", "b/1.0"),
+        _release("d", "1.0", "a/1.0"),
+    )
+    assert graph.find_cycle() == [
+        ("a", "1.0"),
+        ("b", "1.0"),
+        ("c", "1.0"),
+        ("a", "1.0"),
+    ]
+    with pytest.raises(DependencyCycleError, match="a/1.0 -> b/1.0 -> c/1.0 -> a/1.0"):
+        graph.get_topological_order()
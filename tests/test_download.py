@@ -0,0 +1,110 @@
+"""Tests for streaming binary downloads."""
+
+import hashlib
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from deploy_tools.download import DownloadError, HashMismatchError, download_file
+from deploy_tools.models.binary_app import HashType
+
+CONTENT = bytes(range(256)) * 64
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+DROP_AFTER = 1000
+
+
+class _FileServer(ThreadingHTTPServer):
+    """Serves a single file, optionally cutting the first transfer short."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _FileHandler)
+        self.supports_ranges = True
+        self.drop_first = False
+        self.ranges: list[str | None] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/file"
+
+
+class _FileHandler(BaseHTTPRequestHandler):
+    @property
+    def file_server(self) -> _FileServer:
+        assert isinstance(self.server, _FileServer)
+        return self.server
+
+    def do_GET(self) -> None:
+        server = self.file_server
+        requested_range = self.headers.get("Range")
+        server.ranges.append(requested_range)
+        if self.path != "/file":
+            self.send_error(404)
+            return
+
+        start = 0
+        if requested_range is not None and server.supports_ranges:
+            start = int(requested_range.removeprefix("bytes=").removesuffix("-"))
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}"
+            )
+        else:
+            self.send_response(200)
+
+        body = CONTENT[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        if server.drop_first and len(server.ranges) == 1:
+            body = body[:DROP_AFTER]
+
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def file_server() -> Generator[_FileServer]:
+    server = _FileServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("supports_ranges", [True, False])
+def test_interrupted_download_is_resumed(
+    tmp_path: Path, file_server: _FileServer, supports_ranges: bool
+) -> None:
+    file_server.drop_first = True
+    file_server.supports_ranges = supports_ranges
+    destination = tmp_path / "tool"
+
+    download_file(file_server.url, destination, HashType.SHA256, SHA256)
+
+    assert destination.read_bytes() == CONTENT
+    assert file_server.ranges == [None, f"bytes={DROP_AFTER}-"]
+    assert list(tmp_path.iterdir()) == [destination]
+
+
+def test_download_with_wrong_hash_leaves_no_file(
+    tmp_path: Path, file_server: _FileServer
+) -> None:
+    destination = tmp_path / "tool"
+    with pytest.raises(HashMismatchError, match="hash check failed"):
+        download_file(file_server.url, destination, HashType.SHA256, "0" * 64)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_missing_file_is_not_retried(tmp_path: Path, file_server: _FileServer) -> None:
+    with pytest.raises(DownloadError, match="404"):
+        download_file(file_server.url + "-missing", tmp_path / "tool")
+
+    assert file_server.ranges == [None]
+    assert not list(tmp_path.iterdir())
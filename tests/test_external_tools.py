@@ -17,3 +17,13 @@ def test_run_command_reports_failed_tool() -> None:
         ExternalToolError, match="External tool 'bash' failed with exit status 3"
     ):
         run_command(["bash", "-c", "exit 3"], check=True)
+
+
+def test_run_command_adds_environment_variables() -> None:
+    result = run_command(
+        ["bash", "-c", 'echo "$DEPLOY_TOOLS_TEST:${PATH:+path}"'],
+        capture_output=True,
+        text=True,
+        env={"DEPLOY_TOOLS_TEST": "set"},
+    )
+    assert result.stdout == "set:path\n"
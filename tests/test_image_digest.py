@@ -0,0 +1,145 @@
+"""Tests for resolving image digests, and skipping pulls of unchanged images."""
+
+import json
+import shutil
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from conftest import FakeApptainerPull, run_cli
+from deploy_tools.apptainer import read_sif_digest
+from deploy_tools.layout import Layout
+from deploy_tools.oci import resolve_image_digest
+
+TOKEN = "stand-in-token"
+
+
+def _digest(character: str) -> str:
+    return "sha256:" + character * 64
+
+
+class _LocalRegistry(ThreadingHTTPServer):
+    """Stands in for an OCI registry, serving the digests of tagged manifests.
+
+    Manifests are only served with a token from the registry's anonymous token
+    endpoint, as public registries such as ghcr.io require.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _RegistryHandler)
+        self.digests: dict[str, str] = {}
+        self.token_requests = 0
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self.server_address[1]}"
+
+
+class _RegistryHandler(BaseHTTPRequestHandler):
+    @property
+    def registry(self) -> _LocalRegistry:
+        assert isinstance(self.server, _LocalRegistry)
+        return self.server
+
+    def do_HEAD(self) -> None:
+        if self.headers.get("Authorization") != f"Bearer {TOKEN}":
+            realm = f"http://{self.registry.host}/token"
+            self.send_response(401)
+            self.send_header(
+                "WWW-Authenticate",
+                f'Bearer realm="{realm}",service="stand-in",scope="pull"',
+            )
+            self.end_headers()
+            return
+
+        repository, _, tag = self.path.removeprefix("/v2/").partition("/manifests/")
+        digest = self.registry.digests.get(f"{repository}:{tag}")
+        if digest is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Docker-Content-Digest", digest)
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        self.registry.token_requests += 1
+        body = json.dumps({"token": TOKEN}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def local_registry() -> Generator[_LocalRegistry]:
+    registry = _LocalRegistry()
+    thread = threading.Thread(target=registry.serve_forever, daemon=True)
+    thread.start()
+    yield registry
+    registry.shutdown()
+    registry.server_close()
+
+
+def test_resolve_image_digest(local_registry: _LocalRegistry) -> None:
+    local_registry.digests["org/image:1.0"] = _digest("a")
+
+    url = f"docker://{local_registry.host}/org/image:1.0"
+    assert resolve_image_digest(url) == _digest("a")
+    assert local_registry.token_requests == 1
+
+    # Unknown tags are unresolved, and URLs pinned to a digest need no request
+    assert resolve_image_digest(f"docker://{local_registry.host}/org/image:2.0") is None
+    pinned = f"docker://{local_registry.host}/org/image@{_digest('b')}"
+    assert resolve_image_digest(pinned) == _digest("b")
+    assert resolve_image_digest("library://alpine:latest") is None
+
+
+def test_unchanged_image_is_reused_from_deployed_module(
+    tmp_path: Path,
+    configs: Path,
+    local_registry: _LocalRegistry,
+    fake_apptainer_pull: FakeApptainerPull,
+) -> None:
+    pulls = fake_apptainer_pull.pulled
+    local_registry.digests["apptainer/lolcow:latest"] = _digest("a")
+    area = tmp_path / "area"
+    area.mkdir()
+    config = tmp_path / "config"
+    shutil.copytree(configs / "golden-master" / "01-initial", config)
+    release_file = config / "apps" / "0.1.yaml"
+    release = (
+        release_file.read_text().replace("ghcr.io", local_registry.host)
+        + "  allow_updates: true\n"
+    )
+    release_file.write_text(release)
+
+    def _sync_with_value(value: str) -> Path:
+        release_file.write_text(release.replace("Version 0.1", value))
+        run_cli("sync", area, config)
+        (sif_file,) = Layout(area).modules_root.glob("apps/0.1/sif_files/*.sif")
+        return sif_file
+
+    run_cli("sync", "--from-scratch", area, config)
+    assert pulls == [f"docker://{local_registry.host}/apptainer/lolcow@{_digest('a')}"]
+
+    # The store is emptied, so only the deployed SIF file can be reused
+    run_cli("cache", "prune", "--sif-store-size", "0", area)
+    sif_file = _sync_with_value("Unchanged image")
+    assert len(pulls) == 1
+    assert read_sif_digest(sif_file) == _digest("a")
+
+    local_registry.digests["apptainer/lolcow:latest"] = _digest("b")
+    sif_file = _sync_with_value("Changed image")
+    assert pulls[1:] == [
+        f"docker://{local_registry.host}/apptainer/lolcow@{_digest('b')}"
+    ]
+    assert read_sif_digest(sif_file) == _digest("b")
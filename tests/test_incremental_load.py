@@ -0,0 +1,127 @@
+"""Tests for loading configuration incrementally from a git diff."""
+
+import shutil
+from collections.abc import Mapping
+from pathlib import Path
+
+import pytest
+from git import Repo
+
+from conftest import run_cli
+from deploy_tools.incremental_load import (
+    get_recorded_config_commit,
+    load_deployment_incremental,
+)
+from deploy_tools.layout import Layout
+from deploy_tools.models import save_and_load
+from deploy_tools.models.deployment import ReleasesByNameAndVersion
+from deploy_tools.models.save_and_load import load_deployment
+from deploy_tools.snapshot import load_snapshot
+
+
+def _checkout_stage(configs: Path, repo: Repo, config_folder: Path, stage: str) -> None:
+    """Replace the configuration folder's contents with a golden-master stage."""
+    shutil.rmtree(config_folder, ignore_errors=True)
+    shutil.copytree(configs / "golden-master" / stage, config_folder)
+    repo.git.add("--all")
+    repo.index.commit(f"Configuration for {stage}")
+
+
+@pytest.fixture
+def config_repo(tmp_path: Path) -> Repo:
+    """Return a git repository that holds configuration in a ``config`` subfolder."""
+    return Repo.init(tmp_path / "config-repo", initial_branch="main")
+
+
+@pytest.fixture
+def area(tmp_path: Path, stub_apptainer_pull: None) -> Path:
+    """Return an empty deployment area, for syncing golden-master configuration."""
+    deployment_root = tmp_path / "area"
+    deployment_root.mkdir()
+    return deployment_root
+
+
+def test_sync_records_config_commit(
+    area: Path, configs: Path, config_repo: Repo
+) -> None:
+    config_folder = Path(config_repo.working_dir) / "config"
+    _checkout_stage(configs, config_repo, config_folder, "01-initial")
+
+    run_cli("sync", "--from-scratch", area, config_folder)
+    assert get_recorded_config_commit(Layout(area)) == config_repo.head.commit.hexsha
+
+
+@pytest.mark.parametrize(
+    "old_stage, new_stage",
+    [
+        ("01-initial", "02-added"),
+        ("02-added", "03-updated"),
+        ("04-deprecated", "05-restored"),
+        ("05-restored", "06-removed"),
+    ],
+)
+def test_incremental_load_matches_full_load(
+    area: Path,
+    configs: Path,
+    config_repo: Repo,
+    monkeypatch: pytest.MonkeyPatch,
+    old_stage: str,
+    new_stage: str,
+) -> None:
+    config_folder = Path(config_repo.working_dir) / "config"
+    _checkout_stage(configs, config_repo, config_folder, old_stage)
+    run_cli("sync", "--from-scratch", area, config_folder)
+
+    # Leave the new stage uncommitted: working tree changes must also be picked up
+    shutil.rmtree(config_folder)
+    shutil.copytree(configs / "golden-master" / new_stage, config_folder)
+    expected = load_deployment(config_folder)
+
+    layout = Layout(area)
+    snapshot = load_snapshot(layout)
+    parsed: list[str] = []
+    validate_releases = save_and_load.validate_releases
+
+    def _record_parse(
+        data: Mapping[str, Mapping[str, object]],
+    ) -> ReleasesByNameAndVersion:
+        parsed.extend(f"{name}/{version}" for name in data for version in data[name])
+        return validate_releases(data)
+
+    monkeypatch.setattr(save_and_load, "validate_releases", _record_parse)
+    assert load_deployment_incremental(config_folder, layout, snapshot) == expected
+
+    # Only files that differ between the two stages are read
+    all_releases = [
+        f"{name}/{version}"
+        for name, versions in expected.releases.items()
+        for version in versions
+    ]
+    assert len(parsed) < len(all_releases)
+
+
+def test_incremental_validate_falls_back_without_recorded_commit(
+    tmp_path: Path, area: Path, configs: Path
+) -> None:
+    # The configs fixture is not copied into its own repository here, so the sync
+    # records no commit that matches it and every file must be loaded.
+    config_folder = tmp_path / "config"
+    shutil.copytree(configs / "golden-master" / "01-initial", config_folder)
+    run_cli("sync", "--from-scratch", area, config_folder)
+    assert get_recorded_config_commit(Layout(area)) is None
+
+    new_config = configs / "golden-master" / "02-added"
+    expected = run_cli("validate", area, new_config)
+    assert run_cli("validate", "--incremental", area, new_config) == expected
+
+
+def test_incremental_load_rejects_stray_changed_file(
+    area: Path, configs: Path, config_repo: Repo
+) -> None:
+    config_folder = Path(config_repo.working_dir) / "config"
+    _checkout_stage(configs, config_repo, config_folder, "01-initial")
+    run_cli("sync", "--from-scratch", area, config_folder)
+
+    (config_folder / "apps" / "README.txt").write_text("Not a release\n")
+    with pytest.raises(save_and_load.LoadError, match="Unexpected file"):
+        run_cli("validate", "--incremental", area, config_folder)
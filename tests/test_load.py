@@ -3,7 +3,11 @@ from pathlib import Path
 import pytest
 
 from conftest import run_cli
-from deploy_tools.models.save_and_load import LoadError
+from deploy_tools.models.save_and_load import (
+    LoadError,
+    load_deployment,
+    validate_releases,
+)
 
 # Configs whose on-disk layout is malformed: loading must fail with a clear LoadError
 # before any validation logic runs. Each maps a folder under configs/invalid to a
@@ -15,16 +19,31 @@ MALFORMED_CONFIGS = [
 ]
 
 
+@pytest.mark.parametrize("jobs", ["1", "4"])
 @pytest.mark.parametrize("config_name, message", MALFORMED_CONFIGS)
 def test_load_rejects_malformed_config_layout(
-    tmp_path: Path, configs: Path, config_name: str, message: str
+    tmp_path: Path, configs: Path, config_name: str, message: str, jobs: str
 ) -> None:
+    # Serial and concurrent loads must report the same error for the same file.
     with pytest.raises(LoadError, match=message):
         run_cli(
-            "validate", "--from-scratch", tmp_path, configs / "invalid" / config_name
+            "validate",
+            "--from-scratch",
+            "--jobs",
+            jobs,
+            tmp_path,
+            configs / "invalid" / config_name,
         )
 
 
+def test_concurrent_load_matches_serial_load(configs: Path) -> None:
+    # A concurrent load must produce exactly the same Deployment as a serial one.
+    config_folder = configs / "golden-master" / "02-added"
+    serial = load_deployment(config_folder, max_workers=1)
+    assert load_deployment(config_folder, max_workers=4) == serial
+    assert load_deployment(config_folder) == serial
+
+
 def test_load_surfaces_invalid_field_in_error(tmp_path: Path, configs: Path) -> None:
     # A config that fails model validation must raise a clean LoadError that names the
     # offending field; the top-level handler hides the traceback, so the field detail is
@@ -39,3 +58,13 @@ def test_load_surfaces_invalid_field_in_error(tmp_path: Path, configs: Path) ->
     message = str(exc_info.value)
     assert "Module configuration is invalid" in message
     assert "module.name" in message
+
+
+def test_bulk_validation_reuses_validated_releases(configs: Path) -> None:
+    # Releases that are already validated must be used as they are, not rebuilt.
+    deployment = load_deployment(configs / "golden-master" / "02-added")
+    revalidated = validate_releases(deployment.releases)
+    assert revalidated == deployment.releases
+    for name, versions in deployment.releases.items():
+        for version, release in versions.items():
+            assert revalidated[name][version] is release
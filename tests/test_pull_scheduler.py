@@ -0,0 +1,143 @@
+"""Tests for scheduling concurrent Apptainer pulls."""
+
+from pathlib import Path
+
+import pytest
+
+from conftest import FakeApptainerPull, run_cli
+from deploy_tools.apptainer import (
+    PullScheduler,
+    get_registry,
+    load_pull_durations,
+)
+from deploy_tools.layout import Layout
+
+
+@pytest.mark.parametrize(
+    "url, registry",
+    [
+        ("docker://ghcr.io/apptainer/lolcow:latest", "ghcr.io"),
+        ("docker://harbor.example.com:8443/team/image:1.0", "harbor.example.com:8443"),
+        ("docker://localhost/image:1.0", "localhost"),
+        ("docker://ubuntu:24.04", "docker.io"),
+        ("docker://library/ubuntu:24.04", "docker.io"),
+        ("oras://ghcr.io/org/image:1.0", "ghcr.io"),
+    ],
+)
+def test_get_registry(url: str, registry: str) -> None:
+    assert get_registry(url) == registry
+
+
+def test_pulls_respect_global_and_registry_limits(
+    tmp_path: Path, fake_apptainer_pull: FakeApptainerPull
+) -> None:
+    urls = [f"docker://ghcr.io/org/image-{index}:1.0" for index in range(4)] + [
+        f"docker://harbor.example.com/org/image-{index}:1.0" for index in range(4)
+    ]
+    with PullScheduler(max_pulls=3, registry_max_pulls={"harbor.example.com": 1}) as s:
+        for index, url in enumerate(urls):
+            s.submit(tmp_path / f"{index}.sif", url)
+
+        assert s.wait() == []
+        assert set(s.durations) == set(urls)
+
+    assert sorted(fake_apptainer_pull.pulled) == sorted(urls)
+    assert fake_apptainer_pull.max_active["all"] <= 3
+    assert fake_apptainer_pull.max_active["ghcr.io"] <= 2
+    assert fake_apptainer_pull.max_active["harbor.example.com"] == 1
+
+
+def test_slowest_pulls_start_first(
+    tmp_path: Path, fake_apptainer_pull: FakeApptainerPull
+) -> None:
+    fake_apptainer_pull.release.clear()
+    expected_durations = {
+        "docker://ghcr.io/org/fast:1.0": 1.0,
+        "docker://ghcr.io/org/slow:1.0": 60.0,
+        "docker://ghcr.io/org/medium:1.0": 10.0,
+    }
+    with PullScheduler(max_pulls=1, expected_durations=expected_durations) as s:
+        # The first pull holds the only slot until every other pull is queued
+        s.submit(tmp_path / "first.sif", "docker://ghcr.io/org/first:1.0")
+        for index, url in enumerate(expected_durations):
+            s.submit(tmp_path / f"{index}.sif", url)
+        s.submit(tmp_path / "new.sif", "docker://ghcr.io/org/new:1.0")
+
+        fake_apptainer_pull.release.set()
+        assert s.wait() == []
+
+    assert fake_apptainer_pull.pulled == [
+        "docker://ghcr.io/org/first:1.0",
+        "docker://ghcr.io/org/new:1.0",
+        "docker://ghcr.io/org/slow:1.0",
+        "docker://ghcr.io/org/medium:1.0",
+        "docker://ghcr.io/org/fast:1.0",
+    ]
+
+
+def test_failed_pulls_are_reported(
+    tmp_path: Path, fake_apptainer_pull: FakeApptainerPull
+) -> None:
+    with PullScheduler() as s:
+        s.submit(tmp_path / "good.sif", "docker://ghcr.io/org/good:1.0")
+        s.submit(tmp_path / "broken.sif", "docker://ghcr.io/org/broken:1.0")
+        errors = s.wait()
+
+    assert [(path.name, str(exc)) for path, exc in errors] == [
+        ("broken.sif", "Pull failed: docker://ghcr.io/org/broken:1.0")
+    ]
+
+
+def test_each_image_is_pulled_once(
+    tmp_path: Path, fake_apptainer_pull: FakeApptainerPull
+) -> None:
+    fake_apptainer_pull.release.clear()
+    url = "docker://ghcr.io/org/image:1.0"
+    broken_url = "docker://ghcr.io/org/broken:1.0"
+    paths = [tmp_path / f"module-{index}" / "image.sif" for index in range(3)]
+    for path in paths:
+        path.parent.mkdir()
+
+    with PullScheduler() as s:
+        for path in paths:
+            s.submit(path, url)
+            s.submit(path.with_name("broken.sif"), broken_url)
+        s.submit(paths[0], url)  # The same file again is not an error
+
+        fake_apptainer_pull.release.set()
+        errors = s.wait()
+
+    assert sorted(fake_apptainer_pull.pulled) == [broken_url, url]
+    assert len({path.stat().st_ino for path in paths}) == 1
+    assert all(path.read_text() == url for path in paths)
+
+    # Every copy of an image that failed to pull reports the failure
+    assert [path.parent.name for path, _ in errors] == [
+        path.parent.name for path in paths
+    ]
+
+
+def test_sync_records_pull_durations(
+    tmp_path: Path, configs: Path, fake_apptainer_pull: FakeApptainerPull
+) -> None:
+    run_cli(
+        "sync",
+        "--from-scratch",
+        "--registry-max-pulls",
+        "ghcr.io=1",
+        tmp_path,
+        configs / "golden-master" / "01-initial",
+    )
+    durations = load_pull_durations(Layout(tmp_path).pull_durations_path)
+    assert list(durations) == ["docker://ghcr.io/apptainer/lolcow:latest"]
+
+
+def test_registry_max_pulls_must_be_valid(tmp_path: Path, configs: Path) -> None:
+    with pytest.raises(SystemExit):
+        run_cli(
+            "validate",
+            "--registry-max-pulls",
+            "ghcr.io",
+            tmp_path,
+            configs / "valid" / "minimal",
+        )
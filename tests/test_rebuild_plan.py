@@ -0,0 +1,126 @@
+"""Tests for rebuilding only the files of an updated Module that its changes affect."""
+
+import hashlib
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+
+from conftest import run_cli
+from deploy_tools.layout import Layout
+from deploy_tools.models.module import Module
+from deploy_tools.rebuild_plan import RebuildPlan
+
+BINARY_CONTENT = b"#!/bin/sh\necho 'hello from a binary module'\n"
+BINARY_URL = "https://example.com/tool"
+BINARY_HASH = hashlib.sha256(BINARY_CONTENT).hexdigest()
+
+
+def _module(**changes: object) -> Module:
+    fields: dict[str, Any] = {
+        "name": "apps",
+        "version": "0.1",
+        "description": "Applications",
+        "env_vars": [{"name": "VALUE", "value": "1"}],
+        "applications": [
+            {
+                "app_type": "apptainer",
+                "container": {"path": "docker://ghcr.io/org/image", "version": "1.0"},
+                "entrypoints": [{"name": "first"}, {"name": "second"}],
+            },
+            {"app_type": "shell", "name": "script", "script": ["echo hello"]},
+            {
+                "app_type": "binary",
+                "name": "tool",
+                "url": BINARY_URL,
+                "hash": BINARY_HASH,
+                "hash_type": "sha256",
+            },
+        ],
+    }
+    fields.update(changes)
+    return Module(**fields)
+
+
+def test_description_change_only_affects_modulefile() -> None:
+    plan = RebuildPlan(_module(), _module(description="Changed"))
+
+    assert plan.modulefile_changed
+    assert not plan.changed_entrypoints
+    assert plan.reused_images == {"docker://ghcr.io/org/image:1.0"}
+    assert plan.reused_binaries == {"tool": "tool"}
+
+
+def test_application_changes_only_affect_their_entrypoints() -> None:
+    deployed = _module()
+    applications = deployed.model_dump(mode="json")["applications"]
+    applications[0]["entrypoints"][1]["command"] = "other"
+    applications[1]["script"] = ["echo goodbye"]
+    applications[2]["name"] = "renamed-tool"
+
+    plan = RebuildPlan(deployed, _module(applications=applications))
+
+    assert not plan.modulefile_changed
+    assert plan.changed_entrypoints == {"second", "script", "renamed-tool"}
+    assert plan.reused_images == {"docker://ghcr.io/org/image:1.0"}
+    assert plan.reused_binaries == {"renamed-tool": "tool"}
+
+
+def test_image_change_affects_all_its_entrypoints() -> None:
+    deployed = _module()
+    applications = deployed.model_dump(mode="json")["applications"]
+    applications[0]["container"]["version"] = "2.0"
+
+    plan = RebuildPlan(deployed, _module(applications=applications))
+
+    assert plan.changed_entrypoints == {"first", "second"}
+    assert not plan.reused_images
+
+
+@pytest.mark.usefixtures("stub_apptainer_pull")
+def test_updated_module_reuses_unaffected_files(tmp_path: Path, configs: Path) -> None:
+    source = tmp_path / "downloads" / "tool"
+    source.parent.mkdir()
+    source.write_bytes(BINARY_CONTENT)
+
+    config = tmp_path / "config"
+    shutil.copytree(configs / "golden-master" / "01-initial", config)
+    release_file = config / "apps" / "0.1.yaml"
+    release = yaml.safe_load(release_file.read_text())
+    release["module"]["allow_updates"] = True
+    release["module"]["applications"].append(
+        {
+            "app_type": "binary",
+            "name": "tool",
+            "url": source.as_uri(),
+            "hash": BINARY_HASH,
+            "hash_type": "sha256",
+        }
+    )
+    release_file.write_text(yaml.safe_dump(release))
+
+    area = tmp_path / "area"
+    area.mkdir()
+    run_cli("sync", "--from-scratch", area, config)
+
+    layout = Layout(area)
+    entrypoints = layout.get_entrypoints_folder("apps", "0.1")
+    before = {path.name: path.stat().st_ino for path in entrypoints.iterdir()}
+    modulefile_inode = layout.get_modulefile("apps", "0.1").stat().st_ino
+
+    # Neither the download nor the download cache is needed to rebuild
+    source.unlink()
+    shutil.rmtree(layout.cache_root / "downloads")
+    release["module"]["applications"][2]["script"].append("echo changed")
+    release_file.write_text(yaml.safe_dump(release))
+    run_cli("sync", area, config)
+
+    after = {path.name: path.stat().st_ino for path in entrypoints.iterdir()}
+    assert after.keys() == before.keys()
+    changed = {name for name in after if after[name] != before[name]}
+    assert changed == {"test-shell-script"}
+    assert "echo changed" in (entrypoints / "test-shell-script").read_text()
+    assert (entrypoints / "tool").read_bytes() == BINARY_CONTENT
+    assert layout.get_modulefile("apps", "0.1").stat().st_ino == modulefile_inode
@@ -0,0 +1,92 @@
+"""Direct-call tests for the YAML serialisation layer in ``models.save_and_load``."""
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+from deploy_tools.models import save_and_load
+from deploy_tools.models.deployment import (
+    Deployment,
+    DeploymentSettings,
+    collect_releases,
+)
+from deploy_tools.models.module import Module, Release
+from deploy_tools.models.save_and_load import (
+    iter_deployment_from_yaml,
+    iter_releases,
+    load_deployment,
+    load_from_yaml,
+    save_as_yaml,
+)
+
+SAMPLE_SNAPSHOTS = sorted(
+    (Path(__file__).parent / "samples").glob("*/deploy-tools-output/deployment.yaml")
+)
+SAMPLE_MODULE_SNAPSHOTS = sorted(
+    (Path(__file__).parent / "samples").glob("*/deploy-tools-output/**/module.yaml")
+)
+
+
+@pytest.fixture(params=["libyaml", "pure-python"])
+def yaml_backend(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Run the test against both the libyaml-backed and pure-Python YAML backends."""
+    if request.param == "pure-python":
+        monkeypatch.setattr(save_and_load, "SafeLoader", yaml.SafeLoader)
+        monkeypatch.setattr(save_and_load, "SafeDumper", yaml.SafeDumper)
+
+
+@pytest.mark.parametrize("snapshot", SAMPLE_SNAPSHOTS, ids=lambda p: p.parts[-3])
+def test_deployment_snapshot_round_trip_is_byte_identical(
+    snapshot: Path, tmp_path: Path, yaml_backend: None
+) -> None:
+    # Existing snapshots must stay valid: re-serialising one must reproduce it exactly.
+    with open(snapshot) as f:
+        deployment = load_from_yaml(Deployment, f)
+
+    output = tmp_path / "deployment.yaml"
+    save_as_yaml(deployment, output)
+    assert output.read_bytes() == snapshot.read_bytes()
+
+
+def test_module_snapshot_round_trip_is_byte_identical(
+    tmp_path: Path, yaml_backend: None
+) -> None:
+    output = tmp_path / "module.yaml"
+    for snapshot in SAMPLE_MODULE_SNAPSHOTS:
+        with open(snapshot) as f:
+            module = load_from_yaml(Module, f)
+
+        save_as_yaml(module, output)
+        assert output.read_bytes() == snapshot.read_bytes(), f"{snapshot} differs."
+
+
+@pytest.mark.parametrize("snapshot", SAMPLE_SNAPSHOTS, ids=lambda p: p.parts[-3])
+def test_streamed_deployment_matches_loaded_deployment(
+    snapshot: Path, yaml_backend: None
+) -> None:
+    with open(snapshot) as f:
+        expected = load_from_yaml(Deployment, f)
+
+    with open(snapshot, "rb") as f:
+        parts = list(iter_deployment_from_yaml(f))
+
+    assert [part for part in parts if isinstance(part, DeploymentSettings)] == [
+        expected.settings
+    ]
+    releases = collect_releases(part for part in parts if isinstance(part, Release))
+    assert releases == expected.releases
+
+
+def test_iter_releases_loads_in_chunks(
+    configs: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    config_folder = configs / "golden-master" / "02-added"
+    expected = load_deployment(config_folder)
+
+    # Every chunk boundary must give the same Releases, in the same order
+    monkeypatch.setattr(save_and_load, "RELEASE_CHUNK_SIZE", 1)
+    releases = collect_releases(iter_releases(config_folder))
+    assert list(releases.items()) == list(expected.releases.items())
@@ -0,0 +1,75 @@
+"""Tests for the syntax checks of built shell scripts."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from deploy_tools import script_check
+from deploy_tools.script_check import (
+    ScriptCheckCache,
+    check_shell_syntax,
+    is_shell_script,
+)
+
+
+@pytest.mark.parametrize(
+    "first_line, expected",
+    [
+        ("#! /bin/bash", True),
+        ("#!/bin/sh -e", True),
+        ("#!/usr/bin/env bash", True),
+        ("#!/usr/bin/env -S bash -e", True),
+        ("#!/usr/bin/env python3", False),
+        ("#!/bin/zsh", False),
+        ("#!", False),
+        ("echo no shebang", False),
+    ],
+)
+def test_is_shell_script(tmp_path: Path, first_line: str, expected: bool) -> None:
+    script = tmp_path / "script"
+    script.write_text(f"{first_line}\necho hello\n")
+    assert is_shell_script(script) is expected
+
+
+def test_binary_is_not_shell_script(tmp_path: Path) -> None:
+    binary = tmp_path / "binary"
+    binary.write_bytes(b"\x7fELF\x02\x01\x01" + bytes(range(256)))
+    assert not is_shell_script(binary)
+    assert not is_shell_script(tmp_path)
+
+
+def test_check_shell_syntax_reports_every_failure_and_caches_passes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    scripts = [tmp_path / f"script-{index}" for index in range(4)]
+    for index, script in enumerate(scripts):
+        body = "fi" if index % 2 else f"echo {index}"
+        script.write_text(f"#! /bin/bash\n{body}\n")
+
+    checked: list[str] = []
+    run_command = script_check.run_command
+
+    def _record_check(
+        command: list[str | Path], *, capture_output: bool, text: bool
+    ) -> subprocess.CompletedProcess[str]:
+        checked.append(str(command[-1]))
+        return run_command(command, capture_output=capture_output, text=text)
+
+    monkeypatch.setattr(script_check, "run_command", _record_check)
+    cache = ScriptCheckCache(tmp_path / "cache")
+
+    failures = check_shell_syntax(scripts, max_workers=2, cache=cache)
+    assert [file for file, _ in failures] == [scripts[1], scripts[3]]
+    assert all("syntax error" in errors for _, errors in failures)
+
+    # Only the failed scripts are checked again
+    checked.clear()
+    assert check_shell_syntax(scripts, cache=cache) == failures
+    assert sorted(checked) == [str(scripts[1]), str(scripts[3])]
+
+    # A changed script is checked again, even though its path is unchanged
+    checked.clear()
+    scripts[0].write_text("#! /bin/bash\necho changed\n")
+    assert check_shell_syntax(scripts[:1], cache=cache) == []
+    assert checked == [str(scripts[0])]
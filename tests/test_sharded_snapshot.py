@@ -0,0 +1,126 @@
+"""Tests for the sharded deployment snapshot format."""
+
+from pathlib import Path
+
+import pytest
+
+from conftest import run_cli
+from deploy_tools.layout import Layout
+from deploy_tools.snapshot import (
+    SnapshotError,
+    SnapshotFormat,
+    get_snapshot_format,
+    load_snapshot,
+    load_snapshot_from_ref,
+    load_snapshot_manifest,
+    load_snapshot_release,
+    load_snapshots_from_refs,
+)
+
+STAGES = ["01-initial", "02-added", "03-updated", "04-deprecated"]
+
+
+def _sync_stages(area: Path, configs: Path, *flags: str) -> None:
+    run_cli(
+        "sync", "--from-scratch", *flags, area, configs / "golden-master" / STAGES[0]
+    )
+    for stage in STAGES[1:]:
+        run_cli("sync", area, configs / "golden-master" / stage)
+
+
+@pytest.fixture
+def area(tmp_path: Path, stub_apptainer_pull: None) -> Path:
+    """Return an empty deployment area, for syncing golden-master configuration."""
+    deployment_root = tmp_path / "area"
+    deployment_root.mkdir()
+    return deployment_root
+
+
+def test_sharded_snapshot_matches_single_file_snapshot(
+    tmp_path: Path, area: Path, configs: Path
+) -> None:
+    single_file_area = tmp_path / "single-file"
+    single_file_area.mkdir()
+    _sync_stages(single_file_area, configs)
+    _sync_stages(area, configs, "--snapshot-format", "sharded")
+
+    layout = Layout(area)
+    assert get_snapshot_format(layout) == SnapshotFormat.SHARDED
+    assert not layout.deployment_snapshot_path.exists()
+    assert load_snapshot(layout) == load_snapshot(Layout(single_file_area))
+
+    # compare reads the snapshot in either format, including from previous syncs
+    assert run_cli("compare", area) == ""
+    assert load_snapshot_from_ref(layout, "HEAD~1") == load_snapshot_from_ref(
+        Layout(single_file_area), "HEAD~1"
+    )
+    refs = [f"HEAD~{index}" for index in range(len(STAGES))]
+    assert load_snapshots_from_refs(layout, refs) == load_snapshots_from_refs(
+        Layout(single_file_area), refs
+    )
+
+
+def test_sharded_snapshot_only_rewrites_changed_modules(
+    area: Path, configs: Path
+) -> None:
+    golden_master = configs / "golden-master"
+    run_cli(
+        "sync",
+        "--from-scratch",
+        "--snapshot-format",
+        "sharded",
+        area,
+        golden_master / "02-added",
+    )
+    layout = Layout(area)
+    shard_times = {
+        path: path.stat().st_mtime_ns for path in layout.snapshot_root.glob("**/*.yaml")
+    }
+
+    run_cli("sync", area, golden_master / "03-updated")
+    manifest = load_snapshot_manifest(layout)
+    changed = [
+        path
+        for path, mtime in shard_times.items()
+        if path.exists() and path.stat().st_mtime_ns != mtime
+    ]
+    assert changed
+    assert len(changed) < len(shard_times) - 1
+
+    # Each changed shard (other than the manifest) belongs to an updated Module
+    for path in changed:
+        if path != layout.snapshot_manifest_path:
+            release = load_snapshot_release(
+                layout, manifest, path.parent.name, path.stem
+            )
+            assert release.module.allow_updates
+
+
+def test_snapshot_format_can_be_changed(area: Path, configs: Path) -> None:
+    config = configs / "golden-master" / "01-initial"
+    layout = Layout(area)
+    run_cli("sync", "--from-scratch", area, config)
+    expected = load_snapshot(layout)
+
+    run_cli("sync", "--snapshot-format", "sharded", area, config)
+    assert get_snapshot_format(layout) == SnapshotFormat.SHARDED
+    assert not layout.deployment_digests_path.exists()
+    assert load_snapshot(layout) == expected
+
+    # Without the option, the existing format is kept
+    run_cli("sync", area, config)
+    assert get_snapshot_format(layout) == SnapshotFormat.SHARDED
+
+    run_cli("sync", "--snapshot-format", "single-file", area, config)
+    assert get_snapshot_format(layout) == SnapshotFormat.SINGLE_FILE
+    assert not layout.snapshot_root.exists()
+    assert load_snapshot(layout) == expected
+
+
+def test_from_scratch_rejects_existing_sharded_snapshot(
+    area: Path, configs: Path
+) -> None:
+    config = configs / "golden-master" / "01-initial"
+    run_cli("sync", "--from-scratch", "--snapshot-format", "sharded", area, config)
+    with pytest.raises(SnapshotError, match="must not exist.*\n.*manifest.yaml"):
+        run_cli("validate", "--from-scratch", area, config)
@@ -0,0 +1,119 @@
+"""Tests for the persistent store of pulled Apptainer images."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from conftest import FakeApptainerPull, run_cli
+from deploy_tools import apptainer
+from deploy_tools.apptainer import SifStore, create_sif_file
+from deploy_tools.layout import Layout
+from deploy_tools.oci import ImageReference
+
+DIGEST = "sha256:" + "a" * 64
+
+
+class _FakeRegistry:
+    """Stands in for the registry that resolves digests."""
+
+    def __init__(self) -> None:
+        self.digest = DIGEST
+
+    def resolve(self, container_url: str) -> str:
+        return self.digest
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> _FakeRegistry:
+    registry = _FakeRegistry()
+    monkeypatch.setattr(apptainer, "resolve_image_digest", registry.resolve)
+    return registry
+
+
+@pytest.mark.parametrize(
+    "url, registry, repository, tag",
+    [
+        ("docker://ghcr.io/org/image:latest", "ghcr.io", "org/image", "latest"),
+        ("docker://ubuntu:24.04", "docker.io", "library/ubuntu", "24.04"),
+        ("docker://localhost:5000/org/image", "localhost:5000", "org/image", "latest"),
+        ("oras://ghcr.io/org/image:1.0", "ghcr.io", "org/image", "1.0"),
+    ],
+)  # fmt: skip
+def test_parse_image_reference(
+    url: str, registry: str, repository: str, tag: str
+) -> None:
+    reference = ImageReference.parse(url)
+    assert reference is not None
+    assert (reference.registry, reference.repository, reference.tag) == (
+        registry,
+        repository,
+        tag,
+    )
+    assert reference.get_pinned_url(DIGEST) == (
+        f"{reference.scheme}://{registry}/{repository}@{DIGEST}"
+    )
+
+
+def test_parse_image_reference_ignores_non_registry_urls() -> None:
+    assert ImageReference.parse("library://alpine:latest") is None
+    assert ImageReference.parse("/images/local.sif") is None
+
+
+def test_stored_image_is_linked_until_digest_changes(
+    tmp_path: Path, registry: _FakeRegistry, fake_apptainer_pull: FakeApptainerPull
+) -> None:
+    url = "docker://ghcr.io/org/image:1.0"
+    store = SifStore(tmp_path / "store")
+
+    first = tmp_path / "first.sif"
+    assert create_sif_file(first, url, sif_store=store)
+    assert fake_apptainer_pull.pulled == [f"docker://ghcr.io/org/image@{DIGEST}"]
+
+    second = tmp_path / "second.sif"
+    assert not create_sif_file(second, url, sif_store=store)
+    assert len(fake_apptainer_pull.pulled) == 1
+    assert second.stat().st_ino == first.stat().st_ino
+
+    registry.digest = "sha256:" + "b" * 64
+    third = tmp_path / "third.sif"
+    assert create_sif_file(third, url, sif_store=store)
+    assert len(fake_apptainer_pull.pulled) == 2
+
+
+def test_updated_module_reuses_stored_image_and_prune_keeps_it(
+    tmp_path: Path,
+    configs: Path,
+    registry: _FakeRegistry,
+    fake_apptainer_pull: FakeApptainerPull,
+) -> None:
+    area = tmp_path / "area"
+    area.mkdir()
+    config = tmp_path / "config"
+    shutil.copytree(configs / "golden-master" / "01-initial", config)
+    release_file = config / "apps" / "0.1.yaml"
+    release_file.write_text(release_file.read_text() + "  allow_updates: true\n")
+    run_cli("sync", "--from-scratch", area, config)
+
+    # Changing only an environment variable rebuilds the Module without a pull
+    release_file.write_text(release_file.read_text().replace("Version 0.1", "Changed"))
+    run_cli("sync", area, config)
+    assert len(fake_apptainer_pull.pulled) == 1
+
+    layout = Layout(area)
+    (deployed,) = layout.modules_root.glob("apps/0.1/sif_files/*.sif")
+    (stored,) = layout.sif_store_root.glob("*/*")
+    assert deployed.stat().st_ino == stored.stat().st_ino
+
+    unused = tmp_path / "unused.sif"
+    unused.write_text("unused")
+    SifStore(layout.sif_store_root).put(
+        "docker://ghcr.io/org/unused:1.0", DIGEST, unused
+    )
+    assert "Pruned 1 unreferenced SIF files" in run_cli("cache", "prune", area)
+    assert list(layout.sif_store_root.glob("*/*")) == [stored]
+
+    # Evicting everything leaves deployed images in place
+    run_cli("cache", "prune", "--sif-store-size", "0", area)
+    assert not stored.exists()
+    assert deployed.exists()
@@ -0,0 +1,66 @@
+"""Tests for the shared Templater and its compiled template cache."""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NoReturn
+
+import jinja2
+import pytest
+
+from deploy_tools.templater import Templater, TemplateType, get_templater
+
+
+def test_templater_is_shared_between_threads() -> None:
+    with ThreadPoolExecutor(4) as executor:
+        futures = [executor.submit(get_templater) for _ in range(8)]
+
+    templaters = [future.result() for future in futures]
+    assert all(templater is templaters[0] for templater in templaters)
+
+
+def test_compiled_templates_are_reused_from_bytecode_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_dir = tmp_path / "bytecode"
+    cache_dir.mkdir()
+    Templater(jinja2.FileSystemBytecodeCache(str(cache_dir)))
+    assert len(list(cache_dir.iterdir())) == len(TemplateType)
+
+    def _fail_compile(*args: object, **kwargs: object) -> NoReturn:
+        raise AssertionError("Template compiled despite cached bytecode")
+
+    monkeypatch.setattr(jinja2.Environment, "compile", _fail_compile)
+    templater = Templater(jinja2.FileSystemBytecodeCache(str(cache_dir)))
+
+    output_file = tmp_path / ".version"
+    templater.create(output_file, TemplateType.MODULEFILE_VERSION, {"version": "1.0"})
+    assert "1.0" in output_file.read_text()
+
+
+def test_overwrite_skips_identical_content(tmp_path: Path) -> None:
+    templater = get_templater()
+    output_file = tmp_path / ".version"
+    params = {"version": "1.0"}
+    assert templater.create(
+        output_file, TemplateType.MODULEFILE_VERSION, params, overwrite=True
+    )
+    before = output_file.stat()
+
+    assert not templater.create(
+        output_file, TemplateType.MODULEFILE_VERSION, params, overwrite=True
+    )
+    after = output_file.stat()
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+    # Changed content replaces the file rather than rewriting it in place
+    assert templater.create(
+        output_file,
+        TemplateType.MODULEFILE_VERSION,
+        {"version": "2.0"},
+        executable=True,
+        overwrite=True,
+    )
+    assert output_file.stat().st_ino != before.st_ino
+    assert output_file.stat().st_mode & 0o777 == 0o755
+    assert "2.0" in output_file.read_text()
+    assert list(tmp_path.iterdir()) == [output_file]
@@ -3,6 +3,10 @@ from pathlib import Path
 import pytest
 
 from conftest import run_cli
+from deploy_tools import snapshot
+from deploy_tools.layout import Layout
+from deploy_tools.models.module import Module
+from deploy_tools.snapshot import load_snapshot, load_snapshot_with_digests
 from deploy_tools.validate import ValidationError
 
 # Configurations that 'validate' should reject when deployed from scratch into an empty
@@ -14,6 +18,11 @@ INVALID_INITIAL_CONFIGS = [
         "Module example-module-dependent/1.0 has unknown module dependency "
         "example-module-base/9.9",
     ),
+    (
+        "dependency-cycle",
+        "Module dependencies form a cycle: example-module-a/1.0 -> "
+        "example-module-b/1.0 -> example-module-a/1.0",
+    ),
     (
         "default-version-not-deployed",
         "Unable to configure example-module-shell/2.0 as default",
@@ -129,3 +138,77 @@ def test_validate_reports_no_actions_when_unchanged(
     run_cli("sync", "--from-scratch", tmp_path, configs / "valid" / "minimal")
     output = run_cli("validate", tmp_path, configs / "valid" / "minimal")
     assert "No release actions required" in output
+
+
+def test_snapshot_uses_recorded_module_digests(tmp_path: Path, configs: Path) -> None:
+    run_cli("sync", "--from-scratch", tmp_path, configs / "valid" / "minimal")
+    layout = Layout(tmp_path)
+    snapshot, digests = load_snapshot_with_digests(layout)
+    module = snapshot.releases["example-module-shell"]["1.0"].module
+    rebuilt = Module.model_validate(module.model_dump())
+    assert digests["example-module-shell"]["1.0"] == rebuilt.digest
+
+
+def test_module_digest_follows_updated_copy(tmp_path: Path, configs: Path) -> None:
+    run_cli("sync", "--from-scratch", tmp_path, configs / "valid" / "minimal")
+    release = load_snapshot(Layout(tmp_path)).releases["example-module-shell"]["1.0"]
+    original = release.module.digest
+    updated = release.module.model_copy(update={"description": "Changed"})
+    assert updated.digest != original
+    assert updated.digest == Module.model_validate(updated.model_dump()).digest
+
+
+@pytest.mark.parametrize("snapshot_format", ["single-file", "sharded"])
+def test_validate_ignores_digests_of_edited_snapshot(
+    tmp_path: Path, configs: Path, snapshot_format: str
+) -> None:
+    # A hand-edited snapshot invalidates the recorded digests, so a module changed by
+    # the edit must still be detected by comparing its configuration.
+    config = configs / "valid" / "minimal"
+    run_cli(
+        "sync", "--from-scratch", "--snapshot-format", snapshot_format, tmp_path, config
+    )
+    layout = Layout(tmp_path)
+    snapshot = layout.deployment_snapshot_path
+    if snapshot_format == "sharded":
+        snapshot = layout.get_snapshot_shard_path("example-module-shell", "1.0")
+    snapshot.write_text(snapshot.read_text().replace("description:", "description: x"))
+
+    _, digests = load_snapshot_with_digests(layout)
+    assert not digests
+    with pytest.raises(ValidationError, match="modified without updating version"):
+        run_cli("validate", tmp_path, config)
+
+
+def test_trusted_snapshot_load_skips_yaml_parsing(
+    tmp_path: Path, configs: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    run_cli("sync", "--from-scratch", tmp_path, configs / "valid" / "minimal")
+    layout = Layout(tmp_path)
+    expected = load_snapshot(layout)
+
+    def _fail_to_parse(input_stream: object) -> None:
+        raise AssertionError("YAML snapshot was parsed")
+
+    monkeypatch.setattr(snapshot, "iter_deployment_from_yaml", _fail_to_parse)
+    assert load_snapshot(layout, trusted=True) == expected
+
+
+@pytest.mark.parametrize("corruption", ["edit-snapshot", "truncate-copy", "edit-copy"])
+def test_trusted_snapshot_load_falls_back_to_yaml(
+    tmp_path: Path, configs: Path, corruption: str
+) -> None:
+    run_cli("sync", "--from-scratch", tmp_path, configs / "valid" / "minimal")
+    layout = Layout(tmp_path)
+    if corruption == "edit-snapshot":
+        snapshot_path = layout.deployment_snapshot_path
+        snapshot_path.write_text(snapshot_path.read_text().replace("hello", "edited"))
+    elif corruption == "truncate-copy":
+        (trusted_path,) = layout.cache_root.glob("*.json")
+        trusted_path.write_text(trusted_path.read_text()[:-10])
+    else:
+        # A copy that still validates must not be trusted once it has been changed
+        (trusted_path,) = layout.cache_root.glob("*.json")
+        trusted_path.write_text(trusted_path.read_text().replace("hello", "edited"))
+
+    assert load_snapshot(layout, trusted=True) == load_snapshot(layout)